@@ -0,0 +1,309 @@
+"""Offline benchmarks for the per-call overhead of RestAPI.
+
+Every case runs in-process, against a fake driver, an ``httpx.MockTransport``
+or a minimal ASGI app, so no network is involved. Results are per-call
+timings in microseconds and can be saved as, or compared against, a JSON
+baseline:
+
+    python -m benchmarks.bench_overhead --save benchmarks/baselines/baseline.json
+    python -m benchmarks.bench_overhead --compare benchmarks/baselines/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+import httpx
+import pydantic
+from pydantic import BaseModel
+
+from src.rest_api_client.codec import StdlibJSONCodec, fastest_codec
+from src.rest_api_client.lib import Endpoint, HTTPMethod, RestAPI
+from src.rest_api_client.materialize import Materialization, ResponseShape
+
+BASE_URL = "https://bench.example.com/v1"
+PATH_PARAMETERS = [f"p{index}" for index in range(8)]
+QUERY_PARAMETERS = [f"q{index}" for index in range(8)]
+MANY_PATH = "".join(f"/{name}/{{{name}}}" for name in PATH_PARAMETERS)
+MANY_KWARGS = {name: name.upper() for name in PATH_PARAMETERS + QUERY_PARAMETERS}
+DEFAULT_THRESHOLD = 1.5
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+    score: float
+
+
+ITEM = {"id": 1, "name": "item", "tags": ["a", "b", "c"], "score": 0.5}
+ITEMS = [dict(ITEM, id=index) for index in range(1000)]
+ITEM_BODY = json.dumps(ITEM).encode()
+ITEMS_BODY = json.dumps(ITEMS).encode()
+LARGE_PAYLOAD = {"rows": [dict(ITEM, id=index) for index in range(10000)]}
+
+
+ENDPOINTS = [
+    Endpoint(name="get_item", path="/items/{item_id}"),
+    Endpoint(name="get_model", path="/items/{item_id}", model=Item),
+    Endpoint(
+        name="get_many",
+        path=MANY_PATH,
+        query_parameters={name: str for name in QUERY_PARAMETERS},
+    ),
+    Endpoint(
+        name="get_items",
+        path="/items",
+        model=Item,
+        response_shape=ResponseShape.LIST,
+    ),
+    Endpoint(
+        name="get_items_construct",
+        path="/items",
+        model=Item,
+        response_shape=ResponseShape.LIST,
+        materialization=Materialization.CONSTRUCT,
+    ),
+    Endpoint(name="create_items", path="/items", method=HTTPMethod.POST),
+]
+
+
+def make_response(body: bytes, method: str = "GET") -> httpx.Response:
+    request = httpx.Request(method, BASE_URL)
+    return httpx.Response(
+        200,
+        content=body,
+        headers={"Content-Type": "application/json"},
+        request=request,
+    )
+
+
+class FakeDriver:
+    """Returns prebuilt responses, so only library code is measured."""
+
+    def __init__(self):
+        self.item = make_response(ITEM_BODY)
+        self.items = make_response(ITEMS_BODY)
+
+    def get(self, url, headers, **kwargs):
+        return self.items if url.endswith("/items") else self.item
+
+    def post(self, url, headers, **kwargs):
+        return self.item
+
+
+class AsyncFakeDriver(FakeDriver):
+    async def get(self, url, headers, **kwargs):  # type: ignore
+        return FakeDriver.get(self, url, headers)
+
+
+def mock_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/items") and request.method == "GET":
+        return httpx.Response(200, content=ITEMS_BODY)
+    return httpx.Response(200, content=ITEM_BODY)
+
+
+async def asgi_app(scope, receive, send):
+    """Minimal ASGI stand-in server answering every request with ITEM."""
+    more_body = True
+    while more_body:
+        message = await receive()
+        more_body = message.get("more_body", False)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": ITEM_BODY})
+
+
+def measure(function: Callable[[], object], iterations: int, repeat: int) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            function()
+        timings.append((time.perf_counter() - started) / iterations * 1e6)
+    return {
+        "per_call_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+        "iterations": iterations,
+        "repeat": repeat,
+    }
+
+
+def measure_async(
+    make_coroutine: Callable[[], object], iterations: int, repeat: int
+) -> Dict:
+    async def run_once():
+        started = time.perf_counter()
+        for _ in range(iterations):
+            await make_coroutine()  # type: ignore
+        return (time.perf_counter() - started) / iterations * 1e6
+
+    loop = asyncio.new_event_loop()
+    try:
+        timings = [loop.run_until_complete(run_once()) for _ in range(repeat)]
+    finally:
+        loop.close()
+    return {
+        "per_call_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+        "iterations": iterations,
+        "repeat": repeat,
+    }
+
+
+def run(scale: float = 1.0, repeat: int = 5) -> Dict[str, Dict]:
+    def n(iterations: int) -> int:
+        return max(1, int(iterations * scale))
+
+    results: Dict[str, Dict] = {}
+    fake = RestAPI(BASE_URL, FakeDriver(), endpoints=ENDPOINTS)
+    item_call = fake._prepare_call("get_model", item_id=1)
+
+    results["prepare_call"] = measure(
+        lambda: fake._prepare_call("get_item", item_id=1), n(20000), repeat
+    )
+    results["prepare_call_16_params"] = measure(
+        lambda: fake._prepare_call("get_many", **MANY_KWARGS), n(20000), repeat
+    )
+    results["call_endpoint_fake_driver"] = measure(
+        lambda: fake.call_endpoint("get_item", item_id=1), n(20000), repeat
+    )
+    results["generated_method_fake_driver"] = measure(
+        lambda: fake.get_item(item_id=1), n(20000), repeat
+    )
+    results["process_response_model"] = measure(
+        lambda: fake._process_endpoint_response(item_call, fake.driver.item),
+        n(20000),
+        repeat,
+    )
+    items_call = fake._prepare_call("get_items")
+    results["process_response_1000_models"] = measure(
+        lambda: fake._process_endpoint_response(items_call, fake.driver.items),
+        n(50),
+        repeat,
+    )
+    construct_call = fake._prepare_call("get_items_construct")
+    results["process_response_1000_models_construct"] = measure(
+        lambda: fake._process_endpoint_response(construct_call, fake.driver.items),
+        n(50),
+        repeat,
+    )
+
+    stdlib_codec, fast_codec = StdlibJSONCodec(), fastest_codec()
+    results["encode_large_body_stdlib"] = measure(
+        lambda: stdlib_codec.dumps(LARGE_PAYLOAD), n(10), repeat
+    )
+    results["encode_large_body_fastest_codec"] = measure(
+        lambda: fast_codec.dumps(LARGE_PAYLOAD), n(10), repeat
+    )
+    results["decode_1000_items_fastest_codec"] = measure(
+        lambda: fast_codec.loads(ITEMS_BODY), n(200), repeat
+    )
+
+    with httpx.Client(transport=httpx.MockTransport(mock_handler)) as client:
+        mocked = RestAPI(BASE_URL, client, endpoints=ENDPOINTS)
+        results["httpx_mock_transport_baseline"] = measure(
+            lambda: client.get(f"{BASE_URL}/items/1"), n(2000), repeat
+        )
+        results["sync_call_mock_transport"] = measure(
+            lambda: mocked.get_item(item_id=1), n(2000), repeat
+        )
+        results["sync_post_large_body_mock_transport"] = measure(
+            lambda: mocked.create_items(data=LARGE_PAYLOAD), n(10), repeat
+        )
+
+    async_fake = RestAPI(BASE_URL, AsyncFakeDriver(), endpoints=ENDPOINTS)
+    results["async_call_fake_driver"] = measure_async(
+        lambda: async_fake.async_get_item(item_id=1), n(20000), repeat
+    )
+    parameters = [{"item_id": index} for index in range(1000)]
+    results["async_batch_1000_fake_driver"] = measure_async(
+        lambda: async_fake.call_async_batch("get_item", parameters, concurrency=50),
+        n(5),
+        repeat,
+    )
+
+    async def asgi_call():
+        async with httpx.AsyncClient(app=asgi_app, base_url=BASE_URL) as client:
+            asgi = RestAPI(BASE_URL, client, endpoints=ENDPOINTS)
+            for _ in range(100):
+                await asgi.async_get_model(item_id=1)
+
+    results["async_100_calls_asgi"] = measure_async(asgi_call, n(5), repeat)
+    return results
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "httpx": httpx.__version__,
+        "pydantic": pydantic.VERSION,
+    }
+
+
+def compare(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float
+) -> List[str]:
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if not reference:
+            print(f"{name:45} {result['per_call_us']:>12.3f}us  (new)")
+            continue
+        ratio = result["per_call_us"] / reference["per_call_us"]
+        flag = "REGRESSION" if ratio > threshold else ""
+        print(f"{name:45} {result['per_call_us']:>12.3f}us  x{ratio:.2f} {flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--save", help="Write results to this JSON baseline file.")
+    parser.add_argument("--compare", help="Compare results to this JSON baseline.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = run(scale=args.scale, repeat=args.repeat)
+    regressions: List[str] = []
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)["results"]
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        for name, result in sorted(results.items()):
+            print(f"{name:45} {result['per_call_us']:>12.3f}us")
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump(
+                {"environment": environment(), "results": results},
+                fp,
+                indent=2,
+                sort_keys=True,
+            )
+            fp.write("\n")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) above x{args.threshold}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
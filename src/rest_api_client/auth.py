@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from .singleflight import SingleFlight
+
+logger = logging.getLogger("LIB_LOGGER")
+
+DEFAULT_REFRESH_MARGIN = 60.0
+REFRESH_KEY = "refresh"
+
+
+@dataclass(frozen=True)
+class Token:
+    """A bearer token; ``expires_at`` is a ``time.monotonic()`` deadline."""
+
+    value: str
+    expires_at: Optional[float] = None
+
+    @classmethod
+    def expiring_in(cls, value: str, expires_in: Optional[float]) -> "Token":
+        """Build a token from an OAuth style ``expires_in`` in seconds."""
+        if expires_in is None:
+            return cls(value)
+        return cls(value, time.monotonic() + expires_in)
+
+    def expires_within(self, seconds: float, now: Optional[float] = None) -> bool:
+        if self.expires_at is None:
+            return False
+        if now is None:
+            now = time.monotonic()
+        return now + seconds >= self.expires_at
+
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        return self.expires_within(0.0, now)
+
+
+class TokenProvider:
+    """Fetches a new token, e.g. from an OAuth token endpoint.
+
+    ``afetch`` runs ``fetch`` in the default executor unless overridden.
+    """
+
+    def fetch(self) -> Token:
+        raise NotImplementedError
+
+    async def afetch(self) -> Token:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.fetch)
+
+
+class StaticTokenProvider(TokenProvider):
+    """Always returns the same token, which never expires."""
+
+    def __init__(self, value: str):
+        self.token = Token(value)
+
+    def fetch(self) -> Token:
+        return self.token
+
+    async def afetch(self) -> Token:
+        return self.token
+
+
+class FunctionTokenProvider(TokenProvider):
+    """Fetches tokens with plain functions, ``afetch`` being optional."""
+
+    def __init__(
+        self,
+        fetch: Callable[[], Token],
+        afetch: Optional[Callable[[], Awaitable[Token]]] = None,
+    ):
+        self._fetch = fetch
+        self._afetch = afetch
+
+    def fetch(self) -> Token:
+        return self._fetch()
+
+    async def afetch(self) -> Token:
+        if self._afetch is None:
+            return await super().afetch()
+        return await self._afetch()
+
+
+class TokenCache:
+    """Caches a provider's token and refreshes it ahead of expiry.
+
+    Once a token is within ``refresh_margin`` seconds of expiring, callers
+    keep using it while the next one is fetched in a background thread, or
+    a task on async paths. Callers only wait for a fetch when there is no
+    valid token at all. Concurrent refreshes share one fetch.
+    """
+
+    def __init__(
+        self, provider: TokenProvider, refresh_margin: float = DEFAULT_REFRESH_MARGIN
+    ):
+        self.provider = provider
+        self.refresh_margin = refresh_margin
+        self.refreshes = 0
+        self._token: Optional[Token] = None
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._task: Optional[asyncio.Future] = None
+
+    @property
+    def token(self) -> Optional[Token]:
+        return self._token
+
+    def get(self) -> Token:
+        token = self._token
+        if token is None or token.is_expired():
+            return self.refresh(token)
+        if token.expires_within(self.refresh_margin):
+            self._refresh_in_background(token)
+        return token
+
+    async def aget(self) -> Token:
+        token = self._token
+        if token is None or token.is_expired():
+            return await self.arefresh(token)
+        if token.expires_within(self.refresh_margin):
+            self._arefresh_in_background(token)
+        return token
+
+    def refresh(self, stale: Optional[Token] = None) -> Token:
+        """Replace ``stale``, unless another caller already did."""
+        return self._flight.do(REFRESH_KEY, lambda: self._refresh(stale))
+
+    async def arefresh(self, stale: Optional[Token] = None) -> Token:
+        return await self._flight.do_async(REFRESH_KEY, lambda: self._arefresh(stale))
+
+    def _current(self, stale: Optional[Token]) -> Optional[Token]:
+        token = self._token
+        if token is None or token is stale or token.is_expired():
+            return None
+        return token
+
+    def _refresh(self, stale: Optional[Token]) -> Token:
+        token = self._current(stale)
+        if token is None:
+            token = self._token = self.provider.fetch()
+            self.refreshes += 1
+        return token
+
+    async def _arefresh(self, stale: Optional[Token]) -> Token:
+        token = self._current(stale)
+        if token is None:
+            token = self._token = await self.provider.afetch()
+            self.refreshes += 1
+        return token
+
+    def _refresh_in_background(self, stale: Token):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(
+            target=self._background_refresh,
+            args=(stale,),
+            name="rest-api-token-refresh",
+            daemon=True,
+        ).start()
+
+    def _background_refresh(self, stale: Token):
+        try:
+            self.refresh(stale)
+        except Exception as exc:
+            # The current token is still valid; the next request retries.
+            logger.warning("Background token refresh failed: %s", exc)
+        finally:
+            self._refreshing = False
+
+    def _arefresh_in_background(self, stale: Token):
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.ensure_future(self.arefresh(stale))
+        self._task.add_done_callback(_log_refresh_failure)
+
+
+def _log_refresh_failure(task: asyncio.Future):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Background token refresh failed: %s", task.exception())
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Coroutine, Optional
+
+DEFAULT_MAX_WORKERS = 10
+
+
+class ConcurrencyBackend(Enum):
+    # Async calls on an event loop running in a background thread.
+    EVENT_LOOP = "event_loop"
+    # Sync calls on a bounded thread pool.
+    THREADS = "threads"
+
+
+class BackgroundExecutor:
+    """Runs endpoint calls concurrently on behalf of synchronous code.
+
+    With ``ConcurrencyBackend.EVENT_LOOP``, coroutines run on an event loop
+    in a daemon thread, started on first use, so sync callers get the
+    concurrency of the async driver. The async client must then not be
+    used from another event loop as well. With ``ConcurrencyBackend.THREADS``
+    functions run on a pool of ``max_workers`` threads.
+    """
+
+    def __init__(
+        self,
+        backend: ConcurrencyBackend = ConcurrencyBackend.EVENT_LOOP,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        if max_workers < 1:
+            raise ValueError("Background max_workers must be at least 1.")
+        self.backend = backend
+        self.max_workers = max_workers
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(
+                        target=_run_forever,
+                        args=(loop,),
+                        name="rest-api-event-loop",
+                        daemon=True,
+                    )
+                    thread.start()
+                    self._thread = thread
+                    self._loop = loop
+        return self._loop
+
+    @property
+    def loop_started(self) -> bool:
+        return self._loop is not None
+
+    def submit_coroutine(self, coroutine: Coroutine[Any, Any, Any]) -> Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        """Run ``coroutine`` on the background loop and wait for its result."""
+        if self._thread is threading.current_thread():
+            coroutine.close()
+            raise RuntimeError("Cannot wait for the background loop from its thread.")
+        return self.submit_coroutine(coroutine).result()
+
+    def submit(self, function: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="rest-api-call"
+                    )
+        return self._pool.submit(function, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            loop, thread, pool = self._loop, self._thread, self._pool
+            self._loop = self._thread = self._pool = None
+        if pool is not None:
+            pool.shutdown(wait=wait)
+        if loop is not None and thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            if wait:
+                thread.join()
+
+
+def _run_forever(loop: asyncio.AbstractEventLoop):
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .pagination import lookup
+
+DEFAULT_MAX_BATCH_SIZE = 100
+DEFAULT_BATCH_WINDOW = 0.002
+MISSING = object()
+
+
+class BatchItemMissing(LookupError):
+    """The batch response had no item for a requested key."""
+
+    def __init__(self, key: Any):
+        super().__init__(f"No item for key {key!r} in the batch response.")
+        self.key = key
+
+
+class Batching:
+    """Base strategy mapping single-item calls onto a batch endpoint.
+
+    ``batch_endpoint`` names the endpoint that takes many items and ``key``
+    the keyword argument identifying the item in a single call. Async calls
+    made within ``window`` seconds of each other are sent as one batch of
+    at most ``max_batch_size`` distinct keys. Their other keyword arguments
+    are passed on to the batch endpoint, so only calls that share them are
+    batched together.
+
+    ``items_field`` is the dotted path of the items in the batch response
+    and ``item_key_field`` the path of the key inside each item; without it
+    items must come back in request order. Responses mapping keys to items
+    are matched by key.
+    """
+
+    def __init__(
+        self,
+        batch_endpoint: str,
+        key: str,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        window: float = DEFAULT_BATCH_WINDOW,
+        items_field: Optional[str] = None,
+        item_key_field: Optional[str] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("Batch max_batch_size must be at least 1.")
+        self.batch_endpoint = batch_endpoint
+        self.key = key
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.items_field = items_field
+        self.item_key_field = item_key_field
+
+    def batch_call(self, keys: List[Any], shared: dict) -> Tuple[Any, dict]:
+        """The ``data`` and keyword arguments of the batch endpoint call."""
+        raise NotImplementedError
+
+    def split(self, body: Any, keys: List[Any]) -> List[Any]:
+        """One item per key, or a ``BatchItemMissing`` for missing ones."""
+        items = lookup(body, self.items_field)
+        if isinstance(items, dict):
+            by_key = {str(key): item for key, item in items.items()}
+        elif isinstance(items, list):
+            if self.item_key_field is None:
+                if len(items) != len(keys):
+                    raise ValueError(
+                        f"Batch response has {len(items)} items for {len(keys)} keys."
+                    )
+                return items
+            by_key = {str(lookup(item, self.item_key_field)): item for item in items}
+        else:
+            raise ValueError(
+                f"Expected batch items at '{self.items_field}', got {type(items)}."
+            )
+        results = []
+        for key in keys:
+            item = by_key.get(str(key), MISSING)
+            results.append(BatchItemMissing(key) if item is MISSING else item)
+        return results
+
+
+class QueryBatching(Batching):
+    """Sends the keys in one query parameter, e.g. ``?ids=1,2,3``.
+
+    The batch endpoint must declare ``parameter`` in its query parameters.
+    """
+
+    def __init__(
+        self,
+        batch_endpoint: str,
+        key: str,
+        parameter: str = "ids",
+        separator: str = ",",
+        **options: Any,
+    ):
+        super().__init__(batch_endpoint, key, **options)
+        self.parameter = parameter
+        self.separator = separator
+
+    def batch_call(self, keys, shared):
+        return None, {**shared, self.parameter: self.separator.join(map(str, keys))}
+
+
+class BodyBatching(Batching):
+    """Sends the keys as a JSON body: ``{body_field: [...]}``, or a bare list."""
+
+    def __init__(
+        self,
+        batch_endpoint: str,
+        key: str,
+        body_field: Optional[str] = "ids",
+        **options: Any,
+    ):
+        super().__init__(batch_endpoint, key, **options)
+        self.body_field = body_field
+
+    def batch_call(self, keys, shared):
+        if self.body_field is None:
+            return list(keys), shared
+        return {self.body_field: list(keys)}, shared
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+LoadBatch = Callable[[dict, List[Any]], Awaitable[List[Any]]]
+
+
+class BatchLoader:
+    """Collects the async calls of one endpoint into batches.
+
+    ``load_batch`` sends one batch for the shared keyword arguments and the
+    keys, and returns a result or an exception per key. Calls for a key
+    that is already pending share its result.
+    """
+
+    def __init__(self, batching: Batching, load_batch: LoadBatch):
+        self.batching = batching
+        self.load_batch = load_batch
+        self._pending: Dict[Hashable, Dict[Any, asyncio.Future]] = {}
+        self._timers: Dict[Hashable, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+
+    async def load(self, kwargs: dict) -> Any:
+        shared = dict(kwargs)
+        # Generated methods pass omitted arguments as None.
+        key = shared.pop(self.batching.key, None)
+        if key is None:
+            raise ValueError(f"Batched calls need the '{self.batching.key}' argument.")
+        unhashable = [name for name, value in kwargs.items() if not _hashable(value)]
+        if unhashable:
+            raise TypeError(
+                f"Batched calls need hashable arguments, got {', '.join(unhashable)}."
+            )
+        loop = asyncio.get_running_loop()
+        # Batches belong to one event loop and one set of shared arguments.
+        group = (id(loop), tuple(sorted(shared.items())))
+        with self._lock:
+            pending = self._pending.setdefault(group, {})
+            future = pending.get(key)
+            if future is None:
+                future = pending[key] = loop.create_future()
+                if len(pending) >= self.batching.max_batch_size:
+                    self._dispatch(group, shared)
+                elif len(pending) == 1:
+                    self._timers[group] = loop.call_later(
+                        self.batching.window, self._flush, group, shared
+                    )
+        # Cancelling one caller must not cancel the others sharing the key.
+        return await asyncio.shield(future)
+
+    def _flush(self, group: Hashable, shared: dict):
+        with self._lock:
+            self._dispatch(group, shared)
+
+    def _dispatch(self, group: Hashable, shared: dict):
+        pending = self._pending.pop(group, None)
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        if not pending:
+            return
+        task = asyncio.ensure_future(self._run(shared, pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, shared: dict, pending: Dict[Any, asyncio.Future]):
+        keys = list(pending)
+        try:
+            try:
+                results = await self.load_batch(shared, keys)
+            except Exception as exc:
+                results = [exc] * len(keys)
+            for key, result in zip(keys, results):
+                future = pending[key]
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            # A cancelled batch must not leave its callers waiting forever.
+            for future in pending.values():
+                future.cancel()
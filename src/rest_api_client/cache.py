@@ -0,0 +1,338 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# Entry access times are only rewritten when older than this, so that
+# cache hits rarely need a write transaction.
+ACCESS_RESOLUTION = 60.0
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    content_type TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """A decoded response plus the validators needed to revalidate it."""
+
+    value: Any
+    expires_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Set for raw response bodies, which are decoded again on every hit.
+    content_type: Optional[str] = None
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = time.monotonic()
+        return now < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """In-memory LRU cache for GET endpoint responses.
+
+    Entries are keyed by the resolved URL and the request headers named in
+    ``vary_headers`` (all request headers when omitted). An endpoint is
+    cached when it declares ``cache_ttl`` or when ``default_ttl`` is set.
+    Expired entries that carry an ``ETag`` or ``Last-Modified`` validator
+    are revalidated with a conditional request, and a ``304 Not Modified``
+    reuses the stored value without decoding the body again.
+    """
+
+    # Entries hold decoded values, not response bodies.
+    raw_bodies = False
+    # Lookups are cheap enough to run on the event loop.
+    blocking = False
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        default_ttl: Optional[float] = None,
+        vary_headers: Optional[Iterable[str]] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("Cache max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.vary_headers = tuple(vary_headers) if vary_headers is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def make_key(self, url: str, headers: Dict[str, str]) -> Tuple:
+        if self.vary_headers is None:
+            return (url, tuple(headers.items()))
+        return (url, tuple(headers.get(name) for name in self.vary_headers))
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for `key`, fresh or not, counting hits and misses."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.is_fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: Hashable, entry: CacheEntry, ttl: float):
+        """Extend a revalidated entry after a 304 Not Modified."""
+        entry.expires_at = time.monotonic() + ttl
+        with self._lock:
+            self.revalidations += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "entries": len(self._entries),
+        }
+
+
+class SQLiteCache:
+    """Response cache in a SQLite database shared by several processes.
+
+    Entries hold the raw response body with its validators, so any process
+    using the same database file can serve or revalidate them; bodies are
+    decoded again on every hit. Keys are hashes of the resolved URL and the
+    request headers named in ``vary_headers`` (all of them when omitted).
+    The database runs in WAL mode, so readers are never blocked by a
+    writer, and the least recently used entries are evicted once the
+    bodies take more than ``max_bytes``.
+
+    Each thread, and each process after a fork, opens its own connection.
+    """
+
+    raw_bodies = True
+    # Disk I/O may wait for another process's write lock, so async calls
+    # run it in an executor.
+    blocking = True
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: Optional[float] = None,
+        vary_headers: Optional[Iterable[str]] = None,
+        timeout: float = 30.0,
+    ):
+        if max_bytes < 1:
+            raise ValueError("Cache max_bytes must be at least 1.")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.vary_headers = tuple(vary_headers) if vary_headers is not None else None
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                str(self.path),
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def make_key(self, url: str, headers: Dict[str, str]) -> str:
+        if self.vary_headers is None:
+            items: Iterable[Tuple[str, Optional[str]]] = headers.items()
+        else:
+            items = ((name, headers.get(name)) for name in self.vary_headers)
+        digest = hashlib.sha256(url.encode("utf-8"))
+        for name, value in items:
+            digest.update(f"\n{name.lower()}: {value}".encode("utf-8"))
+        # Hashed, so that credentials in headers are never written to disk.
+        return digest.hexdigest()
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Return the entry for `key`, fresh or not, counting hits and misses."""
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT body, content_type, etag, last_modified, expires_at, accessed_at"
+            " FROM responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        body, content_type, etag, last_modified, expires_at, accessed_at = row
+        now = time.time()
+        if accessed_at < now - ACCESS_RESOLUTION:
+            connection.execute(
+                "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        # Stored expiry times are wall clock times, valid across processes.
+        entry = CacheEntry(
+            value=body,
+            expires_at=time.monotonic() + expires_at - now,
+            etag=etag,
+            last_modified=last_modified,
+            content_type=content_type,
+        )
+        if entry.is_fresh():
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry
+
+    def set(self, key: Hashable, entry: CacheEntry):
+        body = entry.value
+        if not isinstance(body, (bytes, bytearray, memoryview)):
+            raise TypeError("SQLiteCache stores raw response bodies only.")
+        size = len(body)
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    body,
+                    entry.content_type,
+                    entry.etag,
+                    entry.last_modified,
+                    now + entry.expires_at - time.monotonic(),
+                    now,
+                    size,
+                ),
+            )
+            self._evict(connection)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _evict(self, connection: sqlite3.Connection):
+        (total,) = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+        if total <= self.max_bytes:
+            return
+        connection.execute(
+            "DELETE FROM responses WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS kept"
+            "  FROM responses"
+            " ) WHERE kept > ?"
+            ")",
+            (self.max_bytes,),
+        )
+
+    def refresh(self, key: Hashable, entry: CacheEntry, ttl: float):
+        """Extend a revalidated entry after a 304 Not Modified."""
+        entry.expires_at = time.monotonic() + ttl
+        now = time.time()
+        self.revalidations += 1
+        self._connection().execute(
+            "UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?",
+            (now + ttl, now, key),
+        )
+
+    def invalidate(self, key: Hashable):
+        self._connection().execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        self._connection().execute("DELETE FROM responses")
+
+    def close(self):
+        with self._lock:
+            connections = self._connections
+            self._connections = []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        (count,) = (
+            self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()
+        )
+        return count
+
+    @property
+    def size(self) -> int:
+        """Total size of the stored bodies, in bytes."""
+        (total,) = (
+            self._connection()
+            .execute("SELECT COALESCE(SUM(size), 0) FROM responses")
+            .fetchone()
+        )
+        return total
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "entries": len(self),
+        }
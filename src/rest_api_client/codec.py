@@ -0,0 +1,76 @@
+import json
+from typing import Any
+
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+
+
+def encode_default(value: Any) -> Any:
+    """Fallback for values the JSON backend cannot serialize natively.
+
+    Pydantic models are serialized by alias, so models built from an API's
+    field names round-trip, and other types (datetimes, UUIDs, enums,
+    decimals...) follow pydantic's own JSON encoding.
+    """
+    if isinstance(value, BaseModel):
+        return value.dict(by_alias=True)
+    return pydantic_encoder(value)
+
+
+class JSONCodec:
+    """Encodes request bodies to JSON bytes and decodes JSON responses."""
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, content: bytes) -> Any:
+        raise NotImplementedError
+
+    def decode(self, response: Any) -> Any:
+        return self.loads(response.content)
+
+
+class StdlibJSONCodec(JSONCodec):
+    """The standard library ``json`` module, the default codec."""
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(
+            value, default=encode_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+    def loads(self, content: bytes) -> Any:
+        return json.loads(content)
+
+    def decode(self, response: Any) -> Any:
+        # httpx honours the response charset before handing over to json.
+        return response.json()
+
+
+class OrjsonCodec(JSONCodec):
+    """``orjson`` backend; ``option`` is passed to ``orjson.dumps``."""
+
+    def __init__(self, option: int = 0):
+        try:
+            import orjson  # type: ignore
+        except ImportError as exc:
+            raise ImportError("OrjsonCodec needs orjson installed.") from exc
+        self._orjson = orjson
+        self.option = option
+
+    def dumps(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, default=encode_default, option=self.option)
+
+    def loads(self, content: bytes) -> Any:
+        return self._orjson.loads(content)
+
+    def __reduce__(self):
+        # Module objects do not pickle; re-import in the receiving process.
+        return OrjsonCodec, (self.option,)
+
+
+def fastest_codec() -> JSONCodec:
+    """The fastest installed codec, falling back to the standard library."""
+    try:
+        return OrjsonCodec()
+    except ImportError:
+        return StdlibJSONCodec()
@@ -0,0 +1,391 @@
+import builtins
+import json
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
+
+from .compression import Compression
+from .decoding import DecodeMode
+from .downloads import ByteStream, Download
+from .lib import DOWNLOAD_KINDS, Endpoint, HTTPMethod, RestAPI
+from .materialize import Materialization, ResponseShape
+from .streaming import StreamFormat
+
+PACKAGE = __name__.rsplit(".", 1)[0]
+MAX_LINE_LENGTH = 88
+INDENT = "    "
+BODY_METHODS = {HTTPMethod.POST, HTTPMethod.PUT, HTTPMethod.PATCH}
+# Passes URL validation when no api_url is given; never requested.
+PLACEHOLDER_URL = "https://localhost.invalid"
+# Endpoint fields holding runtime objects, passed through endpoint_options.
+RUNTIME_FIELDS = (
+    "pagination",
+    "retry_policy",
+    "rate_limit",
+    "concurrency_limit",
+    "batching",
+    "codec",
+)
+
+METHOD_TEMPLATES = {
+    "sync": ("def", "call_endpoint", "Synchronous endpoint call.", "{}"),
+    "async": (
+        "async def",
+        "call_async_endpoint",
+        "Asynchronous endpoint call.",
+        "{}",
+    ),
+    "iter": (
+        "def",
+        "iter_endpoint",
+        "Lazily iterate over the items of every page.",
+        "Iterator[{}]",
+    ),
+    "aiter": (
+        "def",
+        "aiter_endpoint",
+        "Asynchronously iterate over the items of every page.",
+        "AsyncIterator[{}]",
+    ),
+    "stream": (
+        "def",
+        "stream_endpoint",
+        "Yield items while the response body downloads.",
+        "Iterator[{}]",
+    ),
+    "astream": (
+        "def",
+        "astream_endpoint",
+        "Asynchronously yield items while the response body downloads.",
+        "AsyncIterator[{}]",
+    ),
+    "download": (
+        "def",
+        "download_endpoint",
+        "Download the response to a path, file or buffer.",
+        "int",
+    ),
+    "adownload": (
+        "async def",
+        "adownload_endpoint",
+        "Asynchronously download the response to a destination.",
+        "int",
+    ),
+    "open": (
+        "def",
+        "open_endpoint",
+        "Open the response as a stream of byte chunks.",
+        "ContextManager[ByteStream]",
+    ),
+    "aopen": (
+        "def",
+        "aopen_endpoint",
+        "Asynchronously open the response as a stream of byte chunks.",
+        "AsyncContextManager[ByteStream]",
+    ),
+}
+
+
+class _Imports:
+    def __init__(self) -> None:
+        self.modules: Dict[str, Set[str]] = {}
+
+    def add(self, module: str, name: str):
+        self.modules.setdefault(module, set()).add(name)
+
+    def reference(self, value: type) -> str:
+        """Import a class by name and return the expression that refers to it."""
+        if value.__module__ == builtins.__name__:
+            return value.__qualname__
+        if value.__module__ == "__main__" or "<locals>" in value.__qualname__:
+            raise ValueError(
+                f"{value.__qualname__} must be importable from a module to be exported."
+            )
+        self.add(value.__module__, value.__qualname__.split(".")[0])
+        return value.__qualname__
+
+    def render(self) -> List[str]:
+        lines = []
+        # Standard library first, like the rest of the package.
+        for module in sorted(self.modules, key=lambda name: (name != "typing", name)):
+            names = sorted(self.modules[module])
+            line = f"from {module} import {', '.join(names)}"
+            if len(line) <= MAX_LINE_LENGTH:
+                lines.append(line)
+                continue
+            lines.append(f"from {module} import (")
+            lines.extend(f"{INDENT}{name}," for name in names)
+            lines.append(")")
+        return lines
+
+
+def generate_client_source(
+    source: Union[RestAPI, Iterable[Endpoint]],
+    class_name: str = "GeneratedClient",
+    api_url: Optional[str] = None,
+    custom_headers: Optional[Dict[str, str]] = None,
+) -> str:
+    """Render a module with a static RestAPI subclass for the given endpoints.
+
+    The generated class defines every endpoint method as a plain method with
+    a concrete, annotated signature, so nothing is built with ``makefun`` at
+    import or construction time and type checkers can see the methods.
+    ``source`` is either a RestAPI instance, whose URL and custom headers
+    become the defaults, or a list of endpoints.
+
+    Pagination, retry policies, rate and concurrency limits, batching and
+    JSON codecs are runtime objects and are not exported; pass them to the
+    generated client as ``endpoint_options``.
+    """
+    if isinstance(source, RestAPI):
+        endpoints = list(source.endpoints.values())
+        api_url = api_url or str(source.api_url.full_string)
+        if custom_headers is None:
+            custom_headers = source._custom_headers
+    else:
+        endpoints = list(source)
+
+    # Register copies on a throwaway client to infer methods and path
+    # parameters exactly as the dynamic client does.
+    resolver = RestAPI(
+        api_url=api_url or PLACEHOLDER_URL,
+        endpoints=[endpoint.copy() for endpoint in endpoints],
+        lazy_methods=True,
+    )
+
+    imports = _Imports()
+    imports.add("typing", "Any")
+    imports.add("typing", "Dict")
+    imports.add("typing", "List")
+    imports.add("typing", "Optional")
+    imports.add(f"{PACKAGE}.lib", "Endpoint")
+    imports.add(f"{PACKAGE}.lib", "HTTPMethod")
+    imports.add(f"{PACKAGE}.lib", "RestAPI")
+
+    definitions = []
+    methods = []
+    for endpoint in resolver.endpoints.values():
+        definitions.extend(_endpoint_definition(endpoint, imports))
+        for attribute, kind in resolver._method_kinds(endpoint).items():
+            methods.append(_method_source(endpoint, attribute, kind, imports))
+
+    lines = [
+        f'"""Static REST API client generated by {PACKAGE}.codegen. Do not edit."""',
+        "",
+        *imports.render(),
+        "",
+        f"API_URL: {'Optional[str]' if api_url is None else 'str'} = {_literal(api_url)}",
+        f"CUSTOM_HEADERS: Optional[Dict[str, str]] = {_literal(custom_headers)}",
+        "",
+        "",
+        "def build_endpoints(",
+        f"{INDENT}endpoint_options: Optional[Dict[str, Dict[str, Any]]] = None,",
+        ") -> List[Endpoint]:",
+        f"{INDENT}options = endpoint_options or {{}}",
+        f"{INDENT}return [",
+        *definitions,
+        f"{INDENT}]",
+        "",
+        "",
+        f"class {class_name}(RestAPI):",
+        f"{INDENT}def __init__(",
+        f"{INDENT * 2}self,",
+        # Without a driver, RestAPI creates a managed HttpDriver.
+        f"{INDENT * 2}driver: Optional[Any] = None,",
+        f"{INDENT * 2}api_url: {'Optional[str]' if api_url is None else 'str'} = API_URL,",
+        f"{INDENT * 2}custom_headers: Optional[Dict[str, str]] = CUSTOM_HEADERS,",
+        f"{INDENT * 2}endpoint_options: Optional[Dict[str, Dict[str, Any]]] = None,",
+        f"{INDENT * 2}**options: Any,",
+        f"{INDENT}):",
+        *(
+            [
+                f"{INDENT * 2}if api_url is None:",
+                f'{INDENT * 3}raise ValueError("api_url is required.")',
+            ]
+            if api_url is None
+            else []
+        ),
+        f"{INDENT * 2}super().__init__(",
+        f"{INDENT * 3}api_url=api_url,",
+        f"{INDENT * 3}driver=driver,",
+        f"{INDENT * 3}endpoints=build_endpoints(endpoint_options),",
+        f"{INDENT * 3}custom_headers=custom_headers,",
+        f"{INDENT * 3}**options,",
+        f"{INDENT * 2})",
+    ]
+    for method in methods:
+        lines.append("")
+        lines.extend(method)
+    return "\n".join(lines) + "\n"
+
+
+def write_client_module(
+    path: Union[str, Path],
+    source: Union[RestAPI, Iterable[Endpoint]],
+    class_name: str = "GeneratedClient",
+    **kwargs: Any,
+) -> Path:
+    """Write the module rendered by ``generate_client_source`` to ``path``."""
+    path = Path(path)
+    path.write_text(generate_client_source(source, class_name, **kwargs))
+    return path
+
+
+def _endpoint_definition(endpoint: Endpoint, imports: _Imports) -> List[str]:
+    assert endpoint.method is not None
+    fields = [
+        f"name={_literal(endpoint.name)}",
+        f"path={_literal(endpoint.path)}",
+        f"method=HTTPMethod.{endpoint.method.name}",
+    ]
+    if endpoint.model is not None:
+        fields.append(f"model={imports.reference(endpoint.model)}")
+    if endpoint.query_parameters:
+        types = ", ".join(
+            f"{_literal(name)}: {imports.reference(kind)}"
+            for name, kind in endpoint.query_parameters.items()
+        )
+        fields.append(f"query_parameters={{{types}}}")
+    if endpoint.cache_ttl is not None:
+        fields.append(f"cache_ttl={endpoint.cache_ttl!r}")
+    if endpoint.streaming is not None:
+        stream_format = imports.reference(StreamFormat)
+        fields.append(f"streaming={stream_format}.{endpoint.streaming.name}")
+    if endpoint.decode is not None:
+        decode_mode = imports.reference(DecodeMode)
+        fields.append(f"decode={decode_mode}.{endpoint.decode.name}")
+    if endpoint.download is not None:
+        options = _options(endpoint.download, imports)
+        fields.append(f"download={imports.reference(Download)}({options})")
+    if endpoint.compression is not None:
+        options = _options(endpoint.compression, imports)
+        fields.append(f"compression={imports.reference(Compression)}({options})")
+    if endpoint.response_shape != ResponseShape.SINGLE:
+        fields.append(f"response_shape=ResponseShape.{endpoint.response_shape.name}")
+        imports.reference(ResponseShape)
+    if endpoint.materialization != Materialization.VALIDATE:
+        fields.append(
+            f"materialization=Materialization.{endpoint.materialization.name}"
+        )
+        imports.reference(Materialization)
+    fields.append(f"**options.get({_literal(endpoint.name)}, {{}})")
+
+    lines = [f"{INDENT * 2}Endpoint("]
+    lines.extend(f"{INDENT * 3}{field}," for field in fields)
+    lines.append(f"{INDENT * 2}),")
+    missing = [name for name in RUNTIME_FIELDS if getattr(endpoint, name) is not None]
+    if missing:
+        lines.insert(
+            0, f"{INDENT * 2}# Set {', '.join(missing)} through endpoint_options."
+        )
+    return lines
+
+
+def _method_source(
+    endpoint: Endpoint, attribute: str, kind: str, imports: _Imports
+) -> List[str]:
+    definition, target, docstring, annotation = METHOD_TEMPLATES[kind]
+    if kind in ("iter", "stream"):
+        imports.add("typing", "Iterator")
+    elif kind in ("aiter", "astream"):
+        imports.add("typing", "AsyncIterator")
+    elif kind == "open":
+        imports.add("typing", "ContextManager")
+        imports.reference(ByteStream)
+    elif kind == "aopen":
+        imports.add("typing", "AsyncContextManager")
+        imports.reference(ByteStream)
+
+    item_type = _item_type(endpoint, imports)
+    if kind in ("sync", "async"):
+        return_type = _response_type(endpoint, item_type, imports)
+    else:
+        return_type = annotation.format(item_type)
+
+    parameters = ["self"]
+    arguments = [_literal(endpoint.name)]
+    if kind in DOWNLOAD_KINDS:
+        imports.add(f"{PACKAGE}.downloads", "Destination")
+        parameters.append("destination: Destination")
+        arguments.append("destination")
+    if endpoint.method in BODY_METHODS:
+        imports.add("pydantic", "BaseModel")
+        parameters.append("data: Optional[BaseModel] = None")
+        arguments.append("data=data")
+    for name in endpoint.path_parameters or ():
+        parameters.append(f"{name}: Optional[str] = None")
+        arguments.append(f"{name}={name}")
+    for name, kind_type in (endpoint.query_parameters or {}).items():
+        parameters.append(f"{name}: Optional[{imports.reference(kind_type)}] = None")
+        arguments.append(f"{name}={name}")
+    if kind in DOWNLOAD_KINDS:
+        imports.add(f"{PACKAGE}.downloads", "Progress")
+        parameters.append("progress: Optional[Progress] = None")
+        parameters.append("resume: bool = False")
+        arguments.extend(["progress=progress", "resume=resume"])
+
+    head = f"{INDENT}{definition} {attribute}("
+    tail = f") -> {return_type}:"
+    signature = head + ", ".join(parameters) + tail
+    if len(signature) <= MAX_LINE_LENGTH:
+        lines = [signature]
+    else:
+        lines = [head]
+        lines.extend(f"{INDENT * 2}{parameter}," for parameter in parameters)
+        lines.append(INDENT + tail)
+
+    awaited = "await " if definition == "async def" else ""
+    call = f"{INDENT * 2}return {awaited}self.{target}(" + ", ".join(arguments) + ")"
+    if len(call) > MAX_LINE_LENGTH:
+        call = f"{INDENT * 2}return {awaited}self.{target}(\n"
+        call += "".join(f"{INDENT * 3}{argument},\n" for argument in arguments)
+        call += f"{INDENT * 2})"
+    lines.append(f'{INDENT * 2}"""{docstring}"""')
+    lines.append(call)
+    return lines
+
+
+def _literal(value: Any) -> str:
+    """Source for a literal, with double-quoted strings as black writes them."""
+    if isinstance(value, str):
+        return json.dumps(value)
+    if isinstance(value, dict):
+        items = ", ".join(f"{_literal(k)}: {_literal(v)}" for k, v in value.items())
+        return f"{{{items}}}"
+    return repr(value)
+
+
+def _options(settings: Any, imports: _Imports) -> str:
+    """Keyword arguments rebuilding a frozen settings model, defaults left out."""
+    values = settings.dict(exclude_defaults=True)
+    return ", ".join(
+        f"{name}={_value(value, imports)}" for name, value in values.items()
+    )
+
+
+def _value(value: Any, imports: _Imports) -> str:
+    if isinstance(value, Enum):
+        return f"{imports.reference(type(value))}.{value.name}"
+    if isinstance(value, tuple):
+        items = ", ".join(_value(item, imports) for item in value)
+        return f"({items},)" if len(value) == 1 else f"({items})"
+    return _literal(value)
+
+
+def _item_type(endpoint: Endpoint, imports: _Imports) -> str:
+    # Lazy materialization returns LazyModel proxies instead of the model.
+    if endpoint.model is None or endpoint.materialization == Materialization.LAZY:
+        return "Any"
+    return imports.reference(endpoint.model)
+
+
+def _response_type(endpoint: Endpoint, item_type: str, imports: _Imports) -> str:
+    if endpoint.download is not None:
+        return "bytes"
+    if item_type == "Any":
+        return item_type
+    if endpoint.response_shape == ResponseShape.LIST:
+        return f"List[{item_type}]"
+    if endpoint.response_shape == ResponseShape.DICT:
+        return f"Dict[str, {item_type}]"
+    return item_type
@@ -0,0 +1,162 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional
+
+import httpx
+
+OVERLOAD_STATUS_CODES = (429, 503)
+# How fast the latency baseline follows latencies above it.
+BASELINE_DRIFT = 0.01
+
+
+class AdaptiveLimiter:
+    """AIMD limit on the number of async requests in flight.
+
+    Each request that completes without a sign of overload raises the limit
+    by ``increase / limit``, i.e. by about ``increase`` per window of
+    ``limit`` requests, up to ``max_limit``. A response with one of
+    ``overload_status_codes``, a timeout or a latency above
+    ``latency_tolerance`` times the baseline (the lowest latency seen,
+    slowly drifting up) multiplies it by ``backoff``, down to
+    ``min_limit``. Only requests started after the last decrease can
+    decrease it again, so one burst of failures cuts the limit once.
+
+    Requests over the limit wait in a FIFO queue without blocking the
+    event loop; ``limit``, ``in_flight`` and ``queue_depth`` can be
+    monitored while it runs.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.5,
+        increase: float = 1.0,
+        latency_tolerance: float = 2.0,
+        overload_status_codes: Iterable[int] = OVERLOAD_STATUS_CODES,
+    ):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min <= initial <= max.")
+        if not 0 < backoff < 1:
+            raise ValueError("Backoff must be between 0 and 1.")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.increase = increase
+        self.latency_tolerance = latency_tolerance
+        self.overload_status_codes = frozenset(overload_status_codes)
+        self.baseline: Optional[float] = None
+        self.decreases = 0
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._decreased_at = float("-inf")
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        return {
+            "limit": self.limit,
+            "in_flight": self._in_flight,
+            "queue_depth": len(self._waiters),
+            "decreases": self.decreases,
+        }
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the start time to pass to ``release``."""
+        with self._lock:
+            if self._in_flight < self.limit and not self._waiters:
+                self._in_flight += 1
+                return time.perf_counter()
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    # Granted a slot just before being cancelled.
+                    self._release_slot()
+            raise
+        return time.perf_counter()
+
+    def release(
+        self,
+        started: float,
+        status_code: Optional[int] = None,
+        error: Optional[BaseException] = None,
+        latency: Optional[float] = None,
+    ):
+        """Free a slot and adapt the limit to how the request went.
+
+        Errors other than timeouts say nothing about load and leave the
+        limit as it is. ``latency`` defaults to the time since ``started``;
+        streams pass the time to the response headers instead.
+        """
+        if latency is None:
+            latency = time.perf_counter() - started
+        with self._lock:
+            if isinstance(error, httpx.TimeoutException) or (
+                status_code in self.overload_status_codes
+            ):
+                self._decrease(started)
+            elif error is None:
+                self._observe(started, latency)
+            self._release_slot()
+
+    def _observe(self, started: float, latency: float):
+        baseline = self.baseline
+        if baseline is None or latency < baseline:
+            self.baseline = latency
+        else:
+            self.baseline = baseline + (latency - baseline) * BASELINE_DRIFT
+            if latency > baseline * self.latency_tolerance:
+                self._decrease(started)
+                return
+        # Only grow when the limit is actually what holds requests back.
+        if self._in_flight * 2 >= self._limit:
+            self._limit = min(
+                float(self.max_limit), self._limit + self.increase / self._limit
+            )
+
+    def _decrease(self, started: float):
+        if started < self._decreased_at:
+            return
+        self._decreased_at = time.perf_counter()
+        self._limit = max(float(self.min_limit), self._limit * self.backoff)
+        self.decreases += 1
+
+    def _release_slot(self):
+        self._in_flight -= 1
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            # Waiters may belong to another thread's event loop.
+            waiter.get_loop().call_soon_threadsafe(self._wake, waiter)
+
+    def _wake(self, waiter: asyncio.Future):
+        if waiter.done():
+            # Cancelled after the slot was handed over: pass it on.
+            with self._lock:
+                self._release_slot()
+        else:
+            waiter.set_result(None)
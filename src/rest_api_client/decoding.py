@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+from .codec import JSONCodec
+from .materialize import Materialization, ResponseShape, materialize
+
+
+class DecodeMode(Enum):
+    # On the event loop thread, the default.
+    INLINE = "inline"
+    # In a thread pool: the body is shared, not copied.
+    THREAD = "thread"
+    # In a process pool: the body and the result are pickled across.
+    PROCESS = "process"
+
+
+class DecodeExecutor:
+    """Runs JSON decoding and model building of async responses off the loop.
+
+    ``mode`` applies to responses whose body is at least ``threshold``
+    bytes long (all responses when ``threshold`` is None); smaller ones are
+    decoded inline. An endpoint's ``decode`` setting overrides both. Pools
+    are created on first use and sized by ``max_workers``.
+
+    With ``DecodeMode.PROCESS`` the endpoint model must be importable, so
+    that it can be pickled.
+    """
+
+    def __init__(
+        self,
+        mode: DecodeMode = DecodeMode.THREAD,
+        threshold: Optional[int] = None,
+        max_workers: Optional[int] = None,
+    ):
+        self.mode = mode
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self._executors: Dict[DecodeMode, Executor] = {}
+        self._lock = threading.Lock()
+
+    def select(self, endpoint_mode: Optional[DecodeMode], size: int) -> DecodeMode:
+        if endpoint_mode is not None:
+            return endpoint_mode
+        if self.threshold is not None and size < self.threshold:
+            return DecodeMode.INLINE
+        return self.mode
+
+    def executor(self, mode: DecodeMode) -> Executor:
+        executor = self._executors.get(mode)
+        if executor is None:
+            with self._lock:
+                executor = self._executors.get(mode)
+                if executor is None:
+                    if mode == DecodeMode.PROCESS:
+                        executor = ProcessPoolExecutor(self.max_workers)
+                    else:
+                        executor = ThreadPoolExecutor(
+                            self.max_workers, thread_name_prefix="rest-api-decode"
+                        )
+                    self._executors[mode] = executor
+        return executor
+
+    async def run(
+        self,
+        mode: DecodeMode,
+        codec: JSONCodec,
+        content: bytes,
+        model: Optional[type],
+        shape: ResponseShape,
+        materialization: Materialization,
+    ) -> Tuple[bool, Any, float, float]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor(mode),
+            decode_payload,
+            codec,
+            content,
+            model,
+            shape,
+            materialization,
+        )
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=wait)
+
+
+def decode_payload(
+    codec: JSONCodec,
+    content: bytes,
+    model: Optional[type],
+    shape: ResponseShape,
+    materialization: Materialization,
+) -> Tuple[bool, Any, float, float]:
+    """Decode a JSON body and build its models, in whatever worker runs it.
+
+    Returns whether the body was JSON, the result, and the seconds spent
+    decoding and building models.
+    """
+    started = time.perf_counter()
+    try:
+        body = codec.loads(content)
+    except ValueError:
+        return False, None, time.perf_counter() - started, 0.0
+    decoded = time.perf_counter()
+    if model is not None:
+        body = materialize(model, body, shape, materialization)
+    return True, body, decoded - started, time.perf_counter() - decoded
@@ -0,0 +1,302 @@
+import os
+import re
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    ContextManager,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import httpx
+from pydantic import BaseModel
+
+DEFAULT_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+BINARY_MIMETYPE_PREFIXES = ("application/", "image/", "audio/", "video/", "font/")
+TEXT_MIMETYPE_MARKERS = ("json", "xml", "javascript", "x-www-form-urlencoded")
+CONTENT_RANGE_PATTERN = re.compile(r"bytes (?:(\d+)-\d+|\*)/(\d+|\*)")
+
+# A path, a writable binary file, or a writable buffer such as a bytearray
+# or an mmap object.
+Destination = Union[str, "os.PathLike[str]", IO[bytes], bytearray, memoryview]
+# Called after each chunk with the bytes written so far and the total size,
+# when the server sent one.
+Progress = Callable[[int, Optional[int]], None]
+
+
+class Download(BaseModel):
+    """Marks an endpoint as a binary download.
+
+    Its response body is never decoded: the endpoint methods return bytes,
+    and ``download_`` and ``open_`` methods stream it in ``chunk_size``
+    chunks. A body cut off by a network error is resumed with a Range
+    request up to ``max_resumes`` times, if the server supports ranges.
+    """
+
+    chunk_size: int = DEFAULT_DOWNLOAD_CHUNK_SIZE
+    max_resumes: int = 3
+
+    class Config:
+        allow_mutation = False
+
+
+class ByteStream:
+    """A binary response body, iterated in ``chunk_size`` chunks."""
+
+    def __init__(self, response: httpx.Response, chunk_size: int):
+        self.response = response
+        self.chunk_size = chunk_size
+
+    @property
+    def length(self) -> Optional[int]:
+        length = self.response.headers.get("Content-Length")
+        return int(length) if length is not None else None
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self.response.iter_bytes(self.chunk_size)
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.response.aiter_bytes(self.chunk_size)
+
+    def read(self) -> bytes:
+        return self.response.read()
+
+    async def aread(self) -> bytes:
+        return await self.response.aread()
+
+
+class Sink:
+    """Where a download is written; ``offset`` counts the bytes already there."""
+
+    offset = 0
+
+    def write(self, chunk: bytes):
+        raise NotImplementedError
+
+    def reserve(self, total: Optional[int]):
+        pass
+
+    def restart(self):
+        """Discard what was written, when the server resends the whole body."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class FileSink(Sink):
+    """Writes to a binary file from its current position.
+
+    With ``resume`` the bytes before that position count as downloaded.
+    """
+
+    def __init__(self, file: IO[bytes], resume: bool = False, owned: bool = False):
+        self.file = file
+        self.owned = owned
+        position = file.tell()
+        self.start = 0 if resume else position
+        self.offset = position - self.start
+
+    def write(self, chunk: bytes):
+        self.file.write(chunk)
+        self.offset += len(chunk)
+
+    def restart(self):
+        self.file.seek(self.start)
+        self.file.truncate()
+        self.offset = 0
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+
+
+class BufferSink(Sink):
+    """Copies chunks into a pre-allocated buffer, which must be large enough."""
+
+    def __init__(self, buffer: Any):
+        self.view = memoryview(buffer).cast("B")
+        if self.view.readonly:
+            raise TypeError("Download buffers must be writable.")
+
+    def write(self, chunk: bytes):
+        start = self.offset
+        end = start + len(chunk)
+        if end > len(self.view):
+            raise ValueError("Download is larger than the destination buffer.")
+        self.view[start:end] = chunk
+        self.offset = end
+
+    def reserve(self, total: Optional[int]):
+        if total is not None and total > len(self.view):
+            raise ValueError(
+                f"Download of {total} bytes does not fit in a "
+                f"{len(self.view)} byte buffer."
+            )
+
+    def restart(self):
+        self.offset = 0
+
+
+def open_sink(destination: Destination, resume: bool = False) -> Sink:
+    if isinstance(destination, (str, os.PathLike)):
+        path = Path(destination)
+        if resume and path.exists():
+            file = open(path, "r+b")
+            file.seek(0, os.SEEK_END)
+            return FileSink(file, resume=True, owned=True)
+        return FileSink(open(path, "wb"), owned=True)
+    if hasattr(destination, "write"):
+        # mmap objects have a write method too, but are written as buffers.
+        try:
+            memoryview(destination)  # type: ignore
+        except TypeError:
+            return FileSink(destination, resume)  # type: ignore
+    return BufferSink(destination)
+
+
+def range_headers(offset: int) -> dict:
+    """Request headers for the body from ``offset`` onwards.
+
+    Ranges count bytes of the encoded body, so downloads are never
+    content-encoded.
+    """
+    headers = {"Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    return headers
+
+
+def download(
+    destination: Destination,
+    send: Callable[[int], ContextManager[httpx.Response]],
+    options: Download,
+    progress: Optional[Progress] = None,
+    resume: bool = False,
+) -> int:
+    """Write a response body to ``destination`` chunk by chunk.
+
+    ``send`` opens a streamed response for the body from the given offset.
+    Returns the size of the downloaded content.
+    """
+    sink = open_sink(destination, resume)
+    resumes = 0
+    try:
+        while True:
+            resumable = False
+            try:
+                with send(sink.offset) as response:
+                    total, has_body = _begin(response, sink)
+                    resumable = _accepts_ranges(response)
+                    if has_body:
+                        for chunk in response.iter_bytes(options.chunk_size):
+                            sink.write(chunk)
+                            if progress is not None:
+                                progress(sink.offset, total)
+                return sink.offset
+            except httpx.TransportError:
+                if not resumable or resumes >= options.max_resumes:
+                    raise
+                resumes += 1
+    finally:
+        sink.close()
+
+
+async def adownload(
+    destination: Destination,
+    send: Callable[[int], AsyncContextManager[httpx.Response]],
+    options: Download,
+    progress: Optional[Progress] = None,
+    resume: bool = False,
+) -> int:
+    """Async version of ``download``.
+
+    Chunks are written to files on the event loop thread.
+    """
+    sink = open_sink(destination, resume)
+    resumes = 0
+    try:
+        while True:
+            resumable = False
+            try:
+                async with send(sink.offset) as response:
+                    total, has_body = _begin(response, sink)
+                    resumable = _accepts_ranges(response)
+                    if has_body:
+                        async for chunk in response.aiter_bytes(options.chunk_size):
+                            sink.write(chunk)
+                            if progress is not None:
+                                progress(sink.offset, total)
+                return sink.offset
+            except httpx.TransportError:
+                if not resumable or resumes >= options.max_resumes:
+                    raise
+                resumes += 1
+    finally:
+        sink.close()
+
+
+def is_binary_content_type(content_type: Optional[str]) -> bool:
+    """Whether a response with this Content-Type carries bytes, not text.
+
+    Responses without a Content-Type are treated as text.
+    """
+    if not content_type:
+        return False
+    mimetype = content_type.split(";", 1)[0].strip().lower()
+    if any(marker in mimetype for marker in TEXT_MIMETYPE_MARKERS):
+        return False
+    return mimetype.startswith(BINARY_MIMETYPE_PREFIXES)
+
+
+def _begin(response: httpx.Response, sink: Sink) -> Tuple[Optional[int], bool]:
+    """Check a response against the bytes already in ``sink``.
+
+    Returns the total size, if known, and whether the body should be read.
+    """
+    if response.status_code == httpx.codes.REQUESTED_RANGE_NOT_SATISFIABLE:
+        _, total = _content_range(response)
+        if sink.offset and total == sink.offset:
+            # Resuming a download that had already finished.
+            return total, False
+    response.raise_for_status()
+    if response.status_code == httpx.codes.PARTIAL_CONTENT:
+        start, total = _content_range(response)
+        if start != sink.offset:
+            raise ValueError(
+                f"Expected the body from byte {sink.offset}, got it from {start}."
+            )
+    else:
+        # The server ignored the range and sent the whole body.
+        if sink.offset:
+            sink.restart()
+        length = response.headers.get("Content-Length")
+        total = int(length) if length is not None else None
+    sink.reserve(total)
+    return total, True
+
+
+def _content_range(response: httpx.Response) -> Tuple[Optional[int], Optional[int]]:
+    match = CONTENT_RANGE_PATTERN.fullmatch(
+        response.headers.get("Content-Range", "").strip()
+    )
+    if match is None:
+        return None, None
+    start, total = match.groups()
+    return (
+        int(start) if start is not None else None,
+        int(total) if total != "*" else None,
+    )
+
+
+def _accepts_ranges(response: httpx.Response) -> bool:
+    return (
+        response.status_code == httpx.codes.PARTIAL_CONTENT
+        or response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    )
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+import httpx
+from pydantic import BaseModel
+
+logger = logging.getLogger("LIB_LOGGER")
+
+
+class DriverConfig(BaseModel):
+    """Connection pool and protocol settings of an ``HttpDriver``.
+
+    ``keepalive_expiry`` is how long an idle connection stays in the pool.
+    ``warm_up_connections`` is the number of connections ``warm_up`` opens
+    when not told otherwise. ``http2`` needs the ``h2`` package.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: Optional[float] = 5.0
+    http2: bool = False
+    timeout: Optional[float] = 5.0
+    warm_up_connections: int = 1
+
+    class Config:
+        allow_mutation = False
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+
+class HttpDriver:
+    """A pair of sync and async httpx clients sharing one configuration.
+
+    RestAPI sends sync calls through ``session`` and async calls through
+    ``async_session``. Each client is created on first use, so a process
+    that only makes sync calls never opens an async pool. Extra keyword
+    arguments, such as ``auth`` or ``headers``, are passed to both clients.
+    """
+
+    def __init__(self, config: Optional[DriverConfig] = None, **client_kwargs: Any):
+        self.config = config or DriverConfig()
+        if self.config.http2:
+            try:
+                import h2  # type: ignore # noqa: F401
+            except ImportError as exc:
+                raise ImportError(
+                    "HTTP/2 needs the h2 package, install httpx[http2]."
+                ) from exc
+        self.client_kwargs = client_kwargs
+        self._session: Optional[httpx.Client] = None
+        self._async_session: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> httpx.Client:
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = httpx.Client(**self._client_options())
+        return self._session
+
+    @property
+    def async_session(self) -> httpx.AsyncClient:
+        if self._async_session is None:
+            with self._lock:
+                if self._async_session is None:
+                    self._async_session = httpx.AsyncClient(**self._client_options())
+        return self._async_session
+
+    def _client_options(self) -> dict:
+        return {
+            "limits": self.config.limits(),
+            "http2": self.config.http2,
+            "timeout": self.config.timeout,
+            **self.client_kwargs,
+        }
+
+    def warm_up(self, url: str, connections: Optional[int] = None) -> int:
+        return warm_up(
+            self.session, url, connections or self.config.warm_up_connections
+        )
+
+    async def awarm_up(self, url: str, connections: Optional[int] = None) -> int:
+        return await awarm_up(
+            self.async_session, url, connections or self.config.warm_up_connections
+        )
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    async def aclose(self):
+        if self._async_session is not None:
+            await self._async_session.aclose()
+            self._async_session = None
+        self.close()
+
+
+def warm_up(client: httpx.Client, url: str, connections: int = 1) -> int:
+    """Open ``connections`` pooled connections to ``url`` ahead of traffic.
+
+    Sends concurrent HEAD requests, so each one needs its own connection
+    (with HTTP/2 they share one). Any response counts, whatever its status.
+    Returns the number of requests that got a response.
+    """
+    if connections <= 1:
+        return int(_head(client, url))
+    with ThreadPoolExecutor(max_workers=connections) as executor:
+        return sum(executor.map(lambda _: _head(client, url), range(connections)))
+
+
+async def awarm_up(client: httpx.AsyncClient, url: str, connections: int = 1) -> int:
+    results = await asyncio.gather(*(_ahead(client, url) for _ in range(connections)))
+    return sum(results)
+
+
+def _head(client: httpx.Client, url: str) -> bool:
+    try:
+        client.head(url)
+    except httpx.HTTPError as exc:
+        logger.warning("Connection warm-up to %s failed: %s", url, exc)
+        return False
+    return True
+
+
+async def _ahead(client: httpx.AsyncClient, url: str) -> bool:
+    try:
+        await client.head(url)
+    except httpx.HTTPError as exc:
+        logger.warning("Connection warm-up to %s failed: %s", url, exc)
+        return False
+    return True
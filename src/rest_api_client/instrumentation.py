@@ -0,0 +1,284 @@
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+PHASES = ("prepare", "send", "first_byte", "body_read", "decode", "model_build")
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+@dataclass
+class CallMetrics:
+    """Timings of one endpoint call, in seconds.
+
+    ``phases`` holds the phases that apply to the call: ``prepare``,
+    ``send`` (the driver call, including the body for non-streaming
+    requests), ``first_byte`` and ``body_read`` (streaming requests only),
+    ``decode`` and ``model_build``. Phases that repeat, such as ``send``
+    across retries or pages, are summed.
+    """
+
+    endpoint: str
+    method: str
+    started: float
+    start_time: float = field(default_factory=time.time)
+    phases: Dict[str, float] = field(default_factory=dict)
+    status_code: Optional[int] = None
+    error: Optional[BaseException] = None
+    cached: bool = False
+    duration: float = 0.0
+
+    def add(self, phase: str, seconds: float):
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+class Instrumentation:
+    """Receives the metrics of every finished call made through RestAPI."""
+
+    def record(self, metrics: CallMetrics):
+        raise NotImplementedError
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((_format_bound(bound), total))
+        result.append(("+Inf", self.count))
+        return result
+
+
+@dataclass
+class EndpointStats:
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    statuses: Dict[str, int] = field(default_factory=dict)
+    histograms: Dict[str, Histogram] = field(default_factory=dict)
+
+
+class MetricsRecorder(Instrumentation):
+    """In-process aggregation of call counters and latency histograms.
+
+    Keeps, per endpoint, call/error/cache-hit counters, a status code
+    breakdown and one histogram for the total duration plus one per phase.
+    ``to_prometheus`` renders them in the Prometheus text format.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, metrics: CallMetrics):
+        status = str(metrics.status_code) if metrics.status_code else "none"
+        with self._lock:
+            stats = self._endpoints.get(metrics.endpoint)
+            if stats is None:
+                stats = self._endpoints[metrics.endpoint] = EndpointStats()
+            stats.calls += 1
+            if metrics.error is not None:
+                stats.errors += 1
+            if metrics.cached:
+                stats.cache_hits += 1
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            self._observe(stats, "total", metrics.duration)
+            for phase, seconds in metrics.phases.items():
+                self._observe(stats, phase, seconds)
+
+    def _observe(self, stats: EndpointStats, name: str, value: float):
+        histogram = stats.histograms.get(name)
+        if histogram is None:
+            histogram = stats.histograms[name] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "cache_hits": stats.cache_hits,
+                    "statuses": dict(stats.statuses),
+                    "phases": {
+                        phase: {"count": h.count, "sum": h.sum}
+                        for phase, h in stats.histograms.items()
+                    },
+                }
+                for name, stats in self._endpoints.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, prefix: str = "rest_api_client") -> str:
+        lines = [
+            f"# HELP {prefix}_calls_total Endpoint calls by status code.",
+            f"# TYPE {prefix}_calls_total counter",
+        ]
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            for name, stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    labels = _labels(endpoint=name, status=status)
+                    lines.append(f"{prefix}_calls_total{labels} {count}")
+
+            lines.append(f"# HELP {prefix}_errors_total Endpoint calls that raised.")
+            lines.append(f"# TYPE {prefix}_errors_total counter")
+            for name, stats in endpoints:
+                lines.append(
+                    f"{prefix}_errors_total{_labels(endpoint=name)} {stats.errors}"
+                )
+
+            lines.append(f"# HELP {prefix}_phase_seconds Call latency by phase.")
+            lines.append(f"# TYPE {prefix}_phase_seconds histogram")
+            for name, stats in endpoints:
+                for phase, histogram in sorted(stats.histograms.items()):
+                    for bound, count in histogram.cumulative():
+                        labels = _labels(endpoint=name, phase=phase, le=bound)
+                        lines.append(f"{prefix}_phase_seconds_bucket{labels} {count}")
+                    labels = _labels(endpoint=name, phase=phase)
+                    lines.append(f"{prefix}_phase_seconds_sum{labels} {histogram.sum}")
+                    lines.append(
+                        f"{prefix}_phase_seconds_count{labels} {histogram.count}"
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class CallbackInstrumentation(Instrumentation):
+    """Hands every CallMetrics to a callback, e.g. to forward to statsd."""
+
+    def __init__(self, callback: Callable[[CallMetrics], Any]):
+        self.callback = callback
+
+    def record(self, metrics: CallMetrics):
+        self.callback(metrics)
+
+
+class SpanInstrumentation(Instrumentation):
+    """Emits one OpenTelemetry-style span per call, with phases as attributes.
+
+    ``tracer`` is any object with OpenTelemetry's ``start_span(name,
+    start_time=..., attributes=...)`` API. When omitted, the global
+    OpenTelemetry tracer is used, which requires ``opentelemetry-api``.
+    """
+
+    def __init__(self, tracer: Any = None):
+        if tracer is None:
+            try:
+                from opentelemetry import trace  # type: ignore
+            except ImportError as exc:
+                raise ImportError(
+                    "SpanInstrumentation needs a tracer or opentelemetry-api installed."
+                ) from exc
+            tracer = trace.get_tracer("rest_api_client")
+        self.tracer = tracer
+
+    def record(self, metrics: CallMetrics):
+        attributes: Dict[str, Any] = {
+            "http.method": metrics.method.upper(),
+            "rest_api_client.endpoint": metrics.endpoint,
+            "rest_api_client.cached": metrics.cached,
+        }
+        if metrics.status_code:
+            attributes["http.status_code"] = metrics.status_code
+        for phase, seconds in metrics.phases.items():
+            attributes[f"rest_api_client.phase.{phase}"] = seconds
+        start_ns = int(metrics.start_time * 1e9)
+        span = self.tracer.start_span(
+            f"{metrics.method.upper()} {metrics.endpoint}",
+            start_time=start_ns,
+            attributes=attributes,
+        )
+        if metrics.error is not None:
+            span.record_exception(metrics.error)
+        span.end(end_time=start_ns + int(metrics.duration * 1e9))
+
+
+class MultiInstrumentation(Instrumentation):
+    def __init__(self, instrumentations: Iterable[Instrumentation]):
+        self.instrumentations = tuple(instrumentations)
+
+    def record(self, metrics: CallMetrics):
+        for instrumentation in self.instrumentations:
+            instrumentation.record(metrics)
+
+
+def timed_chunks(chunks: Iterable[bytes], metrics: CallMetrics) -> Iterator[bytes]:
+    """Pass chunks through, adding the time spent reading them to body_read."""
+    iterator = iter(chunks)
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            metrics.add("body_read", time.perf_counter() - started)
+            return
+        metrics.add("body_read", time.perf_counter() - started)
+        yield chunk
+
+
+async def atimed_chunks(chunks: Any, metrics: CallMetrics) -> AsyncIterator[bytes]:
+    iterator = chunks.__aiter__()
+    while True:
+        started = time.perf_counter()
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            metrics.add("body_read", time.perf_counter() - started)
+            return
+        metrics.add("body_read", time.perf_counter() - started)
+        yield chunk
+
+
+def _format_bound(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _labels(**labels: str) -> str:
+    pairs = []
+    for key, value in labels.items():
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{key}="{value}"')
+    return "{" + ",".join(pairs) + "}"
@@ -1,13 +1,77 @@
+import asyncio
 import logging
 import re
-from dataclasses import dataclass
-from typing import Iterable, Dict, Optional, List, Callable, Generator
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field
+from operator import attrgetter
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterator,
+    Iterable,
+    Iterator,
+    Dict,
+    Optional,
+    List,
+    Set,
+    Callable,
+    Generator,
+    Hashable,
+    Tuple,
+    Union,
+)
 from makefun import create_function
 from pydantic import BaseModel, HttpUrl
 from enum import Enum
 import httpx
 import httpx_auth  # type: ignore
 
+from .auth import (
+    DEFAULT_REFRESH_MARGIN,
+    StaticTokenProvider,
+    TokenCache,
+    TokenProvider,
+)
+from .background import BackgroundExecutor, ConcurrencyBackend
+from .batching import BatchLoader, Batching
+from .cache import CacheEntry, ResponseCache, SQLiteCache
+from .codec import JSONCodec, StdlibJSONCodec
+from .concurrency import AdaptiveLimiter
+from .compression import Compression, compress_chunks
+from .decoding import DecodeExecutor, DecodeMode
+from .downloads import (
+    ByteStream,
+    Destination,
+    Download,
+    Progress,
+    adownload,
+    download,
+    is_binary_content_type,
+    range_headers,
+)
+from .driver import DriverConfig, HttpDriver, awarm_up, warm_up
+from .instrumentation import (
+    CallMetrics,
+    Instrumentation,
+    atimed_chunks,
+    timed_chunks,
+)
+from .materialize import Materialization, ResponseShape, build_model, materialize
+from .pagination import PageRequest, Pagination
+from .ratelimit import TokenBucket
+from .resilience import (
+    IDEMPOTENT_METHODS,
+    RetryPolicy,
+    asend_with_retries,
+    send_with_retries,
+)
+from .singleflight import SingleFlight
+from .streaming import StreamFormat, aiter_decoded, iter_decoded, make_decoder
+from .uploads import is_streaming_body, stream_body
+
 
 logger = logging.getLogger("LIB_LOGGER")
 logger.setLevel(logging.ERROR)
@@ -15,13 +79,10 @@ logger.setLevel(logging.ERROR)
 JSON_MIMETYPE = "application/json"
 SUPPORTED_METHODS = {"get", "post", "put", "patch", "delete"}
 ALIASES = {"create": "post", "update": "put"}
-
-
-@dataclass
-class PreparedCall:
-    driver_function: Callable
-    driver_kwargs: dict
-    model: Optional[type]
+PATH_PARAMETER_PATTERN = re.compile(r"{([a-z_][a-z0-9_]*)}")
+DEFAULT_BATCH_CONCURRENCY = 10
+# Method kinds that write the response to a destination.
+DOWNLOAD_KINDS = ("download", "adownload")
 
 
 class ExecutionMode(Enum):
@@ -29,10 +90,6 @@ class ExecutionMode(Enum):
     ASYNC = "ASYNC"
 
 
-class HttpDriver:
-    session: httpx.Client
-
-
 class HTTPMethod(Enum):
     GET = "get"
     DELETE = "delete"
@@ -52,6 +109,99 @@ class Endpoint(BaseModel):
     model: Optional[type]
     query_parameters: Optional[Dict[str, type]]
     path_parameters: Optional[List[str]] = None
+    cache_ttl: Optional[float] = None
+    pagination: Optional[Pagination] = None
+    streaming: Optional[StreamFormat] = None
+    retry_policy: Optional[RetryPolicy] = None
+    rate_limit: Optional[TokenBucket] = None
+    concurrency_limit: Optional[AdaptiveLimiter] = None
+    response_shape: ResponseShape = ResponseShape.SINGLE
+    materialization: Materialization = Materialization.VALIDATE
+    decode: Optional[DecodeMode] = None
+    codec: Optional[JSONCodec] = None
+    compression: Optional[Compression] = None
+    download: Optional[Download] = None
+    batching: Optional[Batching] = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+@dataclass(frozen=True)
+class CallPlan:
+    """Per-endpoint call data, compiled once when the endpoint is registered.
+
+    ``url_segments`` holds the literal parts of the full URL template, split
+    around the path parameters listed in ``path_keys``, so building a URL
+    is a single join. ``headers`` and ``json_headers`` are shared between
+    calls and must not be mutated.
+    """
+
+    endpoint: Endpoint
+    method: str
+    url_template: str
+    url_segments: Tuple[str, ...]
+    path_keys: Tuple[str, ...]
+    query_keys: Tuple[str, ...]
+    headers: Dict[str, str]
+    json_headers: Dict[str, str]
+    header_key: Tuple[Tuple[str, str], ...]
+    model: Optional[type]
+    cache_ttl: Optional[float] = None
+    rate_limiters: Tuple[TokenBucket, ...] = ()
+    concurrency_limiters: Tuple[AdaptiveLimiter, ...] = ()
+    codec: JSONCodec = field(default_factory=StdlibJSONCodec)
+    compression: Optional[Compression] = None
+    compressed_headers: Dict[str, str] = field(default_factory=dict)
+    # "scheme://host[:port]/" of the API URL, to spot requests to other hosts.
+    origin: str = ""
+
+    def build_url(self, kwargs: dict) -> str:
+        if self.path_keys:
+            segments = self.url_segments
+            parts = [segments[0]]
+            for index, key in enumerate(self.path_keys, start=1):
+                parts.append(str(kwargs[key]))
+                parts.append(segments[index])
+            url = "".join(parts)
+        else:
+            url = self.url_template
+
+        if self.query_keys:
+            parameters = []
+            for key in self.query_keys:
+                item = kwargs.get(key)
+                if item:
+                    parameters.append(f"{key}={item}")
+            url += "?" + "&".join(parameters)
+        return url
+
+
+@dataclass
+class PreparedCall:
+    driver_function: Callable
+    driver_kwargs: dict
+    model: Optional[type]
+    plan: Optional[CallPlan] = None
+    cache_key: Optional[Hashable] = None
+    cache_ttl: Optional[float] = None
+    retry_policy: Optional[RetryPolicy] = None
+    flight_key: Optional[tuple] = None
+    metrics: Optional[CallMetrics] = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one parameter set in a batch call."""
+
+    index: int
+    parameters: dict
+    result: Any = None
+    exception: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.exception is None
 
 
 class EndpointNotFound(Exception):
@@ -80,20 +230,128 @@ class RestAPI:
     def __init__(
         self,
         api_url: str,
-        driver: HttpDriver,
+        driver: Optional[HttpDriver] = None,
         endpoints: Optional[Iterable[Endpoint]] = None,
         custom_headers: Optional[Dict[str, str]] = None,
+        cache: Optional[Union[ResponseCache, SQLiteCache]] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limit: Optional[TokenBucket] = None,
+        host_rate_limits: Optional[Dict[str, TokenBucket]] = None,
+        single_flight: bool = False,
+        instrumentation: Optional[Instrumentation] = None,
+        lazy_methods: bool = False,
+        driver_config: Optional[DriverConfig] = None,
+        decode_executor: Optional[DecodeExecutor] = None,
+        codec: Optional[JSONCodec] = None,
+        compression: Optional[Compression] = None,
+        background: Optional[BackgroundExecutor] = None,
+        concurrency_limit: Optional[AdaptiveLimiter] = None,
+        host_concurrency_limits: Optional[Dict[str, AdaptiveLimiter]] = None,
     ):
         self.api_url = Url(full_string=api_url)
-        self.driver = driver
+        if driver is not None:
+            if driver_config is not None:
+                raise ValueError("driver_config only applies when no driver is passed.")
+            self.driver = driver
+        else:
+            # Without a driver, RestAPI creates and owns a managed HttpDriver.
+            self.driver = HttpDriver(driver_config)
+            self._owns_driver = True
+        self.cache = cache
+        self.retry_policy = retry_policy
+        # Rate limits are bound into each endpoint plan at registration.
+        self.rate_limit = rate_limit
+        self.host_rate_limits = host_rate_limits or {}
+        # Async requests only; bound into each endpoint plan like rate limits.
+        self.concurrency_limit = concurrency_limit
+        self.host_concurrency_limits = host_concurrency_limits or {}
+        self.single_flight: Optional[SingleFlight] = (
+            SingleFlight() if single_flight else None
+        )
+        self.instrumentation = instrumentation
+        # Async responses are decoded inline unless configured otherwise;
+        # its pools are only created when an endpoint or threshold needs them.
+        self.decode_executor = decode_executor or DecodeExecutor(DecodeMode.INLINE)
+        # Bound into each endpoint plan at registration, like rate limits.
+        self.codec = codec or StdlibJSONCodec()
+        self.compression = compression
+        # Runs submit and call_batch; created on first use when not passed.
+        self.background = background
+        self._owns_background = False
+        self._background_lock = threading.Lock()
+        self.lazy_methods = lazy_methods
+        # Attribute name -> (endpoint name, method kind), for lazy_methods.
+        self._lazy_methods: Dict[str, Tuple[str, str]] = {}
         self._headers = {
             "Accept": JSON_MIMETYPE,
         }
         self._custom_headers = custom_headers
         self.endpoints: Dict[str, Endpoint] = {}
+        self._plans: Dict[str, CallPlan] = {}
+        # Endpoint name -> loader collecting its async calls into batches.
+        self._batch_loaders: Dict[str, BatchLoader] = {}
         if endpoints:
             self.register_endpoints(endpoints)
 
+    @property
+    def driver(self) -> HttpDriver:
+        return self._driver
+
+    @driver.setter
+    def driver(self, driver: HttpDriver):
+        # Driver methods are resolved lazily and memoized per driver.
+        self._driver = driver
+        self._owns_driver = False
+        self._driver_functions: Dict[Tuple[str, ExecutionMode], Callable] = {}
+
+    def warm_up(self, connections: Optional[int] = None) -> int:
+        """Open pooled connections to the API ahead of traffic.
+
+        Returns the number of connections that got a response.
+        """
+        driver = self._driver
+        if isinstance(driver, HttpDriver):
+            return driver.warm_up(self.api_url.full_string, connections)
+        return warm_up(driver, self.api_url.full_string, connections or 1)
+
+    async def awarm_up(self, connections: Optional[int] = None) -> int:
+        driver = self._driver
+        if isinstance(driver, HttpDriver):
+            return await driver.awarm_up(self.api_url.full_string, connections)
+        return await awarm_up(driver, self.api_url.full_string, connections or 1)
+
+    def close(self):
+        """Close the driver and background executor, if created by this RestAPI."""
+        background = self.background
+        if self._owns_background and background is not None:
+            if self._owns_driver and background.loop_started:
+                # Its async client belongs to the background loop.
+                background.run(self._driver.aclose())
+            background.shutdown()
+            self.background = None
+        if self._owns_driver:
+            self._driver.close()
+
+    async def aclose(self):
+        if self._owns_background and self.background is not None:
+            self.background.shutdown()
+            self.background = None
+        if self._owns_driver:
+            await self._driver.aclose()
+
+    def __enter__(self) -> "RestAPI":
+        return self
+
+    def __exit__(self, *exc_info):
+        # An endpoint named "close" would shadow the method on the instance.
+        RestAPI.close(self)
+
+    async def __aenter__(self) -> "RestAPI":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await RestAPI.aclose(self)
+
     def register_endpoints(self, endpoints: Iterable[Endpoint]):
         for endpoint in endpoints:
             if not endpoint.method:
@@ -119,7 +377,147 @@ class RestAPI:
             endpoint.path_parameters = self.get_path_parameters(endpoint.path)
 
             self.endpoints[endpoint.name] = endpoint
-            self._create_methods(endpoint)
+            if self.lazy_methods:
+                # Plans and methods are built on first use.
+                self._plans.pop(endpoint.name, None)
+                for attribute, kind in self._method_kinds(endpoint).items():
+                    self._lazy_methods[attribute] = (endpoint.name, kind)
+                    self.__dict__.pop(attribute, None)
+                    if hasattr(RestAPI, attribute):
+                        # __getattr__ never sees names the class defines.
+                        self.__getattr__(attribute)
+            else:
+                self._plans[endpoint.name] = self._compile_plan(endpoint)
+                self._create_methods(endpoint)
+
+    def __getattr__(self, attribute: str) -> Any:
+        # Only called when regular lookup fails, i.e. for lazy methods that
+        # have not been synthesized yet.
+        lazy_methods = self.__dict__.get("_lazy_methods")
+        if not lazy_methods or attribute not in lazy_methods:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{attribute}'"
+            )
+        endpoint_name, kind = lazy_methods[attribute]
+        endpoint = self.endpoints[endpoint_name]
+        func_sig = self._method_signature(endpoint, kind)
+        method = self._create_method(endpoint, kind, func_sig)
+        setattr(self, attribute, method)  # noqa
+        return method
+
+    def __dir__(self) -> Iterable[str]:
+        return sorted(set(super().__dir__()) | set(self._lazy_methods))
+
+    def _compile_plan(self, endpoint: Endpoint) -> CallPlan:
+        if not endpoint.method:
+            raise MissingMethodName(endpoint_name=endpoint.name)
+
+        url_template = f"{str(self.api_url.full_string)}{endpoint.path}"
+        # re.split with a capture group alternates literals and parameter names.
+        pieces = PATH_PARAMETER_PATTERN.split(url_template)
+        headers = self._headers.copy()
+        if endpoint.download is not None:
+            headers["Accept"] = "*/*"
+        compression = endpoint.compression or self.compression
+        if compression is not None and compression.accept_encodings:
+            headers["Accept-Encoding"] = compression.accept_encoding_header()
+        if self._custom_headers:
+            headers.update(self._custom_headers)
+        json_headers = headers.copy()
+        json_headers["Content-Type"] = JSON_MIMETYPE
+        compressed_headers = json_headers.copy()
+        if compression is not None and compression.request_encoding is not None:
+            compressed_headers["Content-Encoding"] = compression.request_encoding.value
+        rate_limiters = self._host_rate_limiters(
+            endpoint, self.api_url.full_string.host
+        )
+        concurrency_limiters = self._host_concurrency_limiters(
+            endpoint, self.api_url.full_string.host
+        )
+
+        return CallPlan(
+            endpoint=endpoint,
+            method=endpoint.method.value,
+            url_template=url_template,
+            url_segments=tuple(pieces[::2]),
+            path_keys=tuple(pieces[1::2]),
+            query_keys=tuple(endpoint.query_parameters or ()),
+            headers=headers,
+            json_headers=json_headers,
+            header_key=tuple(headers.items()),
+            model=endpoint.model,
+            # Only GET responses are ever served from the cache.
+            cache_ttl=endpoint.cache_ttl if endpoint.method == HTTPMethod.GET else None,
+            rate_limiters=rate_limiters,
+            concurrency_limiters=concurrency_limiters,
+            codec=endpoint.codec or self.codec,
+            compression=compression,
+            compressed_headers=compressed_headers,
+            origin=_origin(url_template),
+        )
+
+    def _host_rate_limiters(
+        self, endpoint: Endpoint, host: Optional[str]
+    ) -> Tuple[TokenBucket, ...]:
+        limiters = (self.rate_limit, self.host_rate_limits.get(host or ""))
+        return tuple(
+            limiter
+            for limiter in (*limiters, endpoint.rate_limit)
+            if limiter is not None
+        )
+
+    def _rate_limiters(self, call: PreparedCall, url: str) -> Tuple[TokenBucket, ...]:
+        """Rate limits for a request, keyed by the host it is sent to.
+
+        Requests to the API host use the limits bound into the plan; others,
+        e.g. pagination links to another host, look up that host's limit.
+        """
+        plan = call.plan
+        if plan is None:
+            return ()
+        if not self.host_rate_limits or url.startswith(plan.origin):
+            return plan.rate_limiters
+        return self._host_rate_limiters(plan.endpoint, httpx.URL(url).host)
+
+    def _host_concurrency_limiters(
+        self, endpoint: Endpoint, host: Optional[str]
+    ) -> Tuple[AdaptiveLimiter, ...]:
+        limiters = (
+            self.concurrency_limit,
+            self.host_concurrency_limits.get(host or ""),
+        )
+        return tuple(
+            limiter
+            for limiter in (*limiters, endpoint.concurrency_limit)
+            if limiter is not None
+        )
+
+    def _concurrency_limiters(
+        self, call: PreparedCall, url: str
+    ) -> Tuple[AdaptiveLimiter, ...]:
+        """Like ``_rate_limiters``, for the adaptive concurrency limits."""
+        plan = call.plan
+        if plan is None:
+            return ()
+        if not self.host_concurrency_limits or url.startswith(plan.origin):
+            return plan.concurrency_limiters
+        return self._host_concurrency_limiters(plan.endpoint, httpx.URL(url).host)
+
+    def _driver_function(
+        self, method: str, mode: ExecutionMode = ExecutionMode.SYNC
+    ) -> Callable:
+        key = (method, mode)
+        driver_function = self._driver_functions.get(key)
+        if driver_function is None:
+            driver: Any = self._driver
+            if isinstance(driver, HttpDriver):
+                if mode == ExecutionMode.ASYNC:
+                    driver = driver.async_session
+                else:
+                    driver = driver.session
+            driver_function = getattr(driver, method)
+            self._driver_functions[key] = driver_function
+        return driver_function
 
     def call_endpoint(
         self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
@@ -132,11 +530,522 @@ class RestAPI:
     async def call_async_endpoint(
         self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
     ):
-        call: PreparedCall = self._prepare_call(
-            endpoint_name, data, **kwargs, mode=ExecutionMode.ASYNC
-        )
+        plan = self._get_plan(endpoint_name)
+        batching = plan.endpoint.batching
+        if batching is not None and data is None:
+            return await self._get_batch_loader(plan, batching).load(kwargs)
+        call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
         return await self._call_async_endpoint(call)
 
+    def submit(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> Future:
+        """Start an endpoint call in the background and return its future.
+
+        For synchronous code: calls submitted together run concurrently, on
+        the background event loop or thread pool.
+        """
+        background = self._get_background()
+        if background.backend == ConcurrencyBackend.EVENT_LOOP:
+            return background.submit_coroutine(
+                self.call_async_endpoint(endpoint_name, data=data, **kwargs)
+            )
+        return background.submit(self.call_endpoint, endpoint_name, data=data, **kwargs)
+
+    def call_batch(
+        self,
+        endpoint_name: str,
+        parameters: Iterable[dict],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> List[BatchResult]:
+        """Blocking ``call_async_batch`` for synchronous code.
+
+        The calls run concurrently on the background event loop, or on the
+        background thread pool, which also caps ``concurrency``.
+        """
+        if concurrency < 1:
+            raise ValueError("Batch concurrency must be at least 1.")
+        background = self._get_background()
+        if background.backend == ConcurrencyBackend.EVENT_LOOP:
+            return background.run(
+                self.call_async_batch(endpoint_name, parameters, concurrency)
+            )
+
+        plan = self._get_plan(endpoint_name)
+        results: List[BatchResult] = []
+        pending: set = set()
+        for index, item_parameters in enumerate(parameters):
+            if len(pending) >= concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                results.extend(future.result() for future in done)
+            pending.add(
+                background.submit(
+                    self._call_sync_batch_item, plan, index, item_parameters
+                )
+            )
+        results.extend(future.result() for future in wait(pending).done)
+        results.sort(key=attrgetter("index"))
+        return results
+
+    def _get_background(self) -> BackgroundExecutor:
+        if self.background is None:
+            with self._background_lock:
+                if self.background is None:
+                    # Only these drivers can make async calls.
+                    if isinstance(self._driver, (HttpDriver, httpx.AsyncClient)):
+                        backend = ConcurrencyBackend.EVENT_LOOP
+                    else:
+                        backend = ConcurrencyBackend.THREADS
+                    self.background = BackgroundExecutor(backend)
+                    self._owns_background = True
+        return self.background
+
+    def _call_sync_batch_item(
+        self, plan: CallPlan, index: int, parameters: dict
+    ) -> BatchResult:
+        kwargs = dict(parameters)
+        data = kwargs.pop("data", None)
+        try:
+            call = self._prepare_plan_call(plan, data, kwargs)
+            result = self._call_sync_endpoint(call)
+        except Exception as exc:
+            return BatchResult(index=index, parameters=parameters, exception=exc)
+        return BatchResult(index=index, parameters=parameters, result=result)
+
+    async def call_async_batch(
+        self,
+        endpoint_name: str,
+        parameters: Iterable[dict],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> List[BatchResult]:
+        """Call one endpoint for every parameter set, results in input order.
+
+        Each parameter set holds the keyword arguments of a single call,
+        including ``data`` for endpoints with a body. Failures are collected
+        in ``BatchResult.exception`` instead of aborting the batch.
+        """
+        results = []
+        async for result in self.iter_async_batch(
+            endpoint_name, parameters, concurrency=concurrency
+        ):
+            results.append(result)
+        results.sort(key=attrgetter("index"))
+        return results
+
+    async def iter_async_batch(
+        self,
+        endpoint_name: str,
+        parameters: Iterable[dict],
+        concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> AsyncIterator[BatchResult]:
+        """Like ``call_async_batch``, but yields results as they finish."""
+        if concurrency < 1:
+            raise ValueError("Batch concurrency must be at least 1.")
+
+        plan = self._get_plan(endpoint_name)
+        # Workers share one iterator, so at most `concurrency` calls are in
+        # flight and parameter sets are consumed lazily.
+        pending = enumerate(parameters)
+        finished: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            for index, item_parameters in pending:
+                result = await self._call_batch_item(plan, index, item_parameters)
+                finished.put_nowait(result)
+
+        async def run_workers():
+            try:
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+            finally:
+                finished.put_nowait(None)
+
+        runner = asyncio.ensure_future(run_workers())
+        try:
+            while True:
+                result = await finished.get()
+                if result is None:
+                    break
+                yield result
+            await runner
+        finally:
+            runner.cancel()
+
+    async def _call_batch_item(
+        self, plan: CallPlan, index: int, parameters: dict
+    ) -> BatchResult:
+        kwargs = dict(parameters)
+        data = kwargs.pop("data", None)
+        batching = plan.endpoint.batching
+        try:
+            if batching is not None and data is None:
+                result = await self._get_batch_loader(plan, batching).load(kwargs)
+            else:
+                call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
+                result = await self._call_async_endpoint(call)
+        except Exception as exc:
+            return BatchResult(index=index, parameters=parameters, exception=exc)
+        return BatchResult(index=index, parameters=parameters, result=result)
+
+    def _get_batch_loader(self, plan: CallPlan, batching: Batching) -> BatchLoader:
+        name = plan.endpoint.name
+        loader = self._batch_loaders.get(name)
+        if loader is None:
+
+            async def load_batch(shared: dict, keys: List[Any]) -> List[Any]:
+                return await self._load_batch(plan, batching, shared, keys)
+
+            loader = self._batch_loaders.setdefault(
+                name, BatchLoader(batching, load_batch)
+            )
+        return loader
+
+    async def _load_batch(
+        self, plan: CallPlan, batching: Batching, shared: dict, keys: List[Any]
+    ) -> List[Any]:
+        """Send one batch call and build each caller's result from its item."""
+        data, kwargs = batching.batch_call(keys, shared)
+        batch_plan = self._get_plan(batching.batch_endpoint)
+        call = self._prepare_plan_call(batch_plan, data, kwargs, ExecutionMode.ASYNC)
+        # Items are built with the single endpoint's model, not the batch one.
+        call.model = None
+        body = await self._call_async_endpoint(call)
+        results = []
+        for item in batching.split(body, keys):
+            if not isinstance(item, Exception):
+                try:
+                    item = self._build_item(plan, item)
+                except Exception as exc:
+                    item = exc
+            results.append(item)
+        return results
+
+    def iter_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> Iterator[Any]:
+        """Lazily yield the items of a paginated endpoint, one page at a time."""
+        plan = self._get_plan(endpoint_name)
+        pagination = self._get_pagination(plan)
+        call = self._prepare_plan_call(plan, data, kwargs)
+        request: Optional[PageRequest] = pagination.first_request()
+        error = None
+        try:
+            while request is not None:
+                response = self._send_sync(call, self._page_kwargs(call, request))
+                body = self._decode_page(call, response)
+                items = pagination.items(body)
+                request = pagination.next_request(response, body, request, len(items))
+                for item in items:
+                    yield self._build_item(plan, item)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if call.metrics is not None:
+                self._record_metrics(call.metrics, error)
+
+    async def aiter_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> AsyncIterator[Any]:
+        """Async version of ``iter_endpoint``.
+
+        The next page is requested as soon as the current one arrives, so it
+        downloads while the caller works through the current items.
+        """
+        plan = self._get_plan(endpoint_name)
+        pagination = self._get_pagination(plan)
+        call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
+
+        async def fetch(request: PageRequest):
+            response = await self._send_async(call, self._page_kwargs(call, request))
+            return response, self._decode_page(call, response)
+
+        request = pagination.first_request()
+        next_page: Optional[asyncio.Future] = asyncio.ensure_future(fetch(request))
+        error = None
+        try:
+            while next_page is not None:
+                response, body = await next_page
+                items = pagination.items(body)
+                next_page = None
+                following = pagination.next_request(response, body, request, len(items))
+                if following is not None:
+                    request = following
+                    next_page = asyncio.ensure_future(fetch(request))
+                for item in items:
+                    yield self._build_item(plan, item)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+            if call.metrics is not None:
+                self._record_metrics(call.metrics, error)
+
+    def stream_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> Iterator[Any]:
+        """Yield decoded items while a JSON array or NDJSON body downloads."""
+        plan = self._get_plan(endpoint_name)
+        stream_format = self._get_stream_format(plan)
+        call = self._prepare_plan_call(plan, data, kwargs)
+        stream = self._driver_function("stream")
+        for limiter in plan.rate_limiters:
+            limiter.acquire()
+        metrics = call.metrics
+        error = None
+        try:
+            with stream(plan.method.upper(), **call.driver_kwargs) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                chunks = response.iter_bytes()
+                if metrics is not None:
+                    metrics.add("first_byte", time.perf_counter() - metrics.started)
+                    metrics.status_code = response.status_code
+                    chunks = timed_chunks(chunks, metrics)
+                response.raise_for_status()
+                decoder = make_decoder(stream_format, plan.codec.loads)
+                for item in iter_decoded(chunks, decoder):
+                    yield self._build_item(plan, item)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if metrics is not None:
+                self._record_metrics(metrics, error)
+
+    async def astream_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> AsyncIterator[Any]:
+        """Async version of ``stream_endpoint``."""
+        plan = self._get_plan(endpoint_name)
+        stream_format = self._get_stream_format(plan)
+        call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
+        stream = self._driver_function("stream", ExecutionMode.ASYNC)
+        for limiter in plan.rate_limiters:
+            await limiter.acquire_async()
+        metrics = call.metrics
+        error = None
+        try:
+            async with self._astream_limited(
+                call, stream, call.driver_kwargs
+            ) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                chunks = response.aiter_bytes()
+                if metrics is not None:
+                    metrics.add("first_byte", time.perf_counter() - metrics.started)
+                    metrics.status_code = response.status_code
+                    chunks = atimed_chunks(chunks, metrics)
+                response.raise_for_status()
+                decoder = make_decoder(stream_format, plan.codec.loads)
+                async for item in aiter_decoded(chunks, decoder):
+                    yield self._build_item(plan, item)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if metrics is not None:
+                self._record_metrics(metrics, error)
+
+    def download_endpoint(
+        self,
+        endpoint_name,
+        destination: Destination,
+        *args,
+        data: Optional[BaseModel] = None,
+        progress: Optional[Progress] = None,
+        resume: bool = False,
+        **kwargs,
+    ) -> int:
+        """Write a binary response to a path, file or buffer chunk by chunk.
+
+        With ``resume``, an existing file at the destination path is
+        completed with a Range request. Returns the downloaded size.
+        """
+        plan = self._get_plan(endpoint_name)
+        options = self._get_download(plan)
+        call = self._prepare_plan_call(plan, data, kwargs)
+        stream = self._driver_function("stream")
+
+        @contextmanager
+        def send(offset: int) -> Iterator[httpx.Response]:
+            for limiter in plan.rate_limiters:
+                limiter.acquire()
+            driver_kwargs = self._download_kwargs(call, offset)
+            with stream(plan.method.upper(), **driver_kwargs) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                if call.metrics is not None:
+                    call.metrics.status_code = response.status_code
+                yield response
+
+        error = None
+        try:
+            return download(destination, send, options, progress, resume)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if call.metrics is not None:
+                self._record_metrics(call.metrics, error)
+
+    async def adownload_endpoint(
+        self,
+        endpoint_name,
+        destination: Destination,
+        *args,
+        data: Optional[BaseModel] = None,
+        progress: Optional[Progress] = None,
+        resume: bool = False,
+        **kwargs,
+    ) -> int:
+        """Async version of ``download_endpoint``."""
+        plan = self._get_plan(endpoint_name)
+        options = self._get_download(plan)
+        call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
+        stream = self._driver_function("stream", ExecutionMode.ASYNC)
+
+        @asynccontextmanager
+        async def send(offset: int) -> AsyncIterator[httpx.Response]:
+            for limiter in plan.rate_limiters:
+                await limiter.acquire_async()
+            driver_kwargs = self._download_kwargs(call, offset)
+            async with self._astream_limited(call, stream, driver_kwargs) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                if call.metrics is not None:
+                    call.metrics.status_code = response.status_code
+                yield response
+
+        error = None
+        try:
+            return await adownload(destination, send, options, progress, resume)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if call.metrics is not None:
+                self._record_metrics(call.metrics, error)
+
+    @contextmanager
+    def open_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> Iterator[ByteStream]:
+        """Open a binary response as a stream of byte chunks."""
+        plan = self._get_plan(endpoint_name)
+        options = self._get_download(plan)
+        call = self._prepare_plan_call(plan, data, kwargs)
+        stream = self._driver_function("stream")
+        for limiter in plan.rate_limiters:
+            limiter.acquire()
+        metrics = call.metrics
+        error = None
+        try:
+            driver_kwargs = self._download_kwargs(call, 0)
+            with stream(plan.method.upper(), **driver_kwargs) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                if metrics is not None:
+                    metrics.status_code = response.status_code
+                response.raise_for_status()
+                yield ByteStream(response, options.chunk_size)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if metrics is not None:
+                self._record_metrics(metrics, error)
+
+    @asynccontextmanager
+    async def aopen_endpoint(
+        self, endpoint_name, *args, data: Optional[BaseModel] = None, **kwargs
+    ) -> AsyncIterator[ByteStream]:
+        """Async version of ``open_endpoint``."""
+        plan = self._get_plan(endpoint_name)
+        options = self._get_download(plan)
+        call = self._prepare_plan_call(plan, data, kwargs, ExecutionMode.ASYNC)
+        stream = self._driver_function("stream", ExecutionMode.ASYNC)
+        for limiter in plan.rate_limiters:
+            await limiter.acquire_async()
+        metrics = call.metrics
+        error = None
+        try:
+            driver_kwargs = self._download_kwargs(call, 0)
+            async with self._astream_limited(call, stream, driver_kwargs) as response:
+                for limiter in plan.rate_limiters:
+                    limiter.update_from_response(response)
+                if metrics is not None:
+                    metrics.status_code = response.status_code
+                response.raise_for_status()
+                yield ByteStream(response, options.chunk_size)
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            if metrics is not None:
+                self._record_metrics(metrics, error)
+
+    def _get_download(self, plan: CallPlan) -> Download:
+        options = plan.endpoint.download
+        if options is None:
+            raise ValueError(f"Endpoint {plan.endpoint.name} is not a download.")
+        return options
+
+    def _download_kwargs(self, call: PreparedCall, offset: int) -> dict:
+        driver_kwargs = call.driver_kwargs.copy()
+        driver_kwargs["headers"] = {
+            **driver_kwargs["headers"],
+            **range_headers(offset),
+        }
+        return driver_kwargs
+
+    def _get_stream_format(self, plan: CallPlan) -> StreamFormat:
+        stream_format = plan.endpoint.streaming
+        if stream_format is None:
+            raise ValueError(
+                f"Endpoint {plan.endpoint.name} is not a streaming endpoint."
+            )
+        return stream_format
+
+    def _get_pagination(self, plan: CallPlan) -> Pagination:
+        pagination = plan.endpoint.pagination
+        if pagination is None:
+            raise ValueError(f"Endpoint {plan.endpoint.name} is not paginated.")
+        return pagination
+
+    def _page_kwargs(self, call: PreparedCall, request: PageRequest) -> dict:
+        driver_kwargs = call.driver_kwargs.copy()
+        if request.url:
+            driver_kwargs["url"] = request.url
+        elif request.params:
+            driver_kwargs["params"] = request.params
+        return driver_kwargs
+
+    def _decode_page(self, call: PreparedCall, response) -> Any:
+        logger.debug(response.content)
+        if call.metrics is not None:
+            call.metrics.status_code = response.status_code
+        response.raise_for_status()
+        return self._call_codec(call).decode(response)
+
+    def _call_codec(self, call: PreparedCall) -> JSONCodec:
+        return call.plan.codec if call.plan is not None else self.codec
+
+    def _build_item(self, plan: CallPlan, item: Any) -> Any:
+        if plan.model:
+            return build_model(plan.model, item, plan.endpoint.materialization)
+        return item
+
+    def _get_plan(self, name: str) -> CallPlan:
+        plan = self._plans.get(name)
+        if plan is None:
+            endpoint = self.endpoints.get(name)
+            if endpoint is None:
+                raise EndpointNotFound(f"Endpoint {name} not found!")
+            plan = self._plans[name] = self._compile_plan(endpoint)
+        return plan
+
     def _prepare_call(
         self,
         name: str,
@@ -144,68 +1053,513 @@ class RestAPI:
         mode=ExecutionMode.SYNC,
         **kwargs,
     ) -> PreparedCall:
+        return self._prepare_plan_call(self._get_plan(name), data, kwargs, mode)
 
-        endpoint = self.endpoints.get(name)
-        if not endpoint:
-            raise EndpointNotFound(f"Endpoint {name} not found!")
+    def _prepare_plan_call(
+        self,
+        plan: CallPlan,
+        data: Optional[BaseModel],
+        kwargs: dict,
+        mode: ExecutionMode = ExecutionMode.SYNC,
+    ) -> PreparedCall:
+        if self.instrumentation is not None:
+            started = time.perf_counter()
+        driver_kwargs: dict = {}
+        streamed = False
+        if data and is_streaming_body(data):
+            streamed = True
+            content, headers = self._stream_body(plan, data, mode)
+            driver_kwargs["content"] = content
+            driver_kwargs["headers"] = headers
+        elif data:
+            body = plan.codec.dumps(data)
+            if plan.compression is not None and plan.compression.should_compress(body):
+                driver_kwargs["content"] = plan.compression.compress(body)
+                driver_kwargs["headers"] = plan.compressed_headers
+            else:
+                driver_kwargs["content"] = body
+                driver_kwargs["headers"] = plan.json_headers
+        else:
+            driver_kwargs["headers"] = plan.headers
 
-        if not endpoint.method:
-            raise MissingMethodName(endpoint_name=endpoint.name)
+        url = plan.build_url(kwargs)
+        driver_kwargs["url"] = url
+        logger.debug(driver_kwargs)
+        call = PreparedCall(
+            self._driver_function(plan.method, mode), driver_kwargs, plan.model, plan
+        )
+        # A streamed body is consumed by the first attempt, so it is never retried.
+        if not streamed:
+            policy = plan.endpoint.retry_policy or self.retry_policy
+            if policy is not None and (
+                plan.method in IDEMPOTENT_METHODS or policy.retry_non_idempotent
+            ):
+                call.retry_policy = policy
+        if (
+            self.single_flight is not None
+            and not data
+            and plan.method == HTTPMethod.GET.value
+        ):
+            call.flight_key = (plan.endpoint.name, url, plan.header_key)
+        if self.cache is not None and plan.method == HTTPMethod.GET.value:
+            ttl = plan.cache_ttl
+            if ttl is None:
+                ttl = self.cache.default_ttl
+            if ttl is not None:
+                call.cache_key = self.cache.make_key(url, plan.headers)
+                call.cache_ttl = ttl
+        if self.instrumentation is not None:
+            call.metrics = CallMetrics(plan.endpoint.name, plan.method, started)
+            call.metrics.add("prepare", time.perf_counter() - started)
+        return call
 
-        method = endpoint.method.value
-        driver_function = getattr(self.driver, method)
-        url = f"{str(self.api_url.full_string)}{endpoint.path}"
-        driver_kwargs = {}
-        headers = self._headers.copy()
+    def _stream_body(
+        self, plan: CallPlan, data: Any, mode: ExecutionMode
+    ) -> Tuple[Any, Dict[str, str]]:
+        content, headers = stream_body(
+            data, plan.codec, asynchronous=mode == ExecutionMode.ASYNC
+        )
+        compression = plan.compression
+        if compression is not None and compression.request_encoding is not None:
+            length = headers.get("Content-Length")
+            if isinstance(content, bytes):
+                if compression.should_compress(content):
+                    content = compression.compress(content)
+                    headers["Content-Encoding"] = compression.request_encoding.value
+            elif length is None or int(length) >= compression.min_size:
+                content = compress_chunks(
+                    content, compression.request_encoding, compression.level
+                )
+                headers.pop("Content-Length", None)
+                headers["Content-Encoding"] = compression.request_encoding.value
+        return content, {**plan.headers, **headers}
 
-        if self._custom_headers:
-            headers.update(self._custom_headers)
-        if data:
-            driver_kwargs["json"] = data
-            headers["Content-Type"] = JSON_MIMETYPE
+    def _call_sync_endpoint(self, call: PreparedCall):
+        if call.metrics is None:
+            return self._dispatch_sync(call)
+        try:
+            result = self._dispatch_sync(call)
+        except Exception as exc:
+            self._record_metrics(call.metrics, exc)
+            raise
+        self._record_metrics(call.metrics)
+        return result
 
-        driver_kwargs["headers"] = headers  # type: ignore
-        if endpoint.query_parameters:
-            parameters = []
-            for key, item in kwargs.items():
-                if item and key in endpoint.query_parameters:
-                    parameters.append(f"{key}={item}")
-            query = "?" + "&".join(parameters)
+    async def _call_async_endpoint(self, call: PreparedCall):
+        if call.metrics is None:
+            return await self._dispatch_async(call)
+        try:
+            result = await self._dispatch_async(call)
+        except Exception as exc:
+            self._record_metrics(call.metrics, exc)
+            raise
+        self._record_metrics(call.metrics)
+        return result
 
-            url += query
+    def _record_metrics(
+        self, metrics: CallMetrics, error: Optional[BaseException] = None
+    ):
+        if self.instrumentation is None:
+            return
+        metrics.duration = time.perf_counter() - metrics.started
+        metrics.error = error
+        self.instrumentation.record(metrics)
 
-        if endpoint.path_parameters:
-            path_kwargs = {}
-            for key, item in kwargs.items():
-                if key in endpoint.path_parameters:
-                    path_kwargs[key] = item
-            url = url.format(**path_kwargs)
+    def _dispatch_sync(self, call: PreparedCall):
+        if call.flight_key is not None and self.single_flight is not None:
+            return self.single_flight.do(
+                call.flight_key, lambda: self._request_sync(call)
+            )
+        return self._request_sync(call)
 
-        driver_kwargs["url"] = url  # type: ignore
-        logger.debug(driver_kwargs)
-        return PreparedCall(driver_function, driver_kwargs, endpoint.model)
+    async def _dispatch_async(self, call: PreparedCall):
+        if call.flight_key is not None and self.single_flight is not None:
+            return await self.single_flight.do_async(
+                call.flight_key, lambda: self._request_async(call)
+            )
+        return await self._request_async(call)
 
-    def _call_sync_endpoint(self, call: PreparedCall):
-        response = call.driver_function(**call.driver_kwargs)
-        return self._process_endpoint_response(call, response)
+    def _request_sync(self, call: PreparedCall):
+        if call.cache_key is None:
+            response = self._send_sync(call, call.driver_kwargs)
+            return self._process_endpoint_response(call, response)
 
-    async def _call_async_endpoint(self, call: PreparedCall):
-        response = await call.driver_function(**call.driver_kwargs)
-        return self._process_endpoint_response(call, response)
+        entry = self._cached_entry(call)
+        if entry is not None and entry.is_fresh():
+            if call.metrics is not None:
+                call.metrics.cached = True
+            return self._cached_value(call, entry)
+        response = self._send_sync(call, self._conditional_kwargs(call, entry))
+        return self._process_cacheable_response(call, entry, response)
+
+    async def _request_async(self, call: PreparedCall):
+        if call.cache_key is None:
+            response = await self._send_async(call, call.driver_kwargs)
+            return await self._aprocess_endpoint_response(call, response)
+
+        entry = await self._acache_io("get", call.cache_key)
+        if entry is not None and entry.is_fresh():
+            if call.metrics is not None:
+                call.metrics.cached = True
+            return await self._acached_value(call, entry)
+        response = await self._send_async(call, self._conditional_kwargs(call, entry))
+        if entry is not None and self._is_not_modified(call, response):
+            ttl = call.cache_ttl or 0.0
+            await self._acache_io("refresh", call.cache_key, entry, ttl)
+            return await self._acached_value(call, entry)
+        value = await self._aprocess_endpoint_response(call, response)
+        new_entry = self._response_entry(response, value, call.cache_ttl)
+        if new_entry is not None:
+            await self._acache_io("set", call.cache_key, new_entry)
+        return value
+
+    def _send_sync(self, call: PreparedCall, driver_kwargs: dict):
+        if call.metrics is None:
+            return self._send_with_policy_sync(call, driver_kwargs)
+        started = time.perf_counter()
+        try:
+            return self._send_with_policy_sync(call, driver_kwargs)
+        finally:
+            call.metrics.add("send", time.perf_counter() - started)
+
+    async def _send_async(self, call: PreparedCall, driver_kwargs: dict):
+        if call.metrics is None:
+            return await self._send_with_policy_async(call, driver_kwargs)
+        started = time.perf_counter()
+        try:
+            return await self._send_with_policy_async(call, driver_kwargs)
+        finally:
+            call.metrics.add("send", time.perf_counter() - started)
+
+    def _send_with_policy_sync(self, call: PreparedCall, driver_kwargs: dict):
+        policy = call.retry_policy
+        if policy is None:
+            return self._send_once_sync(call, driver_kwargs)
+
+        def send(timeout: Optional[float]):
+            if timeout is None:
+                return self._send_once_sync(call, driver_kwargs)
+            return self._send_once_sync(call, {**driver_kwargs, "timeout": timeout})
+
+        return send_with_retries(policy, send)
+
+    async def _send_with_policy_async(self, call: PreparedCall, driver_kwargs: dict):
+        policy = call.retry_policy
+        if policy is None:
+            return await self._send_once_async(call, driver_kwargs)
+
+        def send():
+            return self._send_once_async(call, driver_kwargs)
+
+        hedge = (
+            policy.hedge_after is not None
+            and call.plan is not None
+            and call.plan.method in IDEMPOTENT_METHODS
+        )
+        return await asend_with_retries(policy, send, hedge=hedge)
+
+    def _send_once_sync(self, call: PreparedCall, driver_kwargs: dict):
+        rate_limiters = self._rate_limiters(call, driver_kwargs["url"])
+        if not rate_limiters:
+            return call.driver_function(**driver_kwargs)
+        for limiter in rate_limiters:
+            limiter.acquire()
+        response = call.driver_function(**driver_kwargs)
+        for limiter in rate_limiters:
+            limiter.update_from_response(response)
+        return response
+
+    async def _send_once_async(self, call: PreparedCall, driver_kwargs: dict):
+        rate_limiters = self._rate_limiters(call, driver_kwargs["url"])
+        if not rate_limiters:
+            return await self._send_limited_async(call, driver_kwargs)
+        for limiter in rate_limiters:
+            await limiter.acquire_async()
+        response = await self._send_limited_async(call, driver_kwargs)
+        for limiter in rate_limiters:
+            limiter.update_from_response(response)
+        return response
+
+    async def _send_limited_async(self, call: PreparedCall, driver_kwargs: dict):
+        """Send within the adaptive concurrency limits, reporting the outcome."""
+        limiters = self._concurrency_limiters(call, driver_kwargs["url"])
+        if not limiters:
+            return await call.driver_function(**driver_kwargs)
+        acquired = []
+        try:
+            for limiter in limiters:
+                acquired.append((limiter, await limiter.acquire()))
+            response = await call.driver_function(**driver_kwargs)
+        except BaseException as exc:
+            for limiter, started in acquired:
+                limiter.release(started, error=exc)
+            raise
+        for limiter, started in acquired:
+            limiter.release(started, response.status_code)
+        return response
+
+    @asynccontextmanager
+    async def _astream_limited(
+        self, call: PreparedCall, stream: Callable, driver_kwargs: dict
+    ) -> AsyncIterator[httpx.Response]:
+        """Open an async stream within the adaptive concurrency limits.
+
+        The slot is held until the body is consumed; latency is measured up
+        to the response headers, so long downloads are not taken as overload.
+        """
+        limiters = self._concurrency_limiters(call, driver_kwargs["url"])
+        method = call.plan.method.upper() if call.plan else "GET"
+        if not limiters:
+            async with stream(method, **driver_kwargs) as response:
+                yield response
+            return
+        acquired = []
+        status_code = None
+        latency = None
+        try:
+            for limiter in limiters:
+                acquired.append((limiter, await limiter.acquire()))
+            sent = time.perf_counter()
+            async with stream(method, **driver_kwargs) as response:
+                status_code = response.status_code
+                latency = time.perf_counter() - sent
+                yield response
+        except BaseException as exc:
+            for limiter, started in acquired:
+                limiter.release(started, status_code, error=exc, latency=latency)
+            raise
+        for limiter, started in acquired:
+            limiter.release(started, status_code, latency=latency)
+
+    def _cached_entry(self, call: PreparedCall) -> Optional[CacheEntry]:
+        if self.cache is None:
+            return None
+        return self.cache.get(call.cache_key)
+
+    async def _acache_io(self, method: str, *args: Any) -> Any:
+        """Call a cache method, off the event loop for blocking caches."""
+        cache = self.cache
+        if cache is None:
+            return None
+        function = getattr(cache, method)
+        if not cache.blocking:
+            return function(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, function, *args)
+
+    def _conditional_kwargs(
+        self, call: PreparedCall, entry: Optional[CacheEntry]
+    ) -> dict:
+        if entry is None:
+            return call.driver_kwargs
+        conditional_headers = entry.conditional_headers()
+        if not conditional_headers:
+            return call.driver_kwargs
+        driver_kwargs = call.driver_kwargs.copy()
+        driver_kwargs["headers"] = {**driver_kwargs["headers"], **conditional_headers}
+        return driver_kwargs
+
+    def _process_cacheable_response(
+        self, call: PreparedCall, entry: Optional[CacheEntry], response
+    ):
+        if entry is not None and self._revalidated(call, entry, response):
+            return self._cached_value(call, entry)
+        value = self._process_endpoint_response(call, response)
+        self._store_response(call, response, value)
+        return value
+
+    def _revalidated(self, call: PreparedCall, entry: CacheEntry, response) -> bool:
+        """Refresh ``entry`` if the server answered 304 Not Modified."""
+        if self.cache is None or not self._is_not_modified(call, response):
+            return False
+        self.cache.refresh(call.cache_key, entry, call.cache_ttl or 0.0)
+        return True
+
+    def _is_not_modified(self, call: PreparedCall, response) -> bool:
+        if self.cache is None or response.status_code != httpx.codes.NOT_MODIFIED:
+            return False
+        if call.metrics is not None:
+            call.metrics.status_code = response.status_code
+            call.metrics.cached = True
+        return True
+
+    def _store_response(self, call: PreparedCall, response, value: Any):
+        entry = self._response_entry(response, value, call.cache_ttl)
+        if self.cache is not None and entry is not None:
+            self.cache.set(call.cache_key, entry)
+
+    def _response_entry(
+        self, response, value: Any, ttl: Optional[float]
+    ) -> Optional[CacheEntry]:
+        """The cache entry for a response, or None if it must not be stored."""
+        cache = self.cache
+        if cache is None:
+            return None
+        cache_control = response.headers.get("Cache-Control", "")
+        if response.status_code != httpx.codes.OK or "no-store" in cache_control:
+            return None
+        entry = CacheEntry(
+            value=value,
+            expires_at=time.monotonic() + (ttl or 0.0),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        if cache.raw_bodies:
+            entry.value = response.content
+            entry.content_type = response.headers.get("Content-Type")
+        return entry
+
+    def _cached_value(self, call: PreparedCall, entry: CacheEntry) -> Any:
+        """The result for a cache hit, decoding raw bodies from disk caches."""
+        if self.cache is None or not self.cache.raw_bodies:
+            return entry.value
+        body = entry.value
+        plan = call.plan
+        if (plan is not None and plan.endpoint.download is not None) or (
+            is_binary_content_type(entry.content_type)
+        ):
+            return body
+        try:
+            json_response = self._call_codec(call).loads(body)
+        except ValueError:
+            return body.decode("utf-8", "replace")
+        return self._build_response(call, json_response)
+
+    async def _acached_value(self, call: PreparedCall, entry: CacheEntry) -> Any:
+        plan = call.plan
+        if (
+            self.cache is None
+            or not self.cache.raw_bodies
+            or plan is None
+            or plan.endpoint.download is not None
+        ):
+            return self._cached_value(call, entry)
+        body = entry.value
+        mode = self.decode_executor.select(plan.endpoint.decode, len(body))
+        if mode == DecodeMode.INLINE or is_binary_content_type(entry.content_type):
+            return self._cached_value(call, entry)
+        endpoint = plan.endpoint
+        is_json, result, _, _ = await self.decode_executor.run(
+            mode,
+            plan.codec,
+            body,
+            call.model,
+            endpoint.response_shape,
+            endpoint.materialization,
+        )
+        if not is_json:
+            return body.decode("utf-8", "replace")
+        return result
 
     def _process_endpoint_response(self, call: PreparedCall, response):
         logger.debug(response.content)
+        metrics = call.metrics
+        if metrics is not None:
+            metrics.status_code = response.status_code
+            started = time.perf_counter()
         response.raise_for_status()
+        if call.plan is not None and call.plan.endpoint.download is not None:
+            return response.content
         try:
-            json_response = response.json()
-            if call.model:
-                return call.model(**json_response)
+            json_response = self._call_codec(call).decode(response)
+        except ValueError:
+            return self._non_json_body(response)
+        if metrics is None:
+            return self._build_response(call, json_response)
+
+        decoded = time.perf_counter()
+        metrics.add("decode", decoded - started)
+        result = self._build_response(call, json_response)
+        metrics.add("model_build", time.perf_counter() - decoded)
+        return result
+
+    async def _aprocess_endpoint_response(self, call: PreparedCall, response):
+        """Async ``_process_endpoint_response``, decoding off the loop if set."""
+        plan = call.plan
+        if plan is None or plan.endpoint.download is not None:
+            return self._process_endpoint_response(call, response)
+        content = response.content
+        mode = self.decode_executor.select(plan.endpoint.decode, len(content))
+        if mode == DecodeMode.INLINE:
+            return self._process_endpoint_response(call, response)
+
+        logger.debug(content)
+        metrics = call.metrics
+        if metrics is not None:
+            metrics.status_code = response.status_code
+            started = time.perf_counter()
+        response.raise_for_status()
+        endpoint = plan.endpoint
+        is_json, result, _, build_seconds = await self.decode_executor.run(
+            mode,
+            plan.codec,
+            content,
+            call.model,
+            endpoint.response_shape,
+            endpoint.materialization,
+        )
+        if not is_json:
+            return self._non_json_body(response)
+        if metrics is not None:
+            # Time spent waiting for a worker counts as decoding.
+            total = time.perf_counter() - started
+            metrics.add("decode", total - build_seconds)
+            metrics.add("model_build", build_seconds)
+        return result
+
+    def _non_json_body(self, response) -> Any:
+        # Binary bodies are returned as they are, not decoded as text.
+        if is_binary_content_type(response.headers.get("Content-Type")):
+            return response.content
+        return response.text
+
+    def _build_response(self, call: PreparedCall, json_response: Any) -> Any:
+        if not call.model:
             return json_response
-        except Exception:
-            return response.text
+        if call.plan is None:
+            return call.model(**json_response)
+        endpoint = call.plan.endpoint
+        return materialize(
+            call.model, json_response, endpoint.response_shape, endpoint.materialization
+        )
 
     def _create_methods(self, endpoint: Endpoint):
+        for attribute, kind in self._method_kinds(endpoint).items():
+            func_sig = self._method_signature(endpoint, kind)
+            method = self._create_method(endpoint, kind, func_sig)
+            setattr(self, attribute, method)  # noqa
+
+    def _method_kinds(self, endpoint: Endpoint) -> Dict[str, str]:
+        kinds = {endpoint.name: "sync", "async_" + endpoint.name: "async"}
+        if endpoint.pagination:
+            kinds["iter_" + endpoint.name] = "iter"
+            kinds["aiter_" + endpoint.name] = "aiter"
+        if endpoint.streaming:
+            kinds["stream_" + endpoint.name] = "stream"
+            kinds["astream_" + endpoint.name] = "astream"
+        if endpoint.download:
+            kinds["download_" + endpoint.name] = "download"
+            kinds["adownload_" + endpoint.name] = "adownload"
+            kinds["open_" + endpoint.name] = "open"
+            kinds["aopen_" + endpoint.name] = "aopen"
+        # Methods defined statically by a subclass, e.g. a client exported by
+        # codegen, are not generated again. RestAPI's own attributes are
+        # shadowed by endpoint methods, as instance attributes always did.
+        defined: Set[str] = set()
+        for cls in type(self).__mro__:
+            if cls is RestAPI:
+                break
+            defined.update(vars(cls))
+        return {
+            attribute: kind
+            for attribute, kind in kinds.items()
+            if attribute not in defined
+        }
+
+    def _method_signature(self, endpoint: Endpoint, kind: str = "sync") -> str:
         parameters = []
+        if kind in DOWNLOAD_KINDS:
+            parameters.append("destination")
         if endpoint.method in [HTTPMethod.POST, HTTPMethod.PUT, HTTPMethod.PATCH]:
             parameters.append("data: BaseModel = None")
 
@@ -217,49 +1571,179 @@ class RestAPI:
             for p_name, p_type in endpoint.query_parameters.items():
                 parameters.append(f"{p_name}:{p_type.__name__} = None")
 
+        if kind in DOWNLOAD_KINDS:
+            parameters.append("progress=None")
+            parameters.append("resume: bool = False")
+
         parameters_string = ",".join(parameters)
         logger.debug(parameters_string)
 
-        func_sig = f"{endpoint.name}({parameters_string})"
+        return f"{endpoint.name}({parameters_string})"
+
+    def _create_method(self, endpoint: Endpoint, kind: str, func_sig: str) -> Callable:
+        name = endpoint.name
+        if kind == "async":
+
+            async def async_func_impl(*args, **kwargs):
+                """Asynchronous endpoint call."""
+                return await self.call_async_endpoint(endpoint_name=name, **kwargs)
+
+            return create_function(func_sig, async_func_impl)
+
+        if kind == "adownload":
+
+            async def async_func_impl(*args, **kwargs):
+                """Asynchronously download the response to a destination."""
+                return await self.adownload_endpoint(endpoint_name=name, **kwargs)
 
-        def func_impl(*args, **kwargs):
-            """Synchronous endpoint call."""
-            return self.call_endpoint(endpoint_name=endpoint.name, **kwargs)
+            return create_function(func_sig, async_func_impl)
 
-        async def async_func_impl(*args, **kwargs):
-            """Asynchronous endpoint call."""
-            return await self.call_async_endpoint(endpoint_name=endpoint.name, **kwargs)
+        if kind == "sync":
 
-        dynamic_sync_function = create_function(func_sig, func_impl)
-        dynamic_async_function = create_function(func_sig, async_func_impl)
+            def func_impl(*args, **kwargs):
+                """Synchronous endpoint call."""
+                return self.call_endpoint(endpoint_name=name, **kwargs)
 
-        setattr(self, endpoint.name, dynamic_sync_function)  # noqa
-        setattr(self, "async_" + endpoint.name, dynamic_async_function)  # noqa
+        elif kind == "iter":
+
+            def func_impl(*args, **kwargs):
+                """Lazily iterate over the items of every page."""
+                return self.iter_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "aiter":
+
+            def func_impl(*args, **kwargs):
+                """Asynchronously iterate over the items of every page."""
+                return self.aiter_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "stream":
+
+            def func_impl(*args, **kwargs):
+                """Yield items while the response body downloads."""
+                return self.stream_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "astream":
+
+            def func_impl(*args, **kwargs):
+                """Asynchronously yield items while the response body downloads."""
+                return self.astream_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "download":
+
+            def func_impl(*args, **kwargs):
+                """Download the response to a path, file or buffer."""
+                return self.download_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "open":
+
+            def func_impl(*args, **kwargs):
+                """Open the response as a stream of byte chunks."""
+                return self.open_endpoint(endpoint_name=name, **kwargs)
+
+        elif kind == "aopen":
+
+            def func_impl(*args, **kwargs):
+                """Asynchronously open the response as a stream of byte chunks."""
+                return self.aopen_endpoint(endpoint_name=name, **kwargs)
+
+        else:
+            raise ValueError(f"Unknown endpoint method kind {kind}.")
+
+        return create_function(func_sig, func_impl)
 
     def get_path_parameters(self, path: str) -> Optional[List[str]]:
         _query_parameters: List[str] = []
-        params = re.findall(r"({[a-z_]+})", path)
+        params = PATH_PARAMETER_PATTERN.findall(path)
         if not params:
             return None
         for param in params:
-            _query_parameters.append(re.sub("{|}", "", str(param)))
+            _query_parameters.append(str(param))
         return _query_parameters
 
 
+def _origin(url: str) -> str:
+    start = url.find("://") + 3
+    end = url.find("/", start)
+    return url + "/" if end < 0 else url[: end + 1]
+
+
 class BearerHeaderToken(httpx.Auth, httpx_auth.authentication.SupportMultiAuth):
     """Describes a bearer token used in the header requests authentication."""
 
-    def __init__(self, bearer_token: str):
+    def __init__(
+        self,
+        bearer_token: Optional[str] = None,
+        provider: Optional[TokenProvider] = None,
+        refresh_margin: float = DEFAULT_REFRESH_MARGIN,
+        retry_unauthorized: bool = True,
+    ):
         """
         :param bearer_token: The bearer token that will be sent.
+        :param provider: Fetches expiring tokens instead of a static one. They
+        are refreshed in the background ``refresh_margin`` seconds before they
+        expire.
+        :param retry_unauthorized: Retry a request once with a new token when
+        it is answered with 401 Unauthorized.
         """
-        self.bearer_token = bearer_token
+        if provider is None:
+            if not bearer_token:
+                raise Exception("Bearer token is mandatory.")
+            provider = StaticTokenProvider(bearer_token)
+        elif bearer_token:
+            raise ValueError("Pass either a bearer token or a token provider.")
+        self.tokens = TokenCache(provider, refresh_margin)
+        self.retry_unauthorized = retry_unauthorized
+        self.header_name = "Authorization"
+
+    @property
+    def bearer_token(self) -> str:
+        return self.tokens.get().value
+
+    @bearer_token.setter
+    def bearer_token(self, bearer_token: str):
+        # Replaces any token provider with the new static token.
         if not bearer_token:
             raise Exception("Bearer token is mandatory.")
-        self.header_name = "Authorization"
+        self.tokens = TokenCache(
+            StaticTokenProvider(bearer_token), self.tokens.refresh_margin
+        )
 
     def auth_flow(
         self, request: httpx.Request
     ) -> Generator[httpx.Request, httpx.Response, None]:
-        request.headers[self.header_name] = f"Bearer {self.bearer_token}"
-        yield request
+        token = self.tokens.get()
+        request.headers[self.header_name] = f"Bearer {token.value}"
+        response = yield request
+        if self._should_retry(request, response):
+            token = self.tokens.refresh(token)
+            request.headers[self.header_name] = f"Bearer {token.value}"
+            yield request
+
+    def sync_auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        return self.auth_flow(request)
+
+    async def async_auth_flow(
+        self, request: httpx.Request
+    ) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        token = await self.tokens.aget()
+        request.headers[self.header_name] = f"Bearer {token.value}"
+        response = yield request
+        if self._should_retry(request, response):
+            token = await self.tokens.arefresh(token)
+            request.headers[self.header_name] = f"Bearer {token.value}"
+            yield request
+
+    def _should_retry(self, request: httpx.Request, response: httpx.Response) -> bool:
+        if (
+            not self.retry_unauthorized
+            or response.status_code != httpx.codes.UNAUTHORIZED
+        ):
+            return False
+        try:
+            # Streamed request bodies cannot be sent twice.
+            request.content
+        except httpx.RequestNotRead:
+            return False
+        return True
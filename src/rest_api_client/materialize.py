@@ -0,0 +1,108 @@
+from enum import Enum
+from typing import Any, Dict
+
+from pydantic import ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+
+
+class ResponseShape(Enum):
+    SINGLE = "single"
+    LIST = "list"
+    DICT = "dict"
+
+
+class Materialization(Enum):
+    # Full pydantic validation, the default.
+    VALIDATE = "validate"
+    # model.construct(): no validation, for trusted upstreams.
+    CONSTRUCT = "construct"
+    # LazyModel: each field is validated the first time it is read.
+    LAZY = "lazy"
+
+
+_MISSING = object()
+
+
+class LazyModel:
+    """Read-only proxy that validates a field of ``model`` on first access.
+
+    Field validators run per field; model-wide (root) validators do not.
+    Call ``materialize()`` to get a fully validated model instance.
+    """
+
+    __slots__ = ("_model", "_data", "_values")
+
+    def __init__(self, model: type, data: Dict[str, Any]):
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_data", data)
+        object.__setattr__(self, "_values", {})
+
+    def __getattr__(self, name: str) -> Any:
+        values = self._values
+        if name in values:
+            return values[name]
+        field = self._model.__fields__.get(name)
+        if field is None:
+            raise AttributeError(f"{self._model.__name__} has no field '{name}'.")
+
+        raw = self._data.get(field.alias, _MISSING)
+        if raw is _MISSING:
+            if field.required:
+                error = ErrorWrapper(MissingError(), loc=field.alias)
+                raise ValidationError([error], self._model)
+            value = field.get_default()
+        else:
+            value, errors = field.validate(
+                raw, self._data, loc=field.alias, cls=self._model
+            )
+            if errors:
+                raise ValidationError([errors], self._model)
+        values[name] = value
+        return value
+
+    def __setattr__(self, name: str, value: Any):
+        raise TypeError("LazyModel instances are read-only.")
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, LazyModel):
+            return self._model is other._model and self._data == other._data
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"LazyModel({self._model.__name__}, {self._data!r})"
+
+    def __reduce__(self):
+        # Rebuild through __init__, since __setattr__ is disabled.
+        return LazyModel, (self._model, self._data)
+
+    def materialize(self):
+        return self._model(**self._data)
+
+    def dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._model.__fields__}
+
+
+def build_model(model: type, data: Any, mode: Materialization) -> Any:
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected an object for {model.__name__}, got {type(data)}.")
+    if mode == Materialization.CONSTRUCT:
+        return model.construct(**data)  # type: ignore
+    if mode == Materialization.LAZY:
+        return LazyModel(model, data)
+    return model(**data)
+
+
+def materialize(
+    model: type, body: Any, shape: ResponseShape, mode: Materialization
+) -> Any:
+    """Turn a decoded response body into model instances of the given shape."""
+    if shape == ResponseShape.LIST:
+        if not isinstance(body, list):
+            raise ValueError(f"Expected a list response, got {type(body)}.")
+        return [build_model(model, item, mode) for item in body]
+    if shape == ResponseShape.DICT:
+        if not isinstance(body, dict):
+            raise ValueError(f"Expected a dict response, got {type(body)}.")
+        return {key: build_model(model, item, mode) for key, item in body.items()}
+    return build_model(model, body, mode)
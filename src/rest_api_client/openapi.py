@@ -0,0 +1,339 @@
+import hashlib
+import json
+import keyword
+import os
+import re
+import tempfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from pydantic import BaseModel, Field, create_model
+
+from .lib import Endpoint, HTTPMethod
+from .materialize import ResponseShape
+
+# Bump when the artifact layout changes, so stale artifacts are ignored.
+ARTIFACT_VERSION = 1
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+SUCCESS_STATUSES = ("200", "201", "202", "2XX", "default")
+SCALAR_TYPES: Dict[str, type] = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+}
+CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])([A-Z])")
+NON_IDENTIFIER = re.compile(r"[^a-zA-Z0-9_]+")
+PATH_PARAMETER = re.compile(r"{([^}]+)}")
+
+Spec = Union[str, Path, bytes, Dict[str, Any]]
+
+
+@dataclass
+class Operation:
+    """Endpoint data extracted from one OpenAPI operation."""
+
+    name: str
+    path: str
+    method: str
+    # Query parameter name -> OpenAPI scalar type name.
+    query_parameters: Dict[str, str] = field(default_factory=dict)
+    model: Optional[str] = None
+    response_shape: str = ResponseShape.SINGLE.value
+
+
+class OpenAPIRegistry:
+    """Endpoints and model schemas compiled from an OpenAPI 3 document.
+
+    ``load`` parses the document once and, given a ``cache_dir``, writes
+    the compiled operations and the schemas they reference to a JSON
+    artifact named after the document hash. Later loads of the same
+    document read that artifact instead of parsing the spec.
+
+    Pydantic models are only created when an endpoint that uses them is
+    requested, and are memoized afterwards.
+    """
+
+    def __init__(
+        self,
+        operations: Dict[str, Operation],
+        schemas: Dict[str, Dict[str, Any]],
+        api_url: Optional[str] = None,
+    ):
+        self.operations = operations
+        self.schemas = schemas
+        self.api_url = api_url
+        self._models: Dict[str, type] = {}
+
+    @classmethod
+    def load(
+        cls, spec: Spec, cache_dir: Optional[Union[str, Path]] = None
+    ) -> "OpenAPIRegistry":
+        raw, suffix = _read_spec(spec)
+        if cache_dir is None:
+            return cls.from_document(_parse_spec(raw, suffix))
+
+        digest = hashlib.sha256(raw).hexdigest()
+        artifact = Path(cache_dir) / f"openapi-{ARTIFACT_VERSION}-{digest}.json"
+        try:
+            return cls.from_artifact(json.loads(artifact.read_bytes()))
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        registry = cls.from_document(_parse_spec(raw, suffix))
+        registry.save(artifact)
+        return registry
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> "OpenAPIRegistry":
+        components = document.get("components", {}).get("schemas", {})
+        operations: Dict[str, Operation] = {}
+        # Operation name -> "METHOD path" it was compiled from.
+        sources: Dict[str, str] = {}
+        referenced: Set[str] = set()
+        for path, path_item in document.get("paths", {}).items():
+            shared_parameters = path_item.get("parameters", [])
+            for method, spec in path_item.items():
+                if method not in HTTPMethod._value2member_map_:
+                    continue
+                operation = _compile_operation(path, method, spec, shared_parameters)
+                source = f"{method.upper()} {path}"
+                if operation.name in sources:
+                    raise ValueError(
+                        f"Operations {sources[operation.name]} and {source} both "
+                        f"map to the endpoint name '{operation.name}'."
+                    )
+                sources[operation.name] = source
+                operations[operation.name] = operation
+                if operation.model:
+                    referenced.add(operation.model)
+
+        servers = document.get("servers") or [{}]
+        return cls(
+            operations,
+            _schema_closure(referenced, components),
+            api_url=servers[0].get("url"),
+        )
+
+    @classmethod
+    def from_artifact(cls, artifact: Dict[str, Any]) -> "OpenAPIRegistry":
+        if artifact["version"] != ARTIFACT_VERSION:
+            raise ValueError("Unsupported OpenAPI registry artifact version.")
+        operations = {
+            name: Operation(**operation)
+            for name, operation in artifact["operations"].items()
+        }
+        return cls(operations, artifact["schemas"], artifact["api_url"])
+
+    def to_artifact(self) -> Dict[str, Any]:
+        return {
+            "version": ARTIFACT_VERSION,
+            "api_url": self.api_url,
+            "operations": {
+                name: asdict(operation) for name, operation in self.operations.items()
+            },
+            "schemas": self.schemas,
+        }
+
+    def save(self, path: Union[str, Path]):
+        # Write then rename, so concurrent loaders never read a partial file.
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(self.to_artifact(), file)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def model(self, name: str) -> type:
+        model = self._models.get(name)
+        if model is None:
+            model = self._build_model(name, set())
+        return model
+
+    def endpoint(self, name: str) -> Endpoint:
+        operation = self.operations.get(name)
+        if operation is None:
+            raise KeyError(f"Operation {name} not found in the OpenAPI registry.")
+        return Endpoint(
+            name=operation.name,
+            path=operation.path,
+            method=HTTPMethod(operation.method),
+            model=self.model(operation.model) if operation.model else None,
+            query_parameters={
+                key: SCALAR_TYPES.get(kind, str)
+                for key, kind in operation.query_parameters.items()
+            }
+            or None,
+            response_shape=ResponseShape(operation.response_shape),
+        )
+
+    def endpoints(self, names: Optional[Iterable[str]] = None) -> List[Endpoint]:
+        """Endpoints for the given operations, or for all of them."""
+        if names is None:
+            names = self.operations
+        return [self.endpoint(name) for name in names]
+
+    def _build_model(self, name: str, building: Set[str]) -> type:
+        building.add(name)
+        schema = self.schemas.get(name, {})
+        required = set(schema.get("required", ()))
+        fields: Dict[str, Any] = {}
+        for key, field_schema in schema.get("properties", {}).items():
+            field_type = self._field_type(field_schema, building)
+            attribute = _identifier(key)
+            if hasattr(BaseModel, attribute):
+                # e.g. "json" or "copy" would shadow BaseModel methods.
+                attribute += "_"
+            if key in required:
+                fields[attribute] = (field_type, Field(..., alias=key))
+            else:
+                fields[attribute] = (Optional[field_type], Field(None, alias=key))
+        model = create_model(_class_name(name), **fields)  # type: ignore
+        self._models[name] = model
+        building.discard(name)
+        return model
+
+    def _field_type(self, schema: Dict[str, Any], building: Set[str]) -> Any:
+        name = _schema_name(schema)
+        if name is not None:
+            if name in self._models:
+                return self._models[name]
+            if name in building:
+                # Recursive schemas stay as plain data below the first level.
+                return Dict[str, Any]
+            return self._build_model(name, building)
+        kind = schema.get("type")
+        if kind == "array":
+            item_type = self._field_type(schema.get("items", {}), building)
+            return List[item_type]  # type: ignore
+        if kind == "object":
+            return Dict[str, Any]
+        return SCALAR_TYPES.get(kind, Any)  # type: ignore
+
+
+def _read_spec(spec: Spec) -> Tuple[bytes, str]:
+    if isinstance(spec, dict):
+        return json.dumps(spec, sort_keys=True).encode(), ".json"
+    if isinstance(spec, bytes):
+        return spec, ""
+    path = Path(spec)
+    return path.read_bytes(), path.suffix.lower()
+
+
+def _parse_spec(raw: bytes, suffix: str) -> Dict[str, Any]:
+    looks_like_json = raw.lstrip().startswith(b"{")
+    if suffix in (".yaml", ".yml") or (not suffix and not looks_like_json):
+        try:
+            import yaml  # type: ignore
+        except ImportError as exc:
+            raise ImportError(
+                "Loading YAML OpenAPI specs needs PyYAML installed."
+            ) from exc
+        return yaml.safe_load(raw)
+    return json.loads(raw)
+
+
+def _compile_operation(
+    path: str,
+    method: str,
+    spec: Dict[str, Any],
+    shared_parameters: List[Dict[str, Any]],
+) -> Operation:
+    name = _identifier(spec.get("operationId") or f"{method}_{path}")
+    query_parameters = {}
+    for parameter in [*shared_parameters, *spec.get("parameters", [])]:
+        key = parameter.get("name", "")
+        # Only names usable as keyword arguments become method parameters.
+        if (
+            parameter.get("in") == "query"
+            and key.isidentifier()
+            and not keyword.iskeyword(key)
+        ):
+            query_parameters[key] = parameter.get("schema", {}).get("type", "string")
+
+    model, shape = _response_model(spec.get("responses", {}))
+    return Operation(
+        name=name,
+        # RestAPI only understands snake_case path parameters.
+        path=PATH_PARAMETER.sub(
+            lambda match: "{" + _identifier(match.group(1)) + "}", path
+        ),
+        method=method,
+        query_parameters=query_parameters,
+        model=model,
+        response_shape=shape.value,
+    )
+
+
+def _response_model(responses: Dict[str, Any]) -> Tuple[Optional[str], ResponseShape]:
+    for status in SUCCESS_STATUSES:
+        content = responses.get(status, {}).get("content", {})
+        schema = content.get("application/json", {}).get("schema")
+        if schema is None:
+            continue
+        shape = ResponseShape.SINGLE
+        if schema.get("type") == "array":
+            schema = schema.get("items", {})
+            shape = ResponseShape.LIST
+        elif "$ref" not in schema and isinstance(
+            schema.get("additionalProperties"), dict
+        ):
+            schema = schema["additionalProperties"]
+            shape = ResponseShape.DICT
+        name = _schema_name(schema)
+        if name is not None:
+            return name, shape
+        return None, ResponseShape.SINGLE
+    return None, ResponseShape.SINGLE
+
+
+def _schema_closure(
+    names: Iterable[str], components: Dict[str, Any]
+) -> Dict[str, Dict[str, Any]]:
+    """The named schemas plus every schema they reference, transitively."""
+    schemas: Dict[str, Dict[str, Any]] = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in schemas or name not in components:
+            continue
+        schemas[name] = components[name]
+        pending.extend(_references(components[name]))
+    return schemas
+
+
+def _references(schema: Any) -> Iterable[str]:
+    if isinstance(schema, dict):
+        name = _schema_name(schema)
+        if name is not None:
+            yield name
+        for value in schema.values():
+            yield from _references(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _references(value)
+
+
+def _schema_name(schema: Dict[str, Any]) -> Optional[str]:
+    """Name of the component schema that ``schema`` references, if any."""
+    reference = schema.get("$ref")
+    if isinstance(reference, str) and reference.startswith(SCHEMA_REF_PREFIX):
+        return reference.split("/")[-1]
+    return None
+
+
+def _identifier(name: str) -> str:
+    name = CAMEL_BOUNDARY.sub(r"_\1", name)
+    name = NON_IDENTIFIER.sub("_", name).strip("_").lower()
+    if not name or name[0].isdigit() or keyword.iskeyword(name):
+        name = f"field_{name}"
+    return name
+
+
+def _class_name(name: str) -> str:
+    parts = NON_IDENTIFIER.split(name)
+    return "".join(part[:1].upper() + part[1:] for part in parts if part) or "Model"
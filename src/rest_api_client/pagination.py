@@ -0,0 +1,147 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+
+@dataclass
+class PageRequest:
+    """Query parameters for the next page, or an absolute URL to follow."""
+
+    params: Dict[str, Any] = field(default_factory=dict)
+    url: Optional[str] = None
+
+
+def lookup(body: Any, path: Optional[str]) -> Any:
+    """Resolve a dotted path such as ``data.items`` inside a decoded body."""
+    if not path:
+        return body
+    for key in path.split("."):
+        if not isinstance(body, dict):
+            return None
+        body = body.get(key)
+    return body
+
+
+class Pagination:
+    """Base pagination strategy.
+
+    ``items_field`` is the dotted path of the item list inside each page;
+    when omitted the page body itself must be the list.
+    """
+
+    def __init__(self, items_field: Optional[str] = None):
+        self.items_field = items_field
+
+    def first_request(self) -> PageRequest:
+        return PageRequest()
+
+    def items(self, body: Any) -> List[Any]:
+        items = lookup(body, self.items_field)
+        if items is None:
+            return []
+        if not isinstance(items, list):
+            raise ValueError(
+                f"Expected a list of items at '{self.items_field}', got {type(items)}."
+            )
+        return items
+
+    def next_request(
+        self,
+        response: httpx.Response,
+        body: Any,
+        request: PageRequest,
+        item_count: int,
+    ) -> Optional[PageRequest]:
+        raise NotImplementedError
+
+
+class CursorPagination(Pagination):
+    """Follows an opaque cursor returned in the body, e.g. Notion's ``next_cursor``."""
+
+    def __init__(
+        self,
+        cursor_param: str = "cursor",
+        cursor_field: str = "next_cursor",
+        items_field: Optional[str] = "results",
+        has_more_field: Optional[str] = None,
+    ):
+        super().__init__(items_field)
+        self.cursor_param = cursor_param
+        self.cursor_field = cursor_field
+        self.has_more_field = has_more_field
+
+    def next_request(self, response, body, request, item_count):
+        if self.has_more_field and not lookup(body, self.has_more_field):
+            return None
+        cursor = lookup(body, self.cursor_field)
+        if not cursor:
+            return None
+        return PageRequest(params={**request.params, self.cursor_param: cursor})
+
+
+class OffsetPagination(Pagination):
+    """Requests ``limit`` items at a time until a short page is returned."""
+
+    def __init__(
+        self,
+        offset_param: str = "offset",
+        limit_param: str = "limit",
+        limit: int = 100,
+        items_field: Optional[str] = None,
+    ):
+        super().__init__(items_field)
+        self.offset_param = offset_param
+        self.limit_param = limit_param
+        self.limit = limit
+
+    def first_request(self) -> PageRequest:
+        return PageRequest(params={self.offset_param: 0, self.limit_param: self.limit})
+
+    def next_request(self, response, body, request, item_count):
+        if item_count < self.limit:
+            return None
+        offset = request.params.get(self.offset_param, 0) + item_count
+        return PageRequest(params={**request.params, self.offset_param: offset})
+
+
+class PageNumberPagination(Pagination):
+    """Increments a page number until an empty (or short) page is returned."""
+
+    def __init__(
+        self,
+        page_param: str = "page",
+        first_page: int = 1,
+        page_size_param: Optional[str] = None,
+        page_size: Optional[int] = None,
+        items_field: Optional[str] = None,
+    ):
+        super().__init__(items_field)
+        self.page_param = page_param
+        self.first_page = first_page
+        self.page_size_param = page_size_param
+        self.page_size = page_size
+
+    def first_request(self) -> PageRequest:
+        params: Dict[str, Any] = {self.page_param: self.first_page}
+        if self.page_size_param and self.page_size:
+            params[self.page_size_param] = self.page_size
+        return PageRequest(params=params)
+
+    def next_request(self, response, body, request, item_count):
+        if item_count == 0:
+            return None
+        if self.page_size and item_count < self.page_size:
+            return None
+        page = request.params.get(self.page_param, self.first_page) + 1
+        return PageRequest(params={**request.params, self.page_param: page})
+
+
+class LinkHeaderPagination(Pagination):
+    """Follows the ``rel="next"`` URL of an RFC 5988 ``Link`` header."""
+
+    def next_request(self, response, body, request, item_count):
+        next_link = response.links.get("next")
+        if not next_link or not next_link.get("url"):
+            return None
+        return PageRequest(url=str(response.url.join(next_link["url"])))
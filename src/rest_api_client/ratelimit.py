@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+REMAINING_HEADER = "X-RateLimit-Remaining"
+RESET_HEADER = "X-RateLimit-Reset"
+# Reset values above this are treated as epoch timestamps, below as seconds.
+EPOCH_THRESHOLD = 10**9
+
+
+class TokenBucket:
+    """Token-bucket rate limiter shared by the sync and async call paths.
+
+    ``rate`` is the number of requests per second and ``burst`` the bucket
+    capacity. Callers reserve a token under a short lock and then wait
+    outside of it, with ``time.sleep`` in ``acquire`` and ``asyncio.sleep``
+    in ``acquire_async``, so waiting never blocks the event loop.
+
+    With ``adaptive`` on, the rate is recomputed from the
+    ``X-RateLimit-Remaining`` and ``X-RateLimit-Reset`` response headers,
+    spreading the remaining quota over the time left in the window, and
+    bounded by ``min_rate`` and ``max_rate``.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        adaptive: bool = False,
+        min_rate: float = 0.1,
+        max_rate: Optional[float] = None,
+        remaining_header: str = REMAINING_HEADER,
+        reset_header: str = RESET_HEADER,
+    ):
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive.")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.remaining_header = remaining_header
+        self.reset_header = reset_header
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def update_from_response(self, response: Any):
+        if self.adaptive:
+            self.update_from_headers(response.headers)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        try:
+            remaining = float(headers[self.remaining_header])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        reset_in = None
+        try:
+            reset = float(headers[self.reset_header])
+            reset_in = reset - time.time() if reset > EPOCH_THRESHOLD else reset
+        except (KeyError, TypeError, ValueError):
+            pass
+
+        with self._lock:
+            if reset_in is not None and reset_in > 0:
+                rate = max(self.min_rate, remaining / reset_in)
+                if self.max_rate is not None:
+                    rate = min(self.max_rate, rate)
+                self.rate = rate
+            # Never hold more local tokens than the server says are left.
+            self._tokens = min(self._tokens, remaining)
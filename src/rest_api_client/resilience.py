@@ -0,0 +1,177 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, FrozenSet, Optional, Tuple, Type
+
+import httpx
+from pydantic import BaseModel
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"get", "put", "delete"})
+
+
+class RetryPolicy(BaseModel):
+    """Retry, backoff and hedging settings for an endpoint.
+
+    Delays grow as ``backoff_base * 2 ** (attempt - 1)`` up to
+    ``backoff_max``, with full jitter unless ``jitter`` is off. A
+    ``Retry-After`` header on a retried response takes precedence over the
+    computed delay. ``deadline`` bounds the total time spent on one call,
+    retries included. ``hedge_after`` (typically the endpoint's p95
+    latency) sends up to ``max_hedges`` duplicate requests for idempotent
+    methods on the async path; the first response wins.
+
+    Only idempotent methods are retried, since a POST or PATCH that timed
+    out may already have been applied; set ``retry_non_idempotent`` for
+    endpoints known to be safe to repeat.
+    """
+
+    max_attempts: int = 3
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+    retry_exceptions: Tuple[Type[Exception], ...] = (httpx.TransportError,)
+    backoff_base: float = 0.1
+    backoff_max: float = 10.0
+    jitter: bool = True
+    respect_retry_after: bool = True
+    deadline: Optional[float] = None
+    hedge_after: Optional[float] = None
+    max_hedges: int = 1
+    retry_non_idempotent: bool = False
+
+    class Config:
+        allow_mutation = False
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+    def next_delay(
+        self, attempt: int, response: Any, deadline: Optional[float]
+    ) -> Optional[float]:
+        """Seconds to wait before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        delay = None
+        if response is not None and self.respect_retry_after:
+            delay = retry_after(response)
+        if delay is None:
+            delay = self.backoff(attempt)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+
+def retry_after(response: Any) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def send_with_retries(
+    policy: RetryPolicy,
+    send: Callable[[Optional[float]], Any],
+    sleep: Callable[[float], Any] = time.sleep,
+):
+    """Call ``send(timeout)`` until it succeeds or the policy gives up.
+
+    Responses with a retryable status are returned as-is once retries are
+    exhausted, so the caller's usual status handling still applies.
+    """
+    deadline = None
+    if policy.deadline is not None:
+        deadline = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            response = send(remaining(deadline))
+        except policy.retry_exceptions:
+            delay = policy.next_delay(attempt, None, deadline)
+            if delay is None:
+                raise
+            sleep(delay)
+            continue
+        if response.status_code in policy.retry_statuses:
+            delay = policy.next_delay(attempt, response, deadline)
+            if delay is not None:
+                sleep(delay)
+                continue
+        return response
+
+
+async def asend_with_retries(
+    policy: RetryPolicy,
+    send: Callable[[], Awaitable[Any]],
+    hedge: bool = False,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+):
+    """Async version of ``send_with_retries`` with optional hedging."""
+    deadline = None
+    if policy.deadline is not None:
+        deadline = time.monotonic() + policy.deadline
+    attempt = 0
+    while True:
+        attempt += 1
+        attempt_send = send_hedged(policy, send) if hedge else send()
+        try:
+            if deadline is None:
+                response = await attempt_send
+            else:
+                response = await asyncio.wait_for(attempt_send, remaining(deadline))
+        except policy.retry_exceptions:
+            delay = policy.next_delay(attempt, None, deadline)
+            if delay is None:
+                raise
+            await sleep(delay)
+            continue
+        if response.status_code in policy.retry_statuses:
+            delay = policy.next_delay(attempt, response, deadline)
+            if delay is not None:
+                await sleep(delay)
+                continue
+        return response
+
+
+async def send_hedged(policy: RetryPolicy, send: Callable[[], Awaitable[Any]]):
+    """Send duplicates after ``hedge_after`` seconds; the first response wins."""
+    tasks = {asyncio.ensure_future(send())}
+    launched = 1
+    error: Optional[BaseException] = None
+    try:
+        while tasks:
+            timeout = policy.hedge_after if launched <= policy.max_hedges else None
+            done, tasks = await asyncio.wait(
+                tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                tasks.add(asyncio.ensure_future(send()))
+                launched += 1
+                continue
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+                error = task.exception()
+        assert error is not None
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers with the same key.
+
+    Sync callers are coalesced across threads: the first caller runs the
+    call and the others block until it finishes. Async callers await one
+    shared task per event loop; each caller awaits it through
+    ``asyncio.shield`` so cancelling one caller does not cancel the others.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = call()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result
+
+    async def do_async(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        # Tasks belong to one event loop, so flights are never shared across loops.
+        task_key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+        return await asyncio.shield(task)
+
+    def __len__(self) -> int:
+        return len(self._flights) + len(self._tasks)
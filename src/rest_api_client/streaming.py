@@ -0,0 +1,182 @@
+import json
+import re
+from enum import Enum
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Iterator, List
+
+WHITESPACE = b" \t\r\n"
+
+
+class StreamFormat(Enum):
+    JSON_ARRAY = "json_array"
+    NDJSON = "ndjson"
+
+
+class JSONArrayDecoder:
+    """Incrementally splits a top-level JSON array into decoded elements.
+
+    Chunks are scanned for element boundaries with a small state machine,
+    and each complete element is decoded on its own, so the buffer never
+    holds much more than one element.
+    """
+
+    _structural = re.compile(rb'[\[\]{}"]')
+    _string_end = re.compile(rb'(?:[^"\\]|\\.)*"', re.S)
+    _scalar_end = re.compile(rb"[\s,\]]")
+
+    def __init__(self, loads: Callable[[bytes], Any] = json.loads):
+        self._loads = loads
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._in_string = False
+        self._opened = False
+        self._closed = False
+        # Separator state: an element was just read / a comma was just read.
+        self._after_element = False
+        self._after_comma = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buffer += chunk
+        elements: List[Any] = []
+        buffer = self._buffer
+        size = len(buffer)
+
+        while self._pos < size:
+            if self._start < 0:
+                self._skip()
+                if self._pos == size:
+                    break
+                char = buffer[self._pos]
+                if not self._opened:
+                    if char != ord("["):
+                        raise ValueError("Streamed response is not a JSON array.")
+                    self._opened = True
+                    self._pos += 1
+                elif self._closed:
+                    raise ValueError("Unexpected data after the end of the JSON array.")
+                elif char == ord("]"):
+                    if self._after_comma:
+                        raise ValueError("Trailing comma in streamed JSON array.")
+                    self._closed = True
+                    self._pos += 1
+                elif char == ord(","):
+                    if not self._after_element:
+                        raise ValueError("Unexpected comma in streamed JSON array.")
+                    self._after_element = False
+                    self._after_comma = True
+                    self._pos += 1
+                else:
+                    if self._after_element:
+                        raise ValueError("Missing comma in streamed JSON array.")
+                    self._after_comma = False
+                    self._start = self._pos
+                    self._depth = 0
+                continue
+
+            if self._in_string:
+                match = self._string_end.match(buffer, self._pos)
+                if not match:
+                    break
+                self._pos = match.end()
+                self._in_string = False
+                if self._depth == 0:
+                    elements.append(self._emit(self._pos))
+                continue
+
+            if self._depth == 0 and buffer[self._start] not in b'[{"':
+                match = self._scalar_end.search(buffer, self._pos)
+                if not match:
+                    self._pos = size
+                    break
+                self._pos = match.start()
+                elements.append(self._emit(self._pos))
+                continue
+
+            match = self._structural.search(buffer, self._pos)
+            if not match:
+                self._pos = size
+                break
+            token = match.group()
+            self._pos = match.end()
+            if token == b'"':
+                self._in_string = True
+            elif token in (b"[", b"{"):
+                self._depth += 1
+            else:
+                self._depth -= 1
+                if self._depth == 0:
+                    elements.append(self._emit(self._pos))
+
+        self._compact()
+        return elements
+
+    def close(self) -> List[Any]:
+        if not self._closed:
+            raise ValueError("Truncated JSON array in streamed response.")
+        return []
+
+    def _skip(self):
+        buffer = self._buffer
+        size = len(buffer)
+        while self._pos < size and buffer[self._pos] in WHITESPACE:
+            self._pos += 1
+
+    def _emit(self, end: int) -> Any:
+        start, self._start = self._start, -1
+        self._after_element = True
+        return self._loads(bytes(self._buffer[start:end]))
+
+    def _compact(self):
+        consumed = self._pos if self._start < 0 else self._start
+        if consumed:
+            del self._buffer[:consumed]
+            self._pos -= consumed
+            if self._start >= 0:
+                self._start = 0
+
+
+class NDJSONDecoder:
+    """Incrementally decodes newline-delimited JSON."""
+
+    def __init__(self, loads: Callable[[bytes], Any] = json.loads):
+        self._loads = loads
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._buffer += chunk
+        end = self._buffer.rfind(b"\n")
+        if end < 0:
+            return []
+        lines = bytes(self._buffer[:end]).split(b"\n")
+        del self._buffer[: end + 1]
+        return [self._loads(line) for line in lines if line.strip()]
+
+    def close(self) -> List[Any]:
+        line = bytes(self._buffer)
+        self._buffer.clear()
+        if line.strip():
+            return [self._loads(line)]
+        return []
+
+
+def make_decoder(
+    stream_format: StreamFormat, loads: Callable[[bytes], Any] = json.loads
+):
+    if stream_format == StreamFormat.NDJSON:
+        return NDJSONDecoder(loads)
+    return JSONArrayDecoder(loads)
+
+
+def iter_decoded(chunks: Iterable[bytes], decoder) -> Iterator[Any]:
+    for chunk in chunks:
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+async def aiter_decoded(chunks: AsyncIterable[bytes], decoder) -> AsyncIterator[Any]:
+    async for chunk in chunks:
+        for element in decoder.feed(chunk):
+            yield element
+    for element in decoder.close():
+        yield element
@@ -0,0 +1,165 @@
+import io
+import os
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from pydantic import BaseModel
+
+from .codec import JSONCodec
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+OCTET_STREAM_MIMETYPE = "application/octet-stream"
+NDJSON_MIMETYPE = "application/x-ndjson"
+# Bodies of these types are encoded as one JSON document.
+JSON_BODY_TYPES = (dict, list, tuple, BaseModel)
+
+
+class NDJSON:
+    """Request body that serializes ``items`` lazily, one JSON line each.
+
+    ``items`` may be a sync or an async iterable of models or plain JSON
+    values. Lines are encoded with the endpoint's codec and sent in chunks
+    of about ``chunk_size`` bytes, so only one chunk is held in memory.
+    """
+
+    def __init__(
+        self,
+        items: Union[Iterable[Any], AsyncIterable[Any]],
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.items = items
+        self.chunk_size = chunk_size
+
+    def chunks(self, codec: JSONCodec) -> Union[Iterator[bytes], AsyncIterator[bytes]]:
+        if isinstance(self.items, AsyncIterable):
+            return self._achunks(codec)
+        return self._chunks(codec)
+
+    def _chunks(self, codec: JSONCodec) -> Iterator[bytes]:
+        buffer = bytearray()
+        for item in self.items:  # type: ignore
+            buffer += codec.dumps(item)
+            buffer += b"\n"
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    async def _achunks(self, codec: JSONCodec) -> AsyncIterator[bytes]:
+        buffer = bytearray()
+        async for item in self.items:  # type: ignore
+            buffer += codec.dumps(item)
+            buffer += b"\n"
+            if len(buffer) >= self.chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+
+def is_streaming_body(data: Any) -> bool:
+    """Whether ``data`` is sent as raw or streamed bytes instead of JSON."""
+    if isinstance(data, JSON_BODY_TYPES) or isinstance(data, str):
+        return False
+    return (
+        isinstance(data, (NDJSON, Iterable, AsyncIterable))
+        or hasattr(data, "read")
+        or _is_buffer(data)
+    )
+
+
+def stream_body(
+    data: Any,
+    codec: JSONCodec,
+    asynchronous: bool,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[Any, Dict[str, str]]:
+    """Driver ``content`` for a non-JSON body, plus its extra headers.
+
+    Bytes are sent as they are. Buffers such as ``mmap`` objects are sent
+    as zero-copy ``memoryview`` slices and files are read in chunks, both
+    with a Content-Length. NDJSON bodies and other iterables of bytes are
+    sent with chunked transfer encoding. Sync sources are adapted for the
+    async driver.
+    """
+    headers = {"Content-Type": OCTET_STREAM_MIMETYPE}
+    length: Optional[int] = None
+    if isinstance(data, NDJSON):
+        headers["Content-Type"] = NDJSON_MIMETYPE
+        content: Any = data.chunks(codec)
+    elif isinstance(data, bytes):
+        return data, headers
+    elif _is_buffer(data):
+        # Checked before files: mmap objects also have a read method.
+        view = memoryview(data).cast("B")
+        length = len(view)
+        content = iter_buffer(view, chunk_size)
+    elif hasattr(data, "read"):
+        if not isinstance(data, io.TextIOBase):
+            length = _remaining_length(data)
+        content = iter_file(data, chunk_size)
+    elif isinstance(data, (Iterable, AsyncIterable)):
+        content = data
+    else:
+        raise TypeError(f"Unsupported request body type {type(data)}.")
+
+    if length is not None:
+        headers["Content-Length"] = str(length)
+    if asynchronous and not isinstance(content, AsyncIterable):
+        content = aiter_chunks(content)
+    elif not asynchronous and not isinstance(content, Iterable):
+        raise TypeError("Async iterable bodies need an async call.")
+    return content, headers
+
+
+def iter_file(file: Any, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+
+
+def iter_buffer(
+    view: memoryview, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    for start in range(0, len(view), chunk_size):
+        end = start + chunk_size
+        yield view[start:end]
+
+
+async def aiter_chunks(chunks: Iterable[Any]) -> AsyncIterator[Any]:
+    for chunk in chunks:
+        yield chunk
+
+
+def _is_buffer(data: Any) -> bool:
+    try:
+        memoryview(data)
+    except TypeError:
+        return False
+    return True
+
+
+def _remaining_length(file: Any) -> Optional[int]:
+    try:
+        return os.fstat(file.fileno()).st_size - file.tell()
+    except (AttributeError, OSError, ValueError):
+        pass
+    try:
+        offset = file.tell()
+        end = file.seek(0, os.SEEK_END)
+        file.seek(offset)
+        return end - offset
+    except (AttributeError, OSError, ValueError):
+        return None
@@ -0,0 +1,27 @@
+import httpx
+import pytest_asyncio
+from src.rest_api_client.driver import HttpDriver
+from src.rest_api_client.lib import RestAPI
+
+BASE_URL = "https://api.example.com/v1"
+
+
+@pytest_asyncio.fixture
+async def make_api():
+    """Builds RestAPIs whose requests are answered by a mock handler.
+
+    ``make_api(handler, endpoints, **options)`` returns a RestAPI on
+    ``BASE_URL`` whose sync and async clients send every request to
+    ``handler``, with ``auth`` if given. The clients are closed when the
+    test ends.
+    """
+    drivers = []
+
+    def make(handler, endpoints, auth=None, **options) -> RestAPI:
+        driver = HttpDriver(transport=httpx.MockTransport(handler), auth=auth)
+        drivers.append(driver)
+        return RestAPI(api_url=BASE_URL, driver=driver, endpoints=endpoints, **options)
+
+    yield make
+    for driver in drivers:
+        await driver.aclose()
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+import pytest
+import httpx
+from src.rest_api_client.lib import BearerHeaderToken, Endpoint
+from src.rest_api_client.auth import FunctionTokenProvider, Token, TokenCache
+
+
+class CountingProvider(FunctionTokenProvider):
+    def __init__(self, expires_in=None, delay=0.0):
+        self.calls = 0
+        self.expires_in = expires_in
+        self.delay = delay
+        super().__init__(self._next, self._anext)
+
+    def _next(self):
+        time.sleep(self.delay)
+        self.calls += 1
+        return Token.expiring_in(f"token-{self.calls}", self.expires_in)
+
+    async def _anext(self):
+        await asyncio.sleep(self.delay)
+        self.calls += 1
+        return Token.expiring_in(f"token-{self.calls}", self.expires_in)
+
+
+def handler(request: httpx.Request):
+    # Only the second token is accepted.
+    if request.headers["Authorization"] != "Bearer token-2":
+        return httpx.Response(401)
+    return httpx.Response(200, json={"ok": True})
+
+
+ENDPOINTS = [
+    Endpoint(name="get_items", path="/items"),
+    Endpoint(name="create_item", path="/items"),
+]
+
+
+def test_token_expiry():
+    token = Token.expiring_in("abc", 10)
+    assert not token.is_expired()
+    assert token.expires_within(10)
+    assert not token.expires_within(5)
+    assert not Token("abc").expires_within(10**9)
+
+
+def test_static_token():
+    auth = BearerHeaderToken(bearer_token="ABC")
+    assert auth.bearer_token == "ABC"
+    with pytest.raises(Exception):
+        BearerHeaderToken()
+
+
+def test_bearer_token_can_be_replaced(make_api):
+    requests = []
+
+    def record(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json={"ok": True})
+
+    auth = BearerHeaderToken(provider=CountingProvider())
+    api = make_api(record, ENDPOINTS, auth=auth)
+    api.get_items()
+    auth.bearer_token = "ABC"
+    api.get_items()
+    assert auth.bearer_token == "ABC"
+    assert [request.headers["Authorization"] for request in requests] == [
+        "Bearer token-1",
+        "Bearer ABC",
+    ]
+    with pytest.raises(Exception):
+        auth.bearer_token = ""
+
+
+def test_refresh_ahead_of_expiry_in_background():
+    provider = CountingProvider(expires_in=30, delay=0.05)
+    tokens = TokenCache(provider, refresh_margin=60)
+    assert tokens.get().value == "token-1"
+    # Inside the refresh margin: the current token is returned right away.
+    started = time.perf_counter()
+    assert tokens.get().value == "token-1"
+    assert tokens.get().value == "token-1"
+    assert time.perf_counter() - started < 0.05
+    for _ in range(100):
+        if tokens.refreshes == 2:
+            break
+        time.sleep(0.01)
+    assert provider.calls == 2
+    assert tokens.token.value == "token-2"
+
+
+def test_concurrent_refreshes_are_single_flight():
+    provider = CountingProvider(delay=0.05)
+    tokens = TokenCache(provider)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(tokens.get().value))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert provider.calls == 1
+    assert results == ["token-1"] * 10
+
+
+def test_retry_once_on_unauthorized(make_api):
+    provider = CountingProvider()
+    api = make_api(handler, ENDPOINTS, auth=BearerHeaderToken(provider=provider))
+    assert api.get_items() == {"ok": True}
+    assert api.create_item(data={"name": "a"}) == {"ok": True}
+    assert provider.calls == 2
+
+
+def test_streamed_bodies_are_not_retried(make_api):
+    auth = BearerHeaderToken(provider=CountingProvider())
+    api = make_api(handler, ENDPOINTS, auth=auth)
+    with pytest.raises(httpx.HTTPStatusError):
+        api.create_item(data=iter([b"chunk"]))
+
+
+@pytest.mark.asyncio
+async def test_async_refresh_and_retry(make_api):
+    provider = CountingProvider(delay=0.01)
+    api = make_api(handler, ENDPOINTS, auth=BearerHeaderToken(provider=provider))
+    results = await asyncio.gather(*(api.async_get_items() for _ in range(10)))
+    assert results == [{"ok": True}] * 10
+    # One fetch for the first token, one shared refresh after the 401s.
+    assert provider.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_async_background_refresh():
+    provider = CountingProvider(expires_in=30)
+    tokens = TokenCache(provider, refresh_margin=60)
+    assert (await tokens.aget()).value == "token-1"
+    assert (await tokens.aget()).value == "token-1"
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert provider.calls == 2
+    assert tokens.token.value == "token-2"
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import pytest
+import httpx
+from src.rest_api_client.lib import RestAPI, Endpoint
+from src.rest_api_client.background import BackgroundExecutor, ConcurrencyBackend
+
+
+class InFlight:
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self.threads = set()
+        self.lock = threading.Lock()
+
+    def enter(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+            self.threads.add(threading.current_thread().name)
+
+    def exit(self):
+        with self.lock:
+            self.current -= 1
+
+
+def respond(request: httpx.Request):
+    item_id = request.url.path.rsplit("/", 1)[-1]
+    if item_id == "missing":
+        return httpx.Response(404)
+    return httpx.Response(200, json={"id": item_id})
+
+
+ENDPOINTS = [Endpoint(name="get_item", path="/items/{item_id}")]
+
+
+def test_event_loop_backend(make_api):
+    flight = InFlight()
+
+    async def handler(request: httpx.Request):
+        flight.enter()
+        await asyncio.sleep(0.05)
+        flight.exit()
+        return respond(request)
+
+    api = make_api(handler, ENDPOINTS)
+    parameters = [{"item_id": str(index)} for index in range(20)] + [
+        {"item_id": "missing"}
+    ]
+    results = api.call_batch("get_item", parameters, concurrency=10)
+    assert api.background.backend == ConcurrencyBackend.EVENT_LOOP
+    assert [result.result for result in results[:3]] == [
+        {"id": "0"},
+        {"id": "1"},
+        {"id": "2"},
+    ]
+    assert isinstance(results[-1].exception, httpx.HTTPStatusError)
+    assert flight.peak == 10
+    assert flight.threads == {"rest-api-event-loop"}
+
+    futures = [api.submit("get_item", item_id=str(index)) for index in range(5)]
+    assert [future.result() for future in futures] == [
+        {"id": str(index)} for index in range(5)
+    ]
+    # The async client was opened on the background loop, so close it there.
+    api.background.run(api.driver.aclose())
+    api.close()
+    assert api.background is None
+
+
+def test_thread_backend(make_api):
+    flight = InFlight()
+
+    def handler(request: httpx.Request):
+        flight.enter()
+        time.sleep(0.05)
+        flight.exit()
+        return respond(request)
+
+    background = BackgroundExecutor(ConcurrencyBackend.THREADS, max_workers=4)
+    api = make_api(handler, ENDPOINTS, background=background)
+    started = time.perf_counter()
+    results = api.call_batch(
+        "get_item", ({"item_id": str(index)} for index in range(12))
+    )
+    elapsed = time.perf_counter() - started
+    future = api.submit("get_item", item_id="missing")
+    with pytest.raises(httpx.HTTPStatusError):
+        future.result()
+    assert [result.index for result in results] == list(range(12))
+    assert all(result.ok for result in results)
+    assert flight.peak == 4
+    assert elapsed < 12 * 0.05
+    background.shutdown()
+
+
+def test_default_backend_follows_driver():
+    with httpx.Client(transport=httpx.MockTransport(respond)) as client:
+        api = RestAPI(
+            api_url="https://api.example.com/v1", driver=client, endpoints=ENDPOINTS
+        )
+        assert api.call_batch("get_item", [{"item_id": "1"}])[0].result == {"id": "1"}
+        assert api.background.backend == ConcurrencyBackend.THREADS
+        api.close()
+
+
+def test_run_from_loop_thread_is_refused():
+    background = BackgroundExecutor()
+
+    async def nested():
+        return background.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        background.run(nested())
+    background.shutdown()
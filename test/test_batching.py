@@ -0,0 +1,172 @@
+import asyncio
+import json
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.batching import (
+    BatchItemMissing,
+    BatchLoader,
+    BodyBatching,
+    QueryBatching,
+)
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class Upstream:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request):
+        self.requests.append(request)
+        if self.status_code != 200:
+            return httpx.Response(self.status_code)
+        if request.method == "POST":
+            ids = json.loads(request.content)["ids"]
+            pantry = request.url.path.split("/")[3]
+            return httpx.Response(
+                200, json=[{"id": i, "name": f"{pantry}-{i}"} for i in ids]
+            )
+        ids = request.url.params["ids"].split(",")
+        # Unknown ids are left out and items come back in any order.
+        items = [{"id": int(i), "name": f"item-{i}"} for i in ids if i != "404"]
+        return httpx.Response(200, json={"data": {"items": items[::-1]}})
+
+
+def item_endpoints(batching):
+    return [
+        Endpoint(
+            name="get_item",
+            path="/items/{item_id}",
+            model=Item,
+            batching=batching,
+        ),
+        Endpoint(name="get_items", path="/items", query_parameters={"ids": str}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_calls_in_window_share_one_request(make_api):
+    upstream = Upstream()
+    batching = QueryBatching(
+        "get_items", key="item_id", items_field="data.items", item_key_field="id"
+    )
+    api = make_api(upstream, item_endpoints(batching))
+    results = await asyncio.gather(
+        *(api.async_get_item(item_id=i) for i in [1, 2, 3, 2, 404]),
+        return_exceptions=True,
+    )
+    assert len(upstream.requests) == 1
+    assert upstream.requests[0].url.params["ids"] == "1,2,3,404"
+    assert results[:4] == [
+        Item(id=1, name="item-1"),
+        Item(id=2, name="item-2"),
+        Item(id=3, name="item-3"),
+        Item(id=2, name="item-2"),
+    ]
+    assert isinstance(results[4], BatchItemMissing)
+    assert results[4].key == 404
+
+
+@pytest.mark.asyncio
+async def test_full_batches_are_sent_at_once(make_api):
+    upstream = Upstream()
+    batching = QueryBatching(
+        "get_items",
+        key="item_id",
+        items_field="data.items",
+        item_key_field="id",
+        max_batch_size=2,
+        window=10,
+    )
+    api = make_api(upstream, item_endpoints(batching))
+    results = await asyncio.wait_for(
+        asyncio.gather(*(api.async_get_item(item_id=i) for i in range(4))), 1
+    )
+    assert [item.id for item in results] == [0, 1, 2, 3]
+    assert [r.url.params["ids"] for r in upstream.requests] == ["0,1", "2,3"]
+
+
+@pytest.mark.asyncio
+async def test_body_batches_group_by_other_arguments(make_api):
+    upstream = Upstream()
+    endpoints = [
+        Endpoint(
+            name="get_basket",
+            path="/pantries/{pantry_id}/baskets/{basket_id}",
+            batching=BodyBatching("post_baskets", key="basket_id"),
+        ),
+        Endpoint(name="post_baskets", path="/pantries/{pantry_id}/baskets:batch"),
+    ]
+    api = make_api(upstream, endpoints)
+    parameters = [
+        {"pantry_id": pantry, "basket_id": basket}
+        for pantry in ["a", "b"]
+        for basket in range(3)
+    ]
+    results = await api.call_async_batch("get_basket", parameters)
+    assert len(upstream.requests) == 2
+    assert [result.result["name"] for result in results] == [
+        "a-0",
+        "a-1",
+        "a-2",
+        "b-0",
+        "b-1",
+        "b-2",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_errors_reach_every_caller(make_api):
+    upstream = Upstream(status_code=500)
+    batching = QueryBatching("get_items", key="item_id")
+    api = make_api(upstream, item_endpoints(batching))
+    results = await asyncio.gather(
+        *(api.async_get_item(item_id=i) for i in range(3)), return_exceptions=True
+    )
+    assert len(upstream.requests) == 1
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+
+
+def test_split_matches_items_to_keys():
+    batching = QueryBatching("get_items", key="id", items_field="items")
+    body = {"items": {"1": {"id": 1}, "2": {"id": 2}}}
+    first, second, missing = batching.split(body, [2, 1, 3])
+    assert (first, second) == ({"id": 2}, {"id": 1})
+    assert isinstance(missing, BatchItemMissing)
+    with pytest.raises(ValueError):
+        batching.split({"items": [{"id": 1}]}, [1, 2])
+
+
+@pytest.mark.asyncio
+async def test_missing_keys_and_unhashable_arguments_are_refused(make_api):
+    upstream = Upstream()
+    batching = QueryBatching("get_items", key="item_id")
+    api = make_api(upstream, item_endpoints(batching))
+    with pytest.raises(ValueError, match="item_id"):
+        await api.async_get_item()
+    with pytest.raises(TypeError, match="tags"):
+        await api.call_async_endpoint("get_item", item_id=1, tags=["a"])
+    assert not upstream.requests
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_releases_its_callers():
+    started = asyncio.Event()
+
+    async def load_batch(shared, keys):
+        started.set()
+        await asyncio.sleep(10)
+
+    loader = BatchLoader(QueryBatching("get_items", key="item_id"), load_batch)
+    calls = [asyncio.ensure_future(loader.load({"item_id": i})) for i in range(3)]
+    await asyncio.wait_for(started.wait(), 1)
+    for task in loader._tasks:
+        task.cancel()
+    results = await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
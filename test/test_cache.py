@@ -0,0 +1,167 @@
+import multiprocessing
+import threading
+import time
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.cache import ResponseCache, CacheEntry, SQLiteCache
+
+
+def make_handler(requests):
+    def handler(request: httpx.Request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json=["animal", "career"], headers={"ETag": '"v1"'})
+
+    return handler
+
+
+ENDPOINTS = [
+    Endpoint(name="get_categories", path="/categories", cache_ttl=60),
+    Endpoint(name="get_random", path="/random"),
+]
+
+
+def test_cache_hit_skips_network(make_api):
+    requests = []
+    cache = ResponseCache()
+    api = make_api(make_handler(requests), ENDPOINTS, cache=cache)
+    assert api.get_categories() == ["animal", "career"]
+    assert api.get_categories() == ["animal", "career"]
+    api.get_random()
+    api.get_random()
+
+    # get_random declares no TTL and the cache has no default, so it is not cached.
+    assert len(requests) == 3
+    assert cache.stats == {"hits": 1, "misses": 1, "revalidations": 0, "entries": 1}
+
+
+def test_cache_revalidates_with_etag(make_api):
+    requests = []
+    cache = ResponseCache()
+    api = make_api(make_handler(requests), ENDPOINTS, cache=cache)
+    first = api.get_categories()
+    for entry in cache._entries.values():
+        entry.expires_at = 0
+    second = api.get_categories()
+
+    assert second is first
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_async_cache_hit(make_api):
+    requests = []
+    cache = ResponseCache(default_ttl=30)
+    api = make_api(make_handler(requests), ENDPOINTS, cache=cache)
+    await api.async_get_random()
+    await api.async_get_random()
+    assert len(requests) == 1
+    assert cache.hits == 1
+
+
+def test_cache_lru_eviction():
+    cache = ResponseCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.set(key, CacheEntry(value=key, expires_at=float("inf")))
+    assert cache.get("a") is None
+    assert cache.get("c").value == "c"
+    assert len(cache) == 2
+
+
+class Joke(BaseModel):
+    value: str
+
+
+def joke_handler(requests):
+    def handler(request: httpx.Request):
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, json={"value": "joke"}, headers={"ETag": '"v1"'})
+
+    return handler
+
+
+DISK_ENDPOINTS = [
+    Endpoint(name="get_random", path="/random", model=Joke, cache_ttl=60),
+    Endpoint(name="get_categories", path="/categories", cache_ttl=60),
+]
+
+
+def test_disk_cache_is_shared_between_clients(make_api, tmp_path):
+    requests = []
+    handler = joke_handler(requests)
+    first_cache = SQLiteCache(tmp_path / "cache.db")
+    first = make_api(handler, DISK_ENDPOINTS, cache=first_cache)
+    assert first.get_random() == Joke(value="joke")
+    # A second cache on the same file, as in another worker process.
+    cache = SQLiteCache(tmp_path / "cache.db")
+    second = make_api(handler, DISK_ENDPOINTS, cache=cache)
+    assert second.get_random() == Joke(value="joke")
+    assert len(requests) == 1
+    assert cache.stats == {"hits": 1, "misses": 0, "revalidations": 0, "entries": 1}
+
+    cache._connection().execute("UPDATE responses SET expires_at = 0")
+    assert second.get_random() == Joke(value="joke")
+    assert requests[1].headers["If-None-Match"] == '"v1"'
+    assert cache.revalidations == 1
+
+
+@pytest.mark.asyncio
+async def test_async_disk_cache_hit(make_api, tmp_path):
+    requests = []
+    cache = SQLiteCache(tmp_path / "cache.db")
+    threads = set()
+    get, store = cache.get, cache.set
+    cache.get = lambda *args: threads.add(threading.current_thread()) or get(*args)
+    cache.set = lambda *args: threads.add(threading.current_thread()) or store(*args)
+    api = make_api(joke_handler(requests), DISK_ENDPOINTS, cache=cache)
+    assert await api.async_get_random() == await api.async_get_random()
+    assert len(requests) == 1
+    # Disk I/O never runs on the event loop thread.
+    assert threads and threading.current_thread() not in threads
+    cache.close()
+
+
+def test_disk_cache_size_eviction(tmp_path):
+    cache = SQLiteCache(tmp_path / "cache.db", max_bytes=250)
+    expires_at = time.monotonic() + 60
+    for key in ("a", "b", "c"):
+        cache.set(key, CacheEntry(value=key.encode() * 100, expires_at=expires_at))
+        time.sleep(0.01)
+    assert cache.get("a") is None
+    assert cache.get("c").value == b"c" * 100
+    assert cache.size == 200
+    # Bodies larger than the whole cache are not stored.
+    cache.set("d", CacheEntry(value=b"d" * 251, expires_at=expires_at))
+    assert cache.get("d") is None
+    with pytest.raises(TypeError):
+        cache.set("e", CacheEntry(value={"decoded": True}, expires_at=expires_at))
+
+
+def write_entries(path, worker):
+    cache = SQLiteCache(path)
+    for index in range(50):
+        entry = CacheEntry(value=b"x" * 100, expires_at=time.monotonic() + 60)
+        cache.set(f"{worker}-{index}", entry)
+
+
+def test_disk_cache_concurrent_processes(tmp_path):
+    path = tmp_path / "cache.db"
+    cache = SQLiteCache(path)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=write_entries, args=(path, worker))
+        for worker in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * 4
+    assert len(cache) == 200
+    assert cache.get("3-49").value == b"x" * 100
@@ -0,0 +1,115 @@
+import json
+import uuid
+from datetime import datetime
+import pytest
+import httpx
+from pydantic import BaseModel, Field
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.codec import (
+    JSONCodec,
+    OrjsonCodec,
+    StdlibJSONCodec,
+    fastest_codec,
+)
+from src.rest_api_client.streaming import StreamFormat
+
+
+class Owner(BaseModel):
+    owner_name: str = Field(..., alias="ownerName")
+
+
+class Pet(BaseModel):
+    name: str
+    born: datetime
+    tag: uuid.UUID
+    owner: Owner
+
+
+PET = Pet(
+    name="Rex",
+    born=datetime(2020, 1, 2, 3, 4, 5),
+    tag=uuid.UUID(int=1),
+    owner=Owner(ownerName="Ann"),
+)
+PET_JSON = {
+    "name": "Rex",
+    "born": "2020-01-02T03:04:05",
+    "tag": "00000000-0000-0000-0000-000000000001",
+    "owner": {"ownerName": "Ann"},
+}
+
+
+def echo(request: httpx.Request):
+    if request.url.path.endswith("/stream"):
+        return httpx.Response(200, content=b'{"a": 1}\n{"a": 2}\n')
+    return httpx.Response(
+        200,
+        content=request.content or b'{"ok": true}',
+        headers={"X-Content-Type": request.headers.get("Content-Type", "")},
+    )
+
+
+ENDPOINTS = [
+    Endpoint(name="create_pet", path="/pets"),
+    Endpoint(name="get_pets", path="/stream", streaming=StreamFormat.NDJSON),
+]
+
+
+@pytest.mark.parametrize(
+    "codec",
+    [StdlibJSONCodec(), pytest.param("orjson", id="orjson")],
+)
+def test_models_are_serialized(codec):
+    if codec == "orjson":
+        pytest.importorskip("orjson")
+        codec = OrjsonCodec()
+    payload = codec.dumps({"pets": [PET]})
+    assert json.loads(payload) == {"pets": [PET_JSON]}
+    assert json.loads(codec.dumps(PET)) == PET_JSON
+    assert codec.loads(payload) == {"pets": [PET_JSON]}
+
+
+def test_request_bodies_use_codec(make_api):
+    api = make_api(echo, ENDPOINTS)
+    assert api.create_pet(data=PET) == PET_JSON
+    assert api.create_pet(data={"name": "ü"}) == {"name": "ü"}
+    assert list(api.stream_get_pets()) == [{"a": 1}, {"a": 2}]
+
+
+class RecordingCodec(StdlibJSONCodec):
+    def __init__(self):
+        self.calls = []
+
+    def dumps(self, value):
+        self.calls.append("dumps")
+        return super().dumps(value)
+
+    def loads(self, content):
+        self.calls.append("loads")
+        return super().loads(content)
+
+    def decode(self, response):
+        return JSONCodec.decode(self, response)
+
+
+@pytest.mark.asyncio
+async def test_endpoint_codec_overrides_api_codec(make_api):
+    api_codec, endpoint_codec = RecordingCodec(), RecordingCodec()
+    endpoints = [
+        Endpoint(name="create_pet", path="/pets"),
+        Endpoint(name="create_owner", path="/owners", codec=endpoint_codec),
+    ]
+    api = make_api(echo, endpoints, codec=api_codec)
+    assert await api.async_create_pet(data={"a": 1}) == {"a": 1}
+    assert await api.async_create_owner(data={"b": 2}) == {"b": 2}
+    assert api_codec.calls == ["dumps", "loads"]
+    assert endpoint_codec.calls == ["dumps", "loads"]
+
+
+def test_fastest_codec():
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        assert isinstance(fastest_codec(), StdlibJSONCodec)
+    else:
+        assert isinstance(fastest_codec(), OrjsonCodec)
@@ -0,0 +1,212 @@
+import importlib.util
+import inspect
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import RestAPI, Endpoint, HTTPMethod
+from src.rest_api_client.codegen import (
+    MAX_LINE_LENGTH,
+    generate_client_source,
+    write_client_module,
+)
+from src.rest_api_client.codec import StdlibJSONCodec
+from src.rest_api_client.compression import Compression, ContentEncoding
+from src.rest_api_client.decoding import DecodeMode
+from src.rest_api_client.downloads import Download
+from src.rest_api_client.driver import HttpDriver
+from src.rest_api_client.materialize import ResponseShape
+from src.rest_api_client.pagination import CursorPagination
+from src.rest_api_client.streaming import StreamFormat
+
+BASE_URL = "https://getpantry.cloud/apiv1"
+
+
+class Basket(BaseModel):
+    name: str
+
+
+def endpoints():
+    return [
+        Endpoint(name="get_basket", path="/pantry/{pantry_id}/basket/{basket_id}"),
+        Endpoint(name="create_basket", path="/pantry/{pantry_id}/basket/{basket_id}"),
+        Endpoint(
+            name="list_baskets",
+            path="/baskets",
+            method=HTTPMethod.GET,
+            model=Basket,
+            query_parameters={"limit": int},
+            response_shape=ResponseShape.LIST,
+        ),
+        Endpoint(
+            name="get_pages",
+            path="/pages",
+            model=Basket,
+            pagination=CursorPagination(items_field="results"),
+        ),
+    ]
+
+
+def handler(request: httpx.Request):
+    if request.url.path == "/apiv1/baskets":
+        return httpx.Response(200, json=[{"name": request.url.query.decode()}])
+    if request.url.path == "/apiv1/pages":
+        return httpx.Response(200, json={"results": [{"name": "a"}, {"name": "b"}]})
+    return httpx.Response(
+        200, json={"method": request.method, "path": request.url.path}
+    )
+
+
+def load_module(path):
+    spec = importlib.util.spec_from_file_location("generated_client", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_generated_client_matches_dynamic_client(tmp_path):
+    dynamic = RestAPI(
+        api_url=BASE_URL,
+        driver=None,
+        endpoints=endpoints(),
+        custom_headers={"X-Client": "test"},
+    )
+    path = write_client_module(tmp_path / "pantry.py", dynamic, "PantryClient")
+    module = load_module(path)
+    compile(path.read_text(), str(path), "exec")
+
+    pagination = CursorPagination(items_field="results")
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        api = module.PantryClient(
+            client, endpoint_options={"get_pages": {"pagination": pagination}}
+        )
+        dynamic.driver = client
+
+        # Methods are defined on the class, nothing is generated per instance.
+        for name in ("get_basket", "async_create_basket", "iter_get_pages"):
+            assert name in vars(module.PantryClient)
+            assert name not in vars(api)
+            assert list(inspect.signature(getattr(api, name)).parameters) == list(
+                inspect.signature(getattr(dynamic, name)).parameters
+            )
+        assert "iter_list_baskets" not in vars(module.PantryClient)
+        assert api._plans["get_basket"].headers == dynamic._plans["get_basket"].headers
+        assert (
+            api._plans["get_basket"].url_template
+            == dynamic._plans["get_basket"].url_template
+        )
+
+        assert api.get_basket(pantry_id="1", basket_id="2") == dynamic.get_basket(
+            pantry_id="1", basket_id="2"
+        )
+        assert api.create_basket(data={}, pantry_id="1", basket_id="2") == {
+            "method": "POST",
+            "path": "/apiv1/pantry/1/basket/2",
+        }
+        assert api.list_baskets(limit=5) == [Basket(name="limit=5")]
+        assert list(api.iter_get_pages()) == [Basket(name="a"), Basket(name="b")]
+
+
+def test_generated_annotations():
+    source = generate_client_source(endpoints(), api_url=BASE_URL)
+    assert (
+        "def list_baskets(self, limit: Optional[int] = None) -> List[Basket]:" in source
+    )
+    assert "async def async_get_basket(" in source
+    assert "def iter_get_pages(self) -> Iterator[Basket]:" in source
+    assert "# Set pagination through endpoint_options." in source
+    assert f"from {Basket.__module__} import Basket" in source
+
+
+def test_local_models_cannot_be_exported():
+    class Local(BaseModel):
+        name: str
+
+    with pytest.raises(ValueError, match="must be importable"):
+        generate_client_source(
+            [Endpoint(name="get_local", path="/x", model=Local)], api_url=BASE_URL
+        )
+
+
+def test_endpoints_export_without_api_url(tmp_path):
+    path = write_client_module(
+        tmp_path / "items.py", [Endpoint(name="get_item", path="/items/{id}")]
+    )
+    assert "API_URL: Optional[str] = None" in path.read_text()
+    module = load_module(path)
+    with pytest.raises(ValueError, match="api_url"):
+        module.GeneratedClient()
+    # Without a driver the client manages its own HttpDriver.
+    api = module.GeneratedClient(api_url=BASE_URL)
+    assert isinstance(api.driver, HttpDriver)
+    api.close()
+
+
+def test_generated_download_methods():
+    source = generate_client_source(
+        [Endpoint(name="get_export", path="/export", download=Download(max_resumes=1))],
+        api_url=BASE_URL,
+    )
+    compile(source, "generated_client", "exec")
+    assert "def get_export(self) -> bytes:" in source
+    assert "download=Download(max_resumes=1)," in source
+    assert "def download_get_export(" in source
+    assert "progress: Optional[Progress] = None" in source
+    assert "return await self.adownload_endpoint(" in source
+    assert "def aopen_get_export(self) -> AsyncContextManager[ByteStream]:" in source
+
+
+def test_endpoint_settings_are_exported():
+    source = generate_client_source(
+        [
+            Endpoint(
+                name="get_report",
+                path="/report",
+                decode=DecodeMode.THREAD,
+                codec=StdlibJSONCodec(),
+            )
+        ],
+        api_url=BASE_URL,
+    )
+    compile(source, "generated_client", "exec")
+    assert "decode=DecodeMode.THREAD," in source
+    assert "import DecodeMode" in source
+    assert "# Set codec through endpoint_options." in source
+
+
+def test_compression_is_exported(tmp_path):
+    compression = Compression(
+        request_encoding=None, accept_encodings=(ContentEncoding.DEFLATE,)
+    )
+    path = tmp_path / "generated_client.py"
+    write_client_module(
+        path,
+        [Endpoint(name="post_item", path="/items", compression=compression)],
+        api_url=BASE_URL,
+    )
+    source = path.read_text()
+    assert (
+        "compression=Compression("
+        "request_encoding=None, accept_encodings=(ContentEncoding.DEFLATE,)),"
+    ) in source
+    endpoint = load_module(path).build_endpoints()[0]
+    assert endpoint.compression == compression
+
+
+def test_generated_lines_fit_the_line_length():
+    source = generate_client_source(
+        [
+            *endpoints(),
+            Endpoint(name="get_export", path="/export", download=Download()),
+            Endpoint(name="get_events", path="/events", streaming=StreamFormat.NDJSON),
+            Endpoint(
+                name="get_report",
+                path="/reports/{report_id}",
+                query_parameters={"page_size": int, "include_archived": bool},
+                decode=DecodeMode.THREAD,
+            ),
+        ],
+        api_url=BASE_URL,
+    )
+    compile(source, "generated_client", "exec")
+    assert "from typing import (" in source
+    assert max(len(line) for line in source.splitlines()) <= MAX_LINE_LENGTH
@@ -0,0 +1,87 @@
+import gzip
+import json
+import zlib
+import pytest
+import httpx
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.compression import Compression, ContentEncoding, compress
+from src.rest_api_client.streaming import StreamFormat
+
+ROWS = [{"id": index, "name": "row"} for index in range(200)]
+
+
+def handler(request: httpx.Request):
+    body = request.read()
+    encoding = request.headers.get("Content-Encoding")
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding == "deflate":
+        body = zlib.decompress(body)
+    if request.method == "GET":
+        # The server answers with the first encoding the client accepts.
+        accepted = request.headers.get("Accept-Encoding", "")
+        lines = b"".join(json.dumps(row).encode() + b"\n" for row in ROWS)
+        if accepted.startswith("gzip"):
+            return httpx.Response(
+                200, content=gzip.compress(lines), headers={"Content-Encoding": "gzip"}
+            )
+        return httpx.Response(200, content=lines)
+    return httpx.Response(
+        200,
+        json={
+            "encoding": encoding,
+            "sent": len(request.content),
+            "rows": len(json.loads(body)),
+        },
+    )
+
+
+def row_endpoints(compression=None):
+    return [
+        Endpoint(name="create_rows", path="/rows", compression=compression),
+        Endpoint(name="get_rows", path="/rows", streaming=StreamFormat.NDJSON),
+    ]
+
+
+def test_large_bodies_are_compressed(make_api):
+    api = make_api(handler, row_endpoints(), compression=Compression(min_size=1000))
+    large = api.create_rows(data=ROWS)
+    assert large["encoding"] == "gzip"
+    assert large["rows"] == len(ROWS)
+    assert large["sent"] < len(json.dumps(ROWS)) / 4
+
+    small = api.create_rows(data=ROWS[:2])
+    assert small == {"encoding": None, "sent": small["sent"], "rows": 2}
+
+
+def test_endpoint_compression_overrides_client(make_api):
+    deflate = Compression(request_encoding=ContentEncoding.DEFLATE, min_size=0)
+    api = make_api(handler, row_endpoints(deflate), compression=Compression())
+    assert api.create_rows(data=ROWS[:1])["encoding"] == "deflate"
+    headers = api._plans["get_rows"].headers
+    assert headers["Accept-Encoding"] == "gzip, deflate"
+    assert "Content-Encoding" not in api._plans["get_rows"].json_headers
+
+
+def test_compressed_response_is_streamed(make_api):
+    api = make_api(handler, row_endpoints(), compression=Compression())
+    assert list(api.stream_get_rows()) == ROWS
+
+
+def test_zstd():
+    try:
+        import zstandard
+    except ImportError:
+        with pytest.raises(ImportError):
+            compress(b"data", ContentEncoding.ZSTD)
+        with pytest.raises(ImportError):
+            Compression(
+                accept_encodings=(ContentEncoding.ZSTD,)
+            ).accept_encoding_header()
+        return
+
+    body = compress(b"data" * 100, ContentEncoding.ZSTD)
+    assert zstandard.ZstdDecompressor().decompress(body) == b"data" * 100
+    Compression(accept_encodings=(ContentEncoding.ZSTD,)).accept_encoding_header()
+    response = httpx.Response(200, content=body, headers={"Content-Encoding": "zstd"})
+    assert response.read() == b"data" * 100
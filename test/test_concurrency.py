@@ -0,0 +1,153 @@
+import asyncio
+import io
+import pytest
+import httpx
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.concurrency import AdaptiveLimiter
+from src.rest_api_client.downloads import Download
+from src.rest_api_client.streaming import StreamFormat
+
+ENDPOINTS = [Endpoint(name="get_item", path="/items/{item_id}")]
+
+
+class Upstream:
+    def __init__(self, status_code=200, delay=0.01):
+        self.status_code = status_code
+        self.delay = delay
+        self.current = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request):
+        self.current += 1
+        self.peak = max(self.peak, self.current)
+        await asyncio.sleep(self.delay)
+        self.current -= 1
+        return httpx.Response(self.status_code, json={})
+
+
+@pytest.mark.asyncio
+async def test_limit_caps_requests_in_flight(make_api):
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+    upstream = Upstream()
+    depths = []
+
+    async def monitor():
+        while True:
+            depths.append(limiter.queue_depth)
+            await asyncio.sleep(0.005)
+
+    api = make_api(
+        upstream, ENDPOINTS, host_concurrency_limits={"api.example.com": limiter}
+    )
+    watcher = asyncio.ensure_future(monitor())
+    await asyncio.gather(*(api.async_get_item(item_id=i) for i in range(10)))
+    watcher.cancel()
+    assert upstream.peak == 2
+    assert max(depths) >= 6
+    assert limiter.in_flight == 0 and limiter.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_limit_grows_while_latency_is_flat(make_api):
+    # A loose tolerance keeps scheduling jitter from counting as overload.
+    limiter = AdaptiveLimiter(initial_limit=2, max_limit=50, latency_tolerance=50)
+    upstream = Upstream(delay=0.001)
+    api = make_api(
+        upstream,
+        ENDPOINTS,
+        host_concurrency_limits={"api.example.com": limiter},
+        concurrency_limit=None,
+    )
+    await asyncio.gather(*(api.async_get_item(item_id=i) for i in range(200)))
+    assert limiter.limit > 2
+    assert upstream.peak > 2
+
+
+@pytest.mark.asyncio
+async def test_throttling_cuts_limit_once_per_burst(make_api):
+    limiter = AdaptiveLimiter(initial_limit=8)
+    upstream = Upstream(status_code=429)
+    api = make_api(
+        upstream, ENDPOINTS, host_concurrency_limits={"api.example.com": limiter}
+    )
+    results = await asyncio.gather(
+        *(api.async_get_item(item_id=i) for i in range(8)), return_exceptions=True
+    )
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+    assert limiter.limit == 4
+    assert limiter.decreases == 1
+
+
+@pytest.mark.asyncio
+async def test_timeouts_and_latency_cut_limit():
+    limiter = AdaptiveLimiter(initial_limit=16, latency_tolerance=2.0)
+    started = await limiter.acquire()
+    limiter.release(started, error=httpx.ReadTimeout("Timed out."))
+    assert limiter.limit == 8
+    # Other errors say nothing about load.
+    limiter.release(await limiter.acquire(), error=httpx.ConnectError("Refused."))
+    assert limiter.stats == {
+        "limit": 8,
+        "in_flight": 0,
+        "queue_depth": 0,
+        "decreases": 1,
+    }
+
+    limiter = AdaptiveLimiter(initial_limit=16, latency_tolerance=2.0)
+    limiter.release(await limiter.acquire() - 0.01, 200)
+    assert limiter.baseline == pytest.approx(0.01, rel=0.5)
+    # A request three times slower than the baseline counts as overload.
+    limiter.release(await limiter.acquire() - 0.03, 200)
+    assert limiter.limit == 8
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiters_do_not_leak_slots():
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    started = await limiter.acquire()
+    waiter = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 1
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert limiter.queue_depth == 0
+    limiter.release(started, 200)
+    started = await asyncio.wait_for(limiter.acquire(), 1)
+    limiter.release(started, 200)
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_streams_and_downloads_hold_a_slot(make_api):
+    limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+    upstream = Upstream()
+    endpoints = [
+        Endpoint(name="get_export", path="/export", download=Download()),
+        Endpoint(name="get_items", path="/items", streaming=StreamFormat.NDJSON),
+    ]
+    api = make_api(upstream, endpoints, concurrency_limit=limiter)
+    async with api.aopen_endpoint("get_export"):
+        assert limiter.in_flight == 1
+        # The stream holds the only slot until it is closed.
+        download = asyncio.ensure_future(api.adownload_get_export(io.BytesIO()))
+        await asyncio.sleep(0.01)
+        assert limiter.queue_depth == 1
+    await download
+    assert [item async for item in api.astream_endpoint("get_items")] == [{}]
+    assert limiter.in_flight == 0 and limiter.queue_depth == 0
+    assert upstream.peak == 1
+
+
+@pytest.mark.asyncio
+async def test_host_limits_follow_the_request_host(make_api):
+    api_limit = AdaptiveLimiter(initial_limit=4)
+    other_limit = AdaptiveLimiter(initial_limit=4)
+    api = make_api(
+        Upstream(), ENDPOINTS, host_concurrency_limits={"api.example.com": api_limit}
+    )
+    api.host_concurrency_limits["files.example.com"] = other_limit
+    call = api._prepare_call("get_item", item_id=1)
+    assert api._concurrency_limiters(call, call.driver_kwargs["url"]) == (api_limit,)
+    assert api._concurrency_limiters(call, "https://files.example.com/v1/items/1") == (
+        other_limit,
+    )
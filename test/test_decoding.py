@@ -0,0 +1,91 @@
+import threading
+import pytest
+import httpx
+from pydantic import BaseModel, validator
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.decoding import DecodeExecutor, DecodeMode
+from src.rest_api_client.instrumentation import MetricsRecorder
+from src.rest_api_client.materialize import LazyModel, Materialization, ResponseShape
+
+ITEMS = [{"id": index, "name": f"item-{index}"} for index in range(50)]
+threads = []
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+    @validator("name")
+    def record_thread(cls, value):
+        threads.append(threading.current_thread().name)
+        return value
+
+
+def handler(request: httpx.Request):
+    if request.url.path.endswith("/text"):
+        return httpx.Response(200, text="plain text")
+    return httpx.Response(200, json=ITEMS)
+
+
+def item_endpoints(**options):
+    return [
+        Endpoint(
+            name="get_items",
+            path="/items",
+            model=Item,
+            response_shape=ResponseShape.LIST,
+            **options,
+        ),
+        Endpoint(name="get_text", path="/text"),
+    ]
+
+
+def test_select():
+    executor = DecodeExecutor(DecodeMode.PROCESS, threshold=1000)
+    assert executor.select(None, 999) == DecodeMode.INLINE
+    assert executor.select(None, 1000) == DecodeMode.PROCESS
+    assert executor.select(DecodeMode.THREAD, 10) == DecodeMode.THREAD
+    assert executor.select(DecodeMode.INLINE, 10**6) == DecodeMode.INLINE
+    assert DecodeExecutor(DecodeMode.THREAD).select(None, 0) == DecodeMode.THREAD
+
+
+@pytest.mark.asyncio
+async def test_endpoint_decodes_in_thread_pool(make_api):
+    threads.clear()
+    api = make_api(handler, item_endpoints(decode=DecodeMode.THREAD))
+    items = await api.async_get_items()
+    assert threads and all(name.startswith("rest-api-decode") for name in threads)
+    assert items == [Item(**item) for item in ITEMS]
+    api.decode_executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_threshold_and_metrics(make_api):
+    threads.clear()
+    executor = DecodeExecutor(DecodeMode.THREAD, threshold=100)
+    api = make_api(
+        handler,
+        item_endpoints(),
+        decode_executor=executor,
+        instrumentation=MetricsRecorder(),
+    )
+    assert len(await api.async_get_items()) == len(ITEMS)
+    # Short, non-JSON bodies stay inline and still fall back to text.
+    assert await api.async_get_text() == "plain text"
+    assert threads[0].startswith("rest-api-decode")
+    phases = api.instrumentation.snapshot()["get_items"]["phases"]
+    assert phases["decode"]["count"] == 1
+    assert phases["model_build"]["count"] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_pool(make_api):
+    executor = DecodeExecutor(DecodeMode.PROCESS, max_workers=1)
+    endpoints = item_endpoints(materialization=Materialization.LAZY)
+    api = make_api(handler, endpoints, decode_executor=executor)
+    items = await api.async_get_items()
+    assert await api.async_get_text() == "plain text"
+    executor.shutdown()
+    assert isinstance(items[0], LazyModel)
+    assert items[3].name == "item-3"
@@ -0,0 +1,130 @@
+import io
+import pytest
+import httpx
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.downloads import ByteStream, Download, is_binary_content_type
+
+PAYLOAD = bytes(range(256)) * 4000
+CHUNK_SIZE = 64 * 1024
+requests = []
+
+
+def interrupted(body):
+    yield body[: len(body) // 2]
+    raise httpx.ReadError("Connection reset.")
+
+
+def handler(request: httpx.Request):
+    requests.append(request)
+    if request.url.path.endswith("/report"):
+        return httpx.Response(
+            200, content=b"\x00\x01", headers={"Content-Type": "application/pdf"}
+        )
+    headers = {"Accept-Ranges": "bytes", "Content-Type": "application/octet-stream"}
+    status = 200
+    start = 0
+    requested = request.headers.get("Range")
+    if requested:
+        start = int(requested[len("bytes=") : -1])
+        if start >= len(PAYLOAD):
+            return httpx.Response(
+                416, headers={"Content-Range": f"bytes */{len(PAYLOAD)}"}
+            )
+        status = 206
+        headers["Content-Range"] = f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}"
+    body = PAYLOAD[start:]
+    headers["Content-Length"] = str(len(body))
+    if request.url.path.endswith("/flaky") and len(requests) == 1:
+        return httpx.Response(status, content=interrupted(body), headers=headers)
+    return httpx.Response(status, content=body, headers=headers)
+
+
+DOWNLOAD = Download(chunk_size=CHUNK_SIZE)
+ENDPOINTS = [
+    Endpoint(name="get_export", path="/export", download=DOWNLOAD),
+    Endpoint(name="get_flaky", path="/flaky", download=DOWNLOAD),
+    Endpoint(name="get_report", path="/report"),
+]
+
+
+def test_download_to_path_file_and_buffer(make_api, tmp_path):
+    requests.clear()
+    progress = []
+    path = tmp_path / "export.bin"
+    api = make_api(handler, ENDPOINTS)
+    size = api.download_get_export(
+        path, progress=lambda done, total: progress.append((done, total))
+    )
+    assert size == len(PAYLOAD) and path.read_bytes() == PAYLOAD
+    assert progress[0] == (CHUNK_SIZE, len(PAYLOAD))
+    assert progress[-1] == (len(PAYLOAD), len(PAYLOAD))
+
+    file = io.BytesIO(b"header")
+    file.seek(0, io.SEEK_END)
+    api.download_get_export(file)
+    assert file.getvalue() == b"header" + PAYLOAD
+
+    buffer = bytearray(len(PAYLOAD) + 10)
+    assert api.download_get_export(buffer) == len(PAYLOAD)
+    assert buffer[: len(PAYLOAD)] == PAYLOAD
+    with pytest.raises(ValueError):
+        api.download_get_export(bytearray(10))
+
+    assert requests[0].headers["Accept"] == "*/*"
+    assert requests[0].headers["Accept-Encoding"] == "identity"
+
+
+def test_resume_interrupted_download(make_api):
+    requests.clear()
+    buffer = bytearray(len(PAYLOAD))
+    api = make_api(handler, ENDPOINTS)
+    assert api.download_get_flaky(buffer) == len(PAYLOAD)
+    assert buffer == PAYLOAD
+    assert len(requests) == 2
+    # Resumed after the last complete chunk that was written.
+    written = len(PAYLOAD) // 2 // CHUNK_SIZE * CHUNK_SIZE
+    assert requests[1].headers["Range"] == f"bytes={written}-"
+
+
+def test_resume_partial_file(make_api, tmp_path):
+    requests.clear()
+    path = tmp_path / "export.bin"
+    path.write_bytes(PAYLOAD[:1000])
+    api = make_api(handler, ENDPOINTS)
+    assert api.download_get_export(path, resume=True) == len(PAYLOAD)
+    assert path.read_bytes() == PAYLOAD
+    # Resuming a complete file is answered with 416 and keeps it.
+    assert api.download_get_export(path, resume=True) == len(PAYLOAD)
+    assert path.read_bytes() == PAYLOAD
+    assert requests[0].headers["Range"] == "bytes=1000-"
+
+
+def test_binary_responses_are_not_decoded(make_api):
+    api = make_api(handler, ENDPOINTS)
+    assert api.get_export() == PAYLOAD
+    # Binary content types are returned as bytes even without download.
+    assert api.get_report() == b"\x00\x01"
+    with api.open_get_export() as stream:
+        assert isinstance(stream, ByteStream)
+        assert stream.length == len(PAYLOAD)
+        assert b"".join(stream) == PAYLOAD
+
+
+def test_is_binary_content_type():
+    assert is_binary_content_type("application/octet-stream")
+    assert is_binary_content_type("image/png")
+    assert not is_binary_content_type("application/json; charset=utf-8")
+    assert not is_binary_content_type("application/problem+xml")
+    assert not is_binary_content_type("text/csv")
+    assert not is_binary_content_type(None)
+
+
+@pytest.mark.asyncio
+async def test_async_download(make_api, tmp_path):
+    path = tmp_path / "export.bin"
+    api = make_api(handler, ENDPOINTS)
+    assert await api.adownload_get_export(path) == len(PAYLOAD)
+    assert path.read_bytes() == PAYLOAD
+    async with api.aopen_get_export() as stream:
+        assert b"".join([chunk async for chunk in stream]) == PAYLOAD
+    assert await api.async_get_export() == PAYLOAD
@@ -0,0 +1,114 @@
+import importlib.util
+import pytest
+import httpx
+from src.rest_api_client.lib import RestAPI, Endpoint
+from src.rest_api_client.driver import DriverConfig, HttpDriver
+
+BASE_URL = "https://getpantry.cloud/apiv1"
+
+
+def make_driver(requests):
+    def handler(request: httpx.Request):
+        requests.append(request)
+        return httpx.Response(200, json={"method": request.method})
+
+    return HttpDriver(transport=httpx.MockTransport(handler))
+
+
+def test_pool_settings():
+    config = DriverConfig(max_connections=7, keepalive_expiry=30)
+    driver = HttpDriver(config)
+    pool = driver.session._transport._pool
+    assert pool._max_connections == 7
+    assert pool._keepalive_expiry == 30
+    assert driver.session is driver.session
+
+
+@pytest.mark.asyncio
+async def test_close_pool():
+    driver = HttpDriver()
+    session, async_session = driver.session, driver.async_session
+    await driver.aclose()
+    assert session.is_closed and async_session.is_closed
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_sessions():
+    requests = []
+    driver = make_driver(requests)
+    api = RestAPI(
+        api_url=BASE_URL,
+        driver=driver,
+        endpoints=[Endpoint(name="get_pantry", path="/pantry/{pantry_id}")],
+    )
+    assert api.get_pantry(pantry_id="1") == {"method": "GET"}
+    assert driver._async_session is None
+    assert await api.async_get_pantry(pantry_id="1") == {"method": "GET"}
+    assert driver._async_session is not None
+    assert len(requests) == 2
+
+    # A driver passed in is not closed by RestAPI.
+    api.close()
+    assert driver._session is not None
+    await driver.aclose()
+    assert driver._session is None and driver._async_session is None
+
+
+def test_owned_driver():
+    config = DriverConfig(max_connections=3)
+    with RestAPI(api_url=BASE_URL, driver_config=config) as api:
+        assert isinstance(api.driver, HttpDriver)
+        assert api.driver.config is config
+        session = api.driver.session
+    assert session.is_closed
+
+    with pytest.raises(ValueError):
+        RestAPI(api_url=BASE_URL, driver=HttpDriver(), driver_config=config)
+
+
+@pytest.mark.asyncio
+async def test_endpoints_named_close_do_not_replace_closing():
+    endpoints = [
+        Endpoint(name="close", method="post", path="/sessions/close"),
+        Endpoint(name="aclose", method="post", path="/sessions/aclose"),
+    ]
+    with RestAPI(
+        api_url=BASE_URL, driver_config=DriverConfig(), endpoints=endpoints
+    ) as api:
+        session = api.driver.session
+    assert session.is_closed
+
+    async with RestAPI(
+        api_url=BASE_URL, driver_config=DriverConfig(), endpoints=endpoints
+    ) as api:
+        async_session = api.driver.async_session
+    assert async_session.is_closed
+
+
+@pytest.mark.asyncio
+async def test_warm_up():
+    requests = []
+    api = RestAPI(api_url=BASE_URL, driver=make_driver(requests))
+    assert api.warm_up(connections=3) == 3
+    assert await api.awarm_up(connections=2) == 2
+    assert [request.method for request in requests] == ["HEAD"] * 5
+    assert str(requests[0].url) == BASE_URL
+    await api.driver.aclose()
+
+
+def test_warm_up_failures_are_counted():
+    def handler(request: httpx.Request):
+        raise httpx.ConnectError("refused", request=request)
+
+    api = RestAPI(
+        api_url=BASE_URL, driver=HttpDriver(transport=httpx.MockTransport(handler))
+    )
+    assert api.warm_up(connections=2) == 0
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("h2") is not None, reason="h2 is installed"
+)
+def test_http2_needs_h2():
+    with pytest.raises(ImportError):
+        HttpDriver(DriverConfig(http2=True))
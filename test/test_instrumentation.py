@@ -0,0 +1,106 @@
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.instrumentation import (
+    CallbackInstrumentation,
+    MetricsRecorder,
+    SpanInstrumentation,
+)
+from src.rest_api_client.streaming import StreamFormat
+
+
+class Item(BaseModel):
+    id: int
+
+
+def handler(request: httpx.Request):
+    if request.url.path.endswith("/missing"):
+        return httpx.Response(404)
+    if request.url.path.endswith("/items"):
+        return httpx.Response(200, content=b'[{"id": 1}, {"id": 2}]')
+    return httpx.Response(200, json={"id": 1})
+
+
+ENDPOINTS = [
+    Endpoint(name="get_item", path="/item", model=Item),
+    Endpoint(name="get_missing", path="/missing"),
+    Endpoint(name="get_items", path="/items", streaming=StreamFormat.JSON_ARRAY),
+]
+
+
+def test_metrics_recorder_phases_and_statuses(make_api):
+    recorder = MetricsRecorder()
+    api = make_api(handler, ENDPOINTS, instrumentation=recorder)
+    api.get_item()
+    api.get_item()
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_missing()
+    assert len(list(api.stream_get_items())) == 2
+
+    snapshot = recorder.snapshot()
+    assert snapshot["get_item"]["calls"] == 2
+    assert snapshot["get_item"]["statuses"] == {"200": 2}
+    assert set(snapshot["get_item"]["phases"]) == {
+        "total",
+        "prepare",
+        "send",
+        "decode",
+        "model_build",
+    }
+    assert snapshot["get_missing"]["errors"] == 1
+    assert snapshot["get_missing"]["statuses"] == {"404": 1}
+    assert {"first_byte", "body_read"} <= set(snapshot["get_items"]["phases"])
+
+    text = recorder.to_prometheus()
+    assert 'rest_api_client_calls_total{endpoint="get_item",status="200"} 2' in text
+    assert (
+        'rest_api_client_phase_seconds_count{endpoint="get_item",phase="send"} 2'
+        in text
+    )
+    assert 'le="+Inf"' in text
+
+
+@pytest.mark.asyncio
+async def test_callback_instrumentation_async(make_api):
+    records = []
+    api = make_api(
+        handler,
+        ENDPOINTS,
+        instrumentation=CallbackInstrumentation(records.append),
+    )
+    await api.async_get_item()
+    assert len(records) == 1
+    assert records[0].endpoint == "get_item"
+    assert records[0].status_code == 200
+    assert records[0].duration >= records[0].phases["send"]
+
+
+def test_span_instrumentation_with_tracer(make_api):
+    class Span:
+        def __init__(self, name, start_time, attributes):
+            self.name, self.start_time, self.attributes = name, start_time, attributes
+
+        def record_exception(self, exc):
+            self.exception = exc
+
+        def end(self, end_time):
+            self.end_time = end_time
+
+    spans = []
+
+    class Tracer:
+        def start_span(self, name, start_time, attributes):
+            spans.append(Span(name, start_time, attributes))
+            return spans[-1]
+
+    api = make_api(handler, ENDPOINTS, instrumentation=SpanInstrumentation(Tracer()))
+    api.get_item()
+    assert spans[0].name == "GET get_item"
+    assert spans[0].attributes["http.status_code"] == 200
+    assert spans[0].end_time >= spans[0].start_time
+
+
+def test_no_metrics_without_instrumentation(make_api):
+    api = make_api(handler, ENDPOINTS)
+    assert api._prepare_call("get_item").metrics is None
@@ -1,3 +1,5 @@
+import asyncio
+import inspect
 import pytest
 from unittest.mock import MagicMock, AsyncMock
 from unittest import IsolatedAsyncioTestCase
@@ -244,3 +246,126 @@ def test_missing_method_name():
             MagicMock(),
             endpoints=[Endpoint(name="wrong_pantry", path="/pantry/{pantry_id}")],
         )
+
+
+def test_call_plan_builds_url():
+    api = make_pantry_api()
+    plan = api._plans["get_basket"]
+    assert plan.path_keys == ("pantry_id", "basket_id")
+    assert (
+        plan.url_template
+        == "https://getpantry.cloud/apiv1/pantry/{pantry_id}/basket/{basket_id}"
+    )
+
+    call = api._prepare_call("get_basket", pantry_id="123", basket_id="234")
+    assert (
+        call.driver_kwargs["url"]
+        == "https://getpantry.cloud/apiv1/pantry/123/basket/234"
+    )
+    assert call.driver_kwargs["headers"] == {"Accept": "application/json"}
+
+    call = api._prepare_call(
+        "create_basket", data={"key": "value"}, pantry_id="1", basket_id="2"
+    )
+    assert call.driver_kwargs["headers"]["Content-Type"] == "application/json"
+
+
+def test_call_plan_query_parameters():
+    api = RestAPI(
+        api_url=CHUCK_BASE_URL,
+        driver=MagicMock(),
+        endpoints=[
+            Endpoint(
+                name="get_search", path="/search", query_parameters=[("query", str)]
+            )
+        ],
+    )
+    call = api._prepare_call("get_search", query="chuck", ignored="x")
+    assert call.driver_kwargs["url"] == f"{CHUCK_BASE_URL}/search?query=chuck"
+
+
+def test_driver_functions_follow_driver_swap():
+    api = make_pantry_api()
+    api.get_pantry(pantry_id="123")
+    new_driver = MagicMock()
+    api.driver = new_driver
+    api.get_pantry(pantry_id="123")
+    new_driver.get.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_batch():
+    api = make_pantry_api()
+    in_flight = 0
+    max_in_flight = 0
+
+    async def get(url, headers):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if url.endswith("/bad"):
+            raise httpx.ConnectError("boom")
+        response = MagicMock()
+        response.json.return_value = url
+        return response
+
+    api.driver = MagicMock()
+    api.driver.get = get
+    parameters = [{"pantry_id": "123", "basket_id": str(i)} for i in range(20)]
+    parameters[3]["basket_id"] = "bad"
+
+    results = await api.call_async_batch("get_basket", parameters, concurrency=4)
+
+    assert [r.index for r in results] == list(range(20))
+    assert max_in_flight <= 4
+    assert not results[3].ok
+    assert isinstance(results[3].exception, httpx.ConnectError)
+    assert results[5].result.endswith("/pantry/123/basket/5")
+
+    finished = [r.index async for r in api.iter_async_batch("get_basket", parameters)]
+    assert sorted(finished) == list(range(20))
+
+
+def test_lazy_methods_match_eager_methods():
+    endpoints = [
+        Endpoint(
+            name="get_joke",
+            path="/random/{category_id}",
+            model=JokeModel,
+            query_parameters={"category": str},
+        ),
+        Endpoint(name="create_joke", path="/jokes"),
+    ]
+    eager = RestAPI(CHUCK_BASE_URL, MagicMock(), endpoints=endpoints)
+    lazy = RestAPI(CHUCK_BASE_URL, MagicMock(), endpoints=endpoints, lazy_methods=True)
+
+    assert "get_joke" not in lazy.__dict__
+    assert not lazy._plans
+    assert "async_create_joke" in dir(lazy)
+
+    for name in ("get_joke", "async_get_joke", "create_joke", "async_create_joke"):
+        lazy_method = getattr(lazy, name)
+        assert inspect.signature(lazy_method) == inspect.signature(getattr(eager, name))
+        assert lazy_method.__doc__ == getattr(eager, name).__doc__
+        assert getattr(lazy, name) is lazy_method
+
+    lazy.driver.get().json.return_value = example_response
+    assert isinstance(lazy.get_joke(category_id="1"), JokeModel)
+    with pytest.raises(AttributeError):
+        lazy.iter_get_joke
+
+
+@pytest.mark.parametrize("lazy_methods", [False, True])
+def test_endpoint_methods_shadow_restapi_attributes(lazy_methods):
+    driver = MagicMock()
+    driver.post().json.return_value = {"submitted": True}
+    api = RestAPI(
+        CHUCK_BASE_URL,
+        driver,
+        endpoints=[Endpoint(name="submit", path="/submit", method=HTTPMethod.POST)],
+        lazy_methods=lazy_methods,
+    )
+    assert api.submit() == {"submitted": True}
+    assert "async_submit" in dir(api)
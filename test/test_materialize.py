@@ -0,0 +1,100 @@
+import pytest
+import httpx
+from pydantic import BaseModel, ValidationError, validator
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.materialize import (
+    LazyModel,
+    Materialization,
+    ResponseShape,
+    materialize,
+)
+
+
+class User(BaseModel):
+    id: int
+    name: str
+    email: str = "unknown"
+
+    @validator("name")
+    def name_must_not_be_empty(cls, value):
+        if not value:
+            raise ValueError("empty name")
+        return value
+
+
+USERS = [{"id": "1", "name": "ada"}, {"id": 2, "name": "grace", "email": "g@x"}]
+
+
+def test_materialize_shapes_and_modes():
+    users = materialize(User, USERS, ResponseShape.LIST, Materialization.VALIDATE)
+    assert users == [User(id=1, name="ada"), User(id=2, name="grace", email="g@x")]
+
+    by_id = materialize(
+        User, {"a": USERS[0]}, ResponseShape.DICT, Materialization.VALIDATE
+    )
+    assert by_id == {"a": User(id=1, name="ada")}
+
+    trusted = materialize(
+        User, USERS[0], ResponseShape.SINGLE, Materialization.CONSTRUCT
+    )
+    assert isinstance(trusted, User)
+    # construct() skips validation, so the id stays a string.
+    assert trusted.id == "1"
+
+    with pytest.raises(ValueError):
+        materialize(User, USERS[0], ResponseShape.LIST, Materialization.VALIDATE)
+    # Items that are not objects are refused in every mode.
+    with pytest.raises(ValueError):
+        materialize(User, USERS, ResponseShape.SINGLE, Materialization.VALIDATE)
+    with pytest.raises(ValueError):
+        materialize(User, [USERS[0], "oops"], ResponseShape.LIST, Materialization.LAZY)
+
+
+def test_lazy_model_validates_on_access():
+    lazy = LazyModel(User, {"id": "7", "name": ""})
+    assert lazy.id == 7
+    assert lazy.email == "unknown"
+    with pytest.raises(ValidationError):
+        lazy.name
+    with pytest.raises(AttributeError):
+        lazy.missing_field
+    with pytest.raises(ValidationError):
+        LazyModel(User, {"name": "x"}).id
+    assert LazyModel(User, USERS[1]).materialize() == User(**USERS[1])
+
+
+def handler(request: httpx.Request):
+    if request.url.path.endswith("/text"):
+        return httpx.Response(200, content=b"plain text")
+    if request.url.path.endswith("/invalid"):
+        return httpx.Response(200, json={"id": "not a number", "name": "x"})
+    return httpx.Response(200, json=USERS)
+
+
+def test_endpoint_materialization(make_api):
+    endpoints = [
+        Endpoint(
+            name="get_users",
+            path="/users",
+            model=User,
+            response_shape=ResponseShape.LIST,
+        ),
+        Endpoint(
+            name="get_lazy_users",
+            path="/users",
+            model=User,
+            response_shape=ResponseShape.LIST,
+            materialization=Materialization.LAZY,
+        ),
+        Endpoint(name="get_invalid", path="/invalid", model=User),
+        Endpoint(name="get_text", path="/text"),
+    ]
+    api = make_api(handler, endpoints)
+    assert api.get_users()[0] == User(id=1, name="ada")
+    lazy_users = api.get_lazy_users()
+    assert isinstance(lazy_users[1], LazyModel)
+    assert lazy_users[1].email == "g@x"
+    # Validation errors are no longer hidden behind response.text.
+    with pytest.raises(ValidationError):
+        api.get_invalid()
+    assert api.get_text() == "plain text"
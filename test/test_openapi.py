@@ -0,0 +1,199 @@
+import json
+import pytest
+import httpx
+from src.rest_api_client.lib import HTTPMethod
+from src.rest_api_client.materialize import ResponseShape
+from src.rest_api_client.openapi import OpenAPIRegistry
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "Petstore", "version": "1.0.0"},
+    "servers": [{"url": "https://petstore.example.com/v1"}],
+    "paths": {
+        "/pets": {
+            "get": {
+                "operationId": "listPets",
+                "parameters": [
+                    {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                    {"name": "page-token", "in": "query", "schema": {"type": "string"}},
+                ],
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {
+                                    "type": "array",
+                                    "items": {"$ref": "#/components/schemas/Pet"},
+                                }
+                            }
+                        }
+                    }
+                },
+            },
+            "post": {
+                "operationId": "createPet",
+                "responses": {"201": {"description": "Created"}},
+            },
+        },
+        "/pets/{petId}": {
+            "get": {
+                "operationId": "showPetById",
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Pet"}
+                            }
+                        }
+                    }
+                },
+            }
+        },
+        "/stores": {
+            "get": {
+                "operationId": "listStores",
+                "responses": {
+                    "200": {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Store"}
+                            }
+                        }
+                    }
+                },
+            }
+        },
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "type": "object",
+                "required": ["id", "name"],
+                "properties": {
+                    "id": {"type": "integer"},
+                    "name": {"type": "string"},
+                    "ownerName": {"type": "string"},
+                    "owner": {"$ref": "#/components/schemas/Owner"},
+                },
+            },
+            "Owner": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Store": {"type": "object", "properties": {"name": {"type": "string"}}},
+            "Unused": {"type": "object", "properties": {"name": {"type": "string"}}},
+        }
+    },
+}
+
+
+def handler(request: httpx.Request):
+    if request.url.path == "/v1/pets":
+        pets = [{"id": 1, "name": "Rex", "ownerName": "Ann"}]
+        return httpx.Response(200, json=pets)
+    return httpx.Response(200, json={"id": 2, "name": "Tom", "owner": {"name": "Bo"}})
+
+
+def test_operations_are_compiled():
+    registry = OpenAPIRegistry.load(SPEC)
+    assert registry.api_url == "https://petstore.example.com/v1"
+    assert set(registry.operations) == {
+        "list_pets",
+        "create_pet",
+        "show_pet_by_id",
+        "list_stores",
+    }
+    # Only schemas reachable from an operation are kept.
+    assert set(registry.schemas) == {"Pet", "Owner", "Store"}
+
+    endpoint = registry.endpoint("list_pets")
+    assert endpoint.method == HTTPMethod.GET
+    # "page-token" is not a valid keyword argument and is skipped.
+    assert endpoint.query_parameters == {"limit": int}
+    assert endpoint.response_shape == ResponseShape.LIST
+    assert registry.endpoint("show_pet_by_id").path == "/pets/{pet_id}"
+    assert registry.endpoint("create_pet").model is None
+
+
+def test_models_are_built_on_demand(make_api):
+    registry = OpenAPIRegistry.load(SPEC)
+    registry.endpoints(["show_pet_by_id"])
+    assert set(registry._models) == {"Pet", "Owner"}
+    assert registry.model("Pet") is registry.model("Pet")
+
+    api = make_api(handler, registry.endpoints(["list_pets", "show_pet_by_id"]))
+    pets = api.list_pets(limit=1)
+    assert pets[0].owner_name == "Ann"
+    pet = api.show_pet_by_id(pet_id="2")
+    assert pet.owner.name == "Bo"
+
+
+def test_registry_artifact_is_reused(tmp_path, monkeypatch):
+    spec_path = tmp_path / "petstore.json"
+    spec_path.write_text(json.dumps(SPEC))
+    cache_dir = tmp_path / "cache"
+
+    first = OpenAPIRegistry.load(spec_path, cache_dir=cache_dir)
+    artifacts = list(cache_dir.iterdir())
+    assert len(artifacts) == 1
+
+    def fail(cls, document):
+        raise AssertionError("The spec should not be parsed again.")
+
+    monkeypatch.setattr(OpenAPIRegistry, "from_document", classmethod(fail))
+    second = OpenAPIRegistry.load(spec_path, cache_dir=cache_dir)
+    assert second.operations == first.operations
+    assert second.schemas == first.schemas
+
+    # A changed spec gets a new artifact.
+    spec_v2 = {**SPEC, "servers": [{"url": "https://v2.example.com"}]}
+    spec_path.write_text(json.dumps(spec_v2))
+    with pytest.raises(AssertionError):
+        OpenAPIRegistry.load(spec_path, cache_dir=cache_dir)
+
+
+def test_yaml_spec(tmp_path):
+    yaml = pytest.importorskip("yaml")
+    spec_path = tmp_path / "petstore.yaml"
+    spec_path.write_text(yaml.safe_dump(SPEC))
+    registry = OpenAPIRegistry.load(spec_path)
+    assert "list_pets" in registry.operations
+
+
+def test_path_parameters_with_digits(make_api):
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Items", "version": "1.0.0"},
+        "paths": {
+            "/items/{item2Id}": {
+                "get": {
+                    "operationId": "getItem2",
+                    "responses": {"200": {"description": "OK"}},
+                }
+            }
+        },
+    }
+    registry = OpenAPIRegistry.load(spec)
+    assert registry.endpoint("get_item2").path == "/items/{item2_id}"
+
+    api = make_api(
+        lambda request: httpx.Response(200, text=request.url.path),
+        registry.endpoints(["get_item2"]),
+    )
+    assert api.get_item2(item2_id="7") == "/v1/items/7"
+
+
+def test_operation_names_must_be_unique():
+    spec = {
+        "openapi": "3.0.0",
+        "info": {"title": "Users", "version": "1.0.0"},
+        "paths": {
+            "/users/{id}": {
+                "get": {"operationId": "getUser", "responses": {}},
+            },
+            "/accounts/{id}": {
+                "get": {"operationId": "get_user", "responses": {}},
+            },
+        },
+    }
+    with pytest.raises(ValueError, match="endpoint name 'get_user'") as error:
+        OpenAPIRegistry.load(spec)
+    assert "GET /users/{id}" in str(error.value)
+    assert "GET /accounts/{id}" in str(error.value)
@@ -0,0 +1,92 @@
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.pagination import (
+    CursorPagination,
+    OffsetPagination,
+    PageNumberPagination,
+    LinkHeaderPagination,
+)
+
+ITEMS = [{"id": i} for i in range(7)]
+
+
+class Item(BaseModel):
+    id: int
+
+
+def handler(request: httpx.Request):
+    params = request.url.params
+    if request.url.path.endswith("/cursor"):
+        start = int(params.get("cursor", 0))
+        page = ITEMS[start : start + 3]
+        next_cursor = str(start + 3) if start + 3 < len(ITEMS) else None
+        return httpx.Response(200, json={"results": page, "next_cursor": next_cursor})
+    if request.url.path.endswith("/offset"):
+        offset, limit = int(params["offset"]), int(params["limit"])
+        return httpx.Response(200, json=ITEMS[offset : offset + limit])
+    if request.url.path.endswith("/pages"):
+        page = int(params["page"])
+        return httpx.Response(200, json={"data": ITEMS[(page - 1) * 2 : page * 2]})
+    start = int(params.get("start", 0))
+    headers = {}
+    if start + 4 < len(ITEMS):
+        next_url = request.url.copy_with(params={"start": start + 4})
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return httpx.Response(200, json=ITEMS[start : start + 4], headers=headers)
+
+
+ENDPOINTS = [
+    Endpoint(
+        name="get_cursor",
+        path="/cursor",
+        model=Item,
+        pagination=CursorPagination(),
+    ),
+    Endpoint(
+        name="get_offset",
+        path="/offset",
+        pagination=OffsetPagination(limit=3),
+    ),
+    Endpoint(
+        name="get_pages",
+        path="/pages",
+        pagination=PageNumberPagination(items_field="data"),
+    ),
+    Endpoint(name="get_linked", path="/linked", pagination=LinkHeaderPagination()),
+    Endpoint(name="get_plain", path="/plain"),
+]
+
+
+def test_sync_pagination_strategies(make_api):
+    api = make_api(handler, ENDPOINTS)
+    assert list(api.iter_get_cursor()) == [Item(**item) for item in ITEMS]
+    assert list(api.iter_get_offset()) == ITEMS
+    assert list(api.iter_get_pages()) == ITEMS
+    assert list(api.iter_endpoint("get_linked")) == ITEMS
+    assert not hasattr(api, "iter_get_plain")
+    with pytest.raises(ValueError):
+        next(api.iter_endpoint("get_plain"))
+
+
+def test_sync_pagination_is_lazy(make_api):
+    requests = []
+
+    def counting_handler(request):
+        requests.append(request)
+        return handler(request)
+
+    api = make_api(counting_handler, ENDPOINTS)
+    iterator = api.iter_get_offset()
+    next(iterator)
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_pagination(make_api):
+    api = make_api(handler, ENDPOINTS)
+    assert [item async for item in api.aiter_get_cursor()] == [
+        Item(**item) for item in ITEMS
+    ]
+    assert [item async for item in api.aiter_get_linked()] == ITEMS
@@ -0,0 +1,147 @@
+import time
+import pytest
+import httpx
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.downloads import Download
+from src.rest_api_client.pagination import LinkHeaderPagination
+from src.rest_api_client.ratelimit import TokenBucket
+from src.rest_api_client.streaming import StreamFormat
+
+
+def handler(request: httpx.Request):
+    return httpx.Response(200, json={}, headers={"X-RateLimit-Remaining": "5"})
+
+
+def test_token_bucket_reservations():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_adaptive_rate_from_headers():
+    bucket = TokenBucket(rate=3, adaptive=True, max_rate=20)
+    bucket.update_from_headers(
+        {"X-RateLimit-Remaining": "50", "X-RateLimit-Reset": "10"}
+    )
+    assert bucket.rate == 5
+    bucket.update_from_headers(
+        {"X-RateLimit-Remaining": "1000", "X-RateLimit-Reset": str(time.time() + 10)}
+    )
+    assert bucket.rate == 20
+    bucket.update_from_headers({"X-RateLimit-Remaining": "0"})
+    assert bucket.reserve() > 0
+
+
+def test_rate_limits_are_combined_per_endpoint(make_api):
+    global_limit = TokenBucket(rate=1000)
+    host_limit = TokenBucket(rate=1000)
+    search_limit = TokenBucket(rate=1000, burst=1, adaptive=True)
+    endpoints = [
+        Endpoint(name="search", path="/search", method="post", rate_limit=search_limit),
+        Endpoint(name="get_users", path="/users"),
+    ]
+    api = make_api(
+        handler,
+        endpoints,
+        rate_limit=global_limit,
+        host_rate_limits={"api.example.com": host_limit},
+    )
+    assert api._plans["search"].rate_limiters == (
+        global_limit,
+        host_limit,
+        search_limit,
+    )
+    assert api._plans["get_users"].rate_limiters == (global_limit, host_limit)
+
+    started = time.monotonic()
+    for _ in range(3):
+        api.search(data={"query": "x"})
+    # burst=1 at 1000/s: the 2nd and 3rd calls wait ~1ms each.
+    assert time.monotonic() - started >= 0.002
+
+
+@pytest.mark.asyncio
+async def test_async_rate_limit(make_api):
+    bucket = TokenBucket(rate=100, burst=1)
+    endpoints = [Endpoint(name="get_users", path="/users")]
+    api = make_api(handler, endpoints, rate_limit=bucket)
+    started = time.monotonic()
+    for _ in range(3):
+        await api.async_get_users()
+    assert time.monotonic() - started >= 0.02
+
+
+class CountingBucket(TokenBucket):
+    def __init__(self):
+        super().__init__(rate=1000)
+        self.acquired = 0
+
+    def reserve(self) -> float:
+        self.acquired += 1
+        return super().reserve()
+
+
+def test_host_limits_follow_the_request_host(make_api):
+    api_limit, files_limit = CountingBucket(), CountingBucket()
+
+    def paged(request: httpx.Request):
+        if request.url.host == "api.example.com":
+            link = '<https://files.example.com/v1/pages?page=2>; rel="next"'
+            return httpx.Response(200, json=[1], headers={"Link": link})
+        return httpx.Response(200, json=[2])
+
+    endpoints = [
+        Endpoint(name="get_pages", path="/pages", pagination=LinkHeaderPagination())
+    ]
+    api = make_api(
+        paged,
+        endpoints,
+        host_rate_limits={
+            "api.example.com": api_limit,
+            "files.example.com": files_limit,
+        },
+    )
+    assert list(api.iter_get_pages()) == [1, 2]
+    assert (api_limit.acquired, files_limit.acquired) == (1, 1)
+
+
+def streamed(request: httpx.Request):
+    headers = {"X-RateLimit-Remaining": "500", "X-RateLimit-Reset": "1"}
+    return httpx.Response(200, content=b'{"id": 1}\n', headers=headers)
+
+
+STREAMING_ENDPOINTS = [
+    Endpoint(name="get_export", path="/export", streaming=StreamFormat.NDJSON),
+    Endpoint(name="get_file", path="/file", download=Download()),
+]
+
+
+def test_streamed_responses_update_the_rate(make_api, tmp_path):
+    bucket = TokenBucket(rate=1000, adaptive=True)
+    api = make_api(streamed, STREAMING_ENDPOINTS, rate_limit=bucket)
+    assert list(api.stream_endpoint("get_export")) == [{"id": 1}]
+    assert bucket.rate == 500
+    bucket.rate = 1000
+    with api.open_endpoint("get_file") as chunks:
+        assert b"".join(chunks)
+    assert bucket.rate == 500
+    bucket.rate = 1000
+    api.download_endpoint("get_file", tmp_path / "file")
+    assert bucket.rate == 500
+
+
+@pytest.mark.asyncio
+async def test_async_streamed_responses_update_the_rate(make_api, tmp_path):
+    bucket = TokenBucket(rate=1000, adaptive=True)
+    api = make_api(streamed, STREAMING_ENDPOINTS, rate_limit=bucket)
+    assert [item async for item in api.astream_endpoint("get_export")] == [{"id": 1}]
+    assert bucket.rate == 500
+    bucket.rate = 1000
+    async with api.aopen_endpoint("get_file") as chunks:
+        assert b"".join([chunk async for chunk in chunks])
+    assert bucket.rate == 500
+    bucket.rate = 1000
+    await api.adownload_endpoint("get_file", tmp_path / "file")
+    assert bucket.rate == 500
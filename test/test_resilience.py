@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+import httpx
+from src.rest_api_client.lib import RestAPI, Endpoint
+from src.rest_api_client.resilience import RetryPolicy, retry_after
+
+NO_WAIT = RetryPolicy(max_attempts=3, backoff_base=0, jitter=False)
+
+
+def flaky_handler(failures):
+    calls = []
+
+    def handler(request: httpx.Request):
+        calls.append(request)
+        if len(calls) <= len(failures):
+            failure = failures[len(calls) - 1]
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx.Response(failure, headers={"Retry-After": "0"})
+        return httpx.Response(200, json={"ok": True})
+
+    return handler, calls
+
+
+def item_endpoints(retry_policy=None):
+    return [Endpoint(name="get_item", path="/item", retry_policy=retry_policy)]
+
+
+def test_retries_statuses_and_transport_errors(make_api):
+    handler, calls = flaky_handler([503, httpx.ConnectError("refused")])
+    api = make_api(handler, item_endpoints(), retry_policy=NO_WAIT)
+    assert api.get_item() == {"ok": True}
+    assert len(calls) == 3
+
+
+def test_gives_up_after_max_attempts(make_api):
+    handler, calls = flaky_handler([503, 503, 503, 503])
+    api = make_api(handler, item_endpoints(), retry_policy=NO_WAIT)
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_item()
+    assert len(calls) == 3
+
+
+def test_endpoint_policy_overrides_default(make_api):
+    handler, calls = flaky_handler([503])
+    single_attempt = RetryPolicy(max_attempts=1)
+    api = make_api(handler, item_endpoints(single_attempt), retry_policy=NO_WAIT)
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_item()
+    assert len(calls) == 1
+
+
+def test_retry_after_parsing():
+    assert retry_after(httpx.Response(429, headers={"Retry-After": "2"})) == 2.0
+    assert retry_after(httpx.Response(429)) is None
+    past = "Wed, 21 Oct 2015 07:28:00 GMT"
+    assert retry_after(httpx.Response(503, headers={"Retry-After": past})) == 0.0
+
+
+def test_deadline_stops_retries(make_api):
+    policy = RetryPolicy(
+        max_attempts=10,
+        backoff_base=5,
+        jitter=False,
+        respect_retry_after=False,
+        deadline=1,
+    )
+    handler, calls = flaky_handler([503, 503])
+    api = make_api(handler, item_endpoints(), retry_policy=policy)
+    with pytest.raises(httpx.HTTPStatusError):
+        api.get_item()
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_async_retries(make_api):
+    handler, calls = flaky_handler([429])
+    api = make_api(handler, item_endpoints(), retry_policy=NO_WAIT)
+    assert await api.async_get_item() == {"ok": True}
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins():
+    calls = []
+
+    class Driver:
+        async def get(self, url, headers):
+            calls.append(url)
+            delay = 1 if len(calls) == 1 else 0
+            await asyncio.sleep(delay)
+            return httpx.Response(
+                200, json={"attempt": len(calls)}, request=httpx.Request("GET", url)
+            )
+
+    policy = RetryPolicy(hedge_after=0.01)
+    api = RestAPI(
+        api_url="https://api.example.com/v1",
+        driver=Driver(),
+        retry_policy=policy,
+        endpoints=item_endpoints(),
+    )
+    assert await api.async_get_item() == {"attempt": 2}
+    assert len(calls) == 2
+
+
+def test_non_idempotent_methods_are_not_retried_by_default(make_api):
+    handler, calls = flaky_handler([503, httpx.ReadTimeout("Timed out.")])
+    endpoints = [
+        Endpoint(name="post_item", path="/item"),
+        Endpoint(
+            name="patch_item",
+            path="/item",
+            retry_policy=NO_WAIT.copy(update={"retry_non_idempotent": True}),
+        ),
+    ]
+    api = make_api(handler, endpoints, retry_policy=NO_WAIT)
+    with pytest.raises(httpx.HTTPStatusError):
+        api.post_item()
+    assert len(calls) == 1
+    assert api.patch_item() == {"ok": True}
+    assert len(calls) == 3
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+import httpx
+from src.rest_api_client.lib import RestAPI, Endpoint
+from src.rest_api_client.singleflight import SingleFlight
+
+BASE_URL = "https://getpantry.cloud/apiv1"
+ENDPOINTS = [
+    Endpoint(name="get_pantry", path="/pantry/{pantry_id}"),
+    Endpoint(name="create_basket", path="/pantry/{pantry_id}/basket/{basket_id}"),
+]
+
+
+@pytest.mark.asyncio
+async def test_async_single_flight_coalesces():
+    calls = []
+
+    class Driver:
+        async def get(self, url, headers):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            request = httpx.Request("GET", url)
+            return httpx.Response(200, json={"url": url}, request=request)
+
+    api = RestAPI(BASE_URL, Driver(), endpoints=ENDPOINTS, single_flight=True)
+    results = await asyncio.gather(
+        *(api.async_get_pantry(pantry_id="1") for _ in range(10)),
+        api.async_get_pantry(pantry_id="2"),
+    )
+    assert len(calls) == 2
+    assert all(result is results[0] for result in results[:10])
+    assert len(api.single_flight) == 0
+
+    await api.async_get_pantry(pantry_id="1")
+    assert len(calls) == 3
+
+
+def test_sync_single_flight_across_threads(make_api):
+    release = threading.Event()
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        release.wait(1)
+        return httpx.Response(200, json={"ok": True})
+
+    api = make_api(handler, ENDPOINTS, single_flight=True)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(api.get_pantry(pantry_id="1")))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [{"ok": True}] * 5
+    assert len(calls) == 1
+
+
+def test_single_flight_only_coalesces_reads():
+    api = RestAPI(BASE_URL, MagicMock(), endpoints=ENDPOINTS, single_flight=True)
+    assert api._prepare_call("get_pantry", pantry_id="1").flight_key is not None
+    call = api._prepare_call(
+        "create_basket", data={"a": 1}, pantry_id="1", basket_id="2"
+    )
+    assert call.flight_key is None
+
+
+def test_single_flight_propagates_errors():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        flight.do("key", fail)
+    assert len(flight) == 0
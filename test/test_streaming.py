@@ -0,0 +1,96 @@
+import json
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.streaming import (
+    JSONArrayDecoder,
+    NDJSONDecoder,
+    StreamFormat,
+    iter_decoded,
+)
+
+RECORDS = [{"id": i, "name": f'record "{i}" ]}}'} for i in range(50)]
+
+
+class Record(BaseModel):
+    id: int
+    name: str
+
+
+def chunked(raw: bytes, size: int):
+    return [raw[i : i + size] for i in range(0, len(raw), size)]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64, 4096])
+def test_json_array_decoder_chunk_boundaries(size):
+    values = RECORDS + [1, -2.5, "text", True, None, [], {}, [[1], {"a": [2]}]]
+    raw = json.dumps(values).encode()
+    assert list(iter_decoded(chunked(raw, size), JSONArrayDecoder())) == values
+
+
+def test_json_array_decoder_buffers_one_element():
+    decoder = JSONArrayDecoder()
+    raw = json.dumps(RECORDS).encode()
+    for chunk in chunked(raw, 16):
+        decoder.feed(chunk)
+        assert len(decoder._buffer) < 64
+
+
+def test_json_array_decoder_errors():
+    with pytest.raises(ValueError):
+        list(iter_decoded([b'{"not": "an array"}'], JSONArrayDecoder()))
+    with pytest.raises(ValueError):
+        list(iter_decoded([b"[1, 2"], JSONArrayDecoder()))
+
+
+@pytest.mark.parametrize("raw", [b"[1,,2]", b"[,1]", b"[1 2]", b"[1,]"])
+@pytest.mark.parametrize("size", [1, 64])
+def test_json_array_decoder_rejects_bad_separators(raw, size):
+    with pytest.raises(ValueError):
+        json.loads(raw)
+    with pytest.raises(ValueError):
+        list(iter_decoded(chunked(raw, size), JSONArrayDecoder()))
+
+
+def test_json_array_decoder_separators():
+    raw = b' [ 1 ,\n"a" , [ ] ,{ } ] '
+    assert list(iter_decoded(chunked(raw, 1), JSONArrayDecoder())) == [1, "a", [], {}]
+    assert list(iter_decoded([b"[ ]"], JSONArrayDecoder())) == []
+
+
+def test_ndjson_decoder():
+    raw = b"\n".join(json.dumps(record).encode() for record in RECORDS)
+    assert list(iter_decoded(chunked(raw, 5), NDJSONDecoder())) == RECORDS
+
+
+def handler(request: httpx.Request):
+    if request.url.path.endswith("/export"):
+        lines = (json.dumps(record) for record in RECORDS)
+        return httpx.Response(200, content="\n".join(lines).encode())
+    return httpx.Response(200, content=json.dumps(RECORDS).encode())
+
+
+ENDPOINTS = [
+    Endpoint(
+        name="get_records",
+        path="/records",
+        model=Record,
+        streaming=StreamFormat.JSON_ARRAY,
+    ),
+    Endpoint(name="get_export", path="/export", streaming=StreamFormat.NDJSON),
+]
+
+
+def test_stream_endpoint(make_api):
+    api = make_api(handler, ENDPOINTS)
+    assert list(api.stream_get_records()) == [Record(**r) for r in RECORDS]
+    assert list(api.stream_endpoint("get_export")) == RECORDS
+
+
+@pytest.mark.asyncio
+async def test_astream_endpoint(make_api):
+    api = make_api(handler, ENDPOINTS)
+    records = [record async for record in api.astream_get_records()]
+    assert records == [Record(**r) for r in RECORDS]
+    assert [r async for r in api.astream_get_export()] == RECORDS
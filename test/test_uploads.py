@@ -0,0 +1,124 @@
+import gzip
+import mmap
+import pytest
+import httpx
+from pydantic import BaseModel
+from src.rest_api_client.lib import Endpoint
+from src.rest_api_client.codec import StdlibJSONCodec
+from src.rest_api_client.compression import Compression
+from src.rest_api_client.resilience import RetryPolicy
+from src.rest_api_client.uploads import NDJSON, stream_body
+
+PAYLOAD = bytes(range(256)) * 1000
+
+
+class Row(BaseModel):
+    id: int
+
+
+def handler(request: httpx.Request):
+    body = request.read()
+    if request.headers.get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    return httpx.Response(
+        200,
+        json={
+            "size": len(body),
+            "lines": body.count(b"\n"),
+            "same": body == PAYLOAD,
+            "type": request.headers.get("Content-Type"),
+            "length": request.headers.get("Content-Length"),
+            "chunked": request.headers.get("Transfer-Encoding") == "chunked",
+        },
+    )
+
+
+ENDPOINTS = [Endpoint(name="create_upload", path="/uploads")]
+
+
+def chunks():
+    for start in range(0, len(PAYLOAD), 10000):
+        yield PAYLOAD[start : start + 10000]
+
+
+def test_sync_sources(make_api, tmp_path):
+    path = tmp_path / "payload.bin"
+    path.write_bytes(PAYLOAD)
+    api = make_api(handler, ENDPOINTS)
+    result = api.create_upload(data=chunks())
+    assert result["same"] and result["chunked"]
+    assert result["type"] == "application/octet-stream"
+
+    with open(path, "rb") as file:
+        result = api.create_upload(data=file)
+    assert result["same"] and result["length"] == str(len(PAYLOAD))
+
+    with open(path, "r+b") as file, mmap.mmap(file.fileno(), 0) as mapped:
+        result = api.create_upload(data=mapped)
+        assert result["same"] and result["length"] == str(len(PAYLOAD))
+
+    assert api.create_upload(data=PAYLOAD)["same"]
+    # Plain JSON bodies are unchanged.
+    assert api.create_upload(data={"a": 1})["type"] == "application/json"
+
+
+def test_buffers_are_not_copied():
+    content, headers = stream_body(
+        bytearray(PAYLOAD), StdlibJSONCodec(), asynchronous=False
+    )
+    parts = list(content)
+    assert all(isinstance(part, memoryview) for part in parts)
+    assert headers["Content-Length"] == str(len(PAYLOAD))
+
+
+def test_ndjson_is_lazy():
+    consumed = []
+
+    def rows():
+        for index in range(1000):
+            consumed.append(index)
+            yield Row(id=index)
+
+    body = NDJSON(rows(), chunk_size=100)
+    chunks = body.chunks(StdlibJSONCodec())
+    first = next(chunks)
+    assert first.startswith(b'{"id":0}\n')
+    assert len(consumed) < 20
+    rest = b"".join(chunks)
+    assert (first + rest).count(b"\n") == 1000
+
+
+def test_ndjson_upload_with_compression(make_api):
+    rows = (Row(id=index) for index in range(5000))
+    api = make_api(handler, ENDPOINTS, compression=Compression())
+    result = api.create_upload(data=NDJSON(rows))
+    assert result["lines"] == 5000
+    assert result["type"] == "application/x-ndjson"
+    assert result["chunked"]
+
+
+def test_streamed_bodies_are_not_retried(make_api):
+    api = make_api(
+        handler, ENDPOINTS, retry_policy=RetryPolicy(retry_non_idempotent=True)
+    )
+    assert api._prepare_call("create_upload", data=chunks()).retry_policy is None
+    assert api._prepare_call("create_upload", data={"a": 1}).retry_policy
+
+
+@pytest.mark.asyncio
+async def test_async_sources(make_api, tmp_path):
+    async def rows():
+        for index in range(100):
+            yield {"id": index}
+
+    path = tmp_path / "payload.bin"
+    path.write_bytes(PAYLOAD)
+    api = make_api(handler, ENDPOINTS)
+    result = await api.async_create_upload(data=NDJSON(rows()))
+    assert result["lines"] == 100
+    with open(path, "rb") as file:
+        assert (await api.async_create_upload(data=file))["same"]
+    assert (await api.async_create_upload(data=chunks()))["same"]
+    # Async iterables cannot be sent by the sync client.
+    with pytest.raises(TypeError):
+        api.create_upload(data=NDJSON(rows()))